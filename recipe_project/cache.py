@@ -0,0 +1,202 @@
+# recipe_project/cache.py
+"""
+Cache configuration for the project.
+
+build_caches() turns environment settings into CACHES with one alias per
+use: "default", "charts", "fragments" and "sessions". Every alias
+lives on the same shared tier, picked with RECIPE_CACHE_SHARED:
+
+    locmem  per-process memory (default; also the stand-in for tests)
+    file    a directory on disk, shared by workers on one machine
+    redis   a Redis-compatible server at RECIPE_CACHE_URL (needs redis-py)
+
+With RECIPE_CACHE_LOCAL=True each alias except "sessions" becomes a
+TieredCache: a small in-process LRU in front of the shared tier. Reads hit
+memory first; writes go to both. Another worker's writes show up once the
+local copy expires (RECIPE_CACHE_LOCAL_TIMEOUT seconds). That is fine for
+entries under version- or fingerprint-stamped keys, whose content never
+changes, but not for:
+
+- counters (the fragment ":hits"/":misses"): a stale local copy would
+  undercount, so get(), get_many(), set() and set_many() always go to the
+  shared tier for them;
+- "sessions" (sessions and CachedModelBackend's users): a logout or a
+  deactivated user must take effect in every worker at once, so that alias
+  is never tiered.
+"""
+
+import os
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.module_loading import import_string
+
+SHARED_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+}
+
+_MISSING = object()
+
+
+class TieredCache(BaseCache):
+    """
+    In-process LRU (Django's LocMemCache) in front of another cache backend.
+
+    OPTIONS:
+        SHARED             backend config dict for the shared tier (required)
+        LOCAL_TIMEOUT      max seconds a value is served from memory (5)
+        LOCAL_MAX_ENTRIES  size of the in-process LRU (500)
+        SHARED_ONLY        key suffixes never kept in memory (())
+
+    Key prefixes and versions are applied by the shared tier's own config.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        shared = dict(options["SHARED"])
+        self.shared = import_string(shared["BACKEND"])(shared.get("LOCATION", ""), shared)
+        self.local_timeout = options.get("LOCAL_TIMEOUT", 5)
+        self.shared_only = tuple(options.get("SHARED_ONLY", ()))
+        self.local = LocMemCache(
+            f"tiered:{location}",
+            {"TIMEOUT": self.local_timeout, "OPTIONS": {"MAX_ENTRIES": options.get("LOCAL_MAX_ENTRIES", 500)}},
+        )
+
+    def _local_ttl(self, timeout):
+        # Never keep a value in memory longer than the shared tier would
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.shared.default_timeout
+        if timeout is None:
+            return self.local_timeout
+        return min(timeout, self.local_timeout)
+
+    def _is_local(self, key):
+        return not key.endswith(self.shared_only) if self.shared_only else True
+
+    def get(self, key, default=None, version=None):
+        if not self._is_local(key):
+            return self.shared.get(key, default, version=version)
+        value = self.local.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            value = self.shared.get(key, _MISSING, version=version)
+            if value is _MISSING:
+                return default
+            self.local.set(key, value, self.local_timeout, version=version)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = self.local.get_many([key for key in keys if self._is_local(key)], version=version)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            fetched = self.shared.get_many(missing, version=version)
+            self.local.set_many(
+                {key: value for key, value in fetched.items() if self._is_local(key)},
+                self.local_timeout, version=version,
+            )
+            found.update(fetched)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        if self._is_local(key):
+            self.local.set(key, value, self._local_ttl(timeout), version=version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout, version=version)
+        self.local.set_many(
+            {key: value for key, value in data.items() if self._is_local(key)},
+            self._local_ttl(timeout), version=version,
+        )
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout, version=version)
+        # Whoever won, the local copy must not shadow the shared value
+        self.local.delete(key, version=version)
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        # Counters live in the shared tier only, so every worker adds up
+        self.local.delete(key, version=version)
+        return self.shared.incr(key, delta, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self.local.delete(key, version=version)
+        return self.shared.touch(key, timeout, version=version)
+
+    def has_key(self, key, version=None):
+        return self.local.has_key(key, version=version) or self.shared.has_key(key, version=version)
+
+    def delete(self, key, version=None):
+        self.local.delete(key, version=version)
+        return self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        self.local.delete_many(keys, version=version)
+        self.shared.delete_many(keys, version=version)
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+
+def build_caches(config):
+    """CACHES for settings.py; config is decouple's config()."""
+    shared = config("RECIPE_CACHE_SHARED", default="locmem")
+    if shared not in SHARED_BACKENDS:
+        raise ValueError(f"RECIPE_CACHE_SHARED must be one of {', '.join(SHARED_BACKENDS)}, not {shared!r}")
+    tiered = config("RECIPE_CACHE_LOCAL", default=False, cast=bool)
+    url = config("RECIPE_CACHE_URL", default="redis://127.0.0.1:6379/1")
+    directory = config("RECIPE_CACHE_DIR", default=os.path.join("/tmp", "recipe-cache"))
+
+    # alias -> (default timeout in seconds or None, max entries for locmem/file)
+    aliases = {
+        "default": (300, 1000),
+        "charts": (
+            config("RECIPE_CHART_CACHE_TIMEOUT", default=600, cast=int),
+            config("RECIPE_CHART_CACHE_MAX_ENTRIES", default=200, cast=int),
+        ),
+        "fragments": (
+            config("RECIPE_FRAGMENT_CACHE_TIMEOUT", default=3600, cast=int),
+            config("RECIPE_FRAGMENT_CACHE_MAX_ENTRIES", default=2000, cast=int),
+        ),
+        # Session entries carry their own expiry (SESSION_COOKIE_AGE)
+        "sessions": (None, config("RECIPE_SESSION_CACHE_MAX_ENTRIES", default=10000, cast=int)),
+    }
+
+    caches = {}
+    for alias, (timeout, max_entries) in aliases.items():
+        backend = {"BACKEND": SHARED_BACKENDS[shared], "TIMEOUT": timeout}
+        if shared == "locmem":
+            backend["LOCATION"] = f"recipe-{alias}"
+        elif shared == "file":
+            backend["LOCATION"] = os.path.join(directory, alias)
+        else:
+            # One server for every alias; prefixes keep their keys apart
+            backend["LOCATION"] = url
+            backend["KEY_PREFIX"] = f"recipe-{alias}"
+        if shared != "redis":
+            backend["OPTIONS"] = {"MAX_ENTRIES": max_entries}
+
+        # Sessions (and cached users) must see a logout everywhere at once
+        if tiered and alias != "sessions":
+            backend = {
+                "BACKEND": "recipe_project.cache.TieredCache",
+                "LOCATION": alias,
+                "TIMEOUT": timeout,
+                "OPTIONS": {
+                    "SHARED": backend,
+                    "LOCAL_TIMEOUT": config("RECIPE_CACHE_LOCAL_TIMEOUT", default=5, cast=int),
+                    "LOCAL_MAX_ENTRIES": config("RECIPE_CACHE_LOCAL_MAX_ENTRIES", default=500, cast=int),
+                    # The fragment hit/miss counters (recipes.fragment_cache)
+                    "SHARED_ONLY": (":hits", ":misses"),
+                },
+            }
+        caches[alias] = backend
+    return caches
@@ -10,6 +10,7 @@ from pathlib import Path
 import os
 from decouple import config
 import dj_database_url
+from recipe_project.cache import build_caches
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -44,10 +45,11 @@ INSTALLED_APPS = [
     'salespersons',
     'customers',
     'recipes',
+    'rest_framework',
 ]
 
 MIDDLEWARE = [
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # ADDED FOR PRODUCTION STATIC FILES
+    'recipe_project.middleware.WhiteNoiseMiddleware',  # ADDED FOR PRODUCTION STATIC FILES (async-capable subclass)
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -99,6 +101,40 @@ else:
         }
     }
 
+# Caches (built in recipe_project/cache.py from the environment)
+# RECIPE_CACHE_SHARED: locmem (default) | file (RECIPE_CACHE_DIR) |
+#   redis (RECIPE_CACHE_URL, needs the redis package)
+#   More than one worker process should use file or redis, so workers share
+#   rendered charts and fragments and the fragment hit/miss counters add up
+# RECIPE_CACHE_LOCAL=True puts an in-process LRU in front of the shared tier
+#   (not for "sessions", so logouts reach every worker at once)
+# Aliases: "charts" (rendered search charts), "fragments" (recipe detail
+# bodies and list cards), "sessions" and "default"; timeouts/sizes via
+# RECIPE_<ALIAS>_CACHE_TIMEOUT/_MAX_ENTRIES
+CACHES = build_caches(config)
+
+# Sessions: "db" (Django's default), "cached_db" (the "sessions" cache in
+# front of the session table), "cache" (cache only; use a shared tier) or
+# "signed_cookies" (no server-side storage at all)
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+RECIPE_SESSION_MODE = config('RECIPE_SESSION_MODE', default='db')
+SESSION_ENGINE = SESSION_ENGINES[RECIPE_SESSION_MODE]
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Serve request.user from the "sessions" cache instead of a user query.
+# Sessions record their backend, so toggling this logs everyone out once.
+RECIPE_CACHE_USERS = config('RECIPE_CACHE_USERS', default=False, cast=bool)
+RECIPE_USER_CACHE_TIMEOUT = config('RECIPE_USER_CACHE_TIMEOUT', default=300, cast=int)
+AUTHENTICATION_BACKENDS = [
+    'recipes.auth_cache.CachedModelBackend' if RECIPE_CACHE_USERS
+    else 'django.contrib.auth.backends.ModelBackend',
+]
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -149,6 +185,55 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Recipe search
+# Full-text backend: "auto" picks Postgres tsvector / SQLite FTS5 by database,
+# or give a dotted path from recipes/search_backends.py
+RECIPE_SEARCH_BACKEND = config('RECIPE_SEARCH_BACKEND', default='auto')
+# Most rows the search page lists for one (filtered) search; exports, the
+# API and charts always cover every match
+RECIPE_SEARCH_MAX_RESULTS = config('RECIPE_SEARCH_MAX_RESULTS', default=1000, cast=int)
+# Seconds before a worker rebuilds its in-memory ingredient index
+RECIPE_INGREDIENT_INDEX_TTL = config('RECIPE_INGREDIENT_INDEX_TTL', default=300, cast=int)
+
+# Recipes per page on the list view and "Show All" search results
+RECIPE_PAGE_SIZE = config('RECIPE_PAGE_SIZE', default=24, cast=int)
+# Recipes per database round trip when streaming CSV/NDJSON exports
+RECIPE_EXPORT_CHUNK_SIZE = config('RECIPE_EXPORT_CHUNK_SIZE', default=500, cast=int)
+
+# Read-only JSON API under /api/ (recipes.api); signed-in users only
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated'],
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+}
+
+# Search charts: "svg" (built-in, no extra imports) or "matplotlib" (PNG/SVG)
+RECIPE_CHART_ENGINE = config('RECIPE_CHART_ENGINE', default='svg')
+# Load the chart engine at startup (pair with gunicorn --preload) instead of
+# on the first chart request
+RECIPE_CHART_WARMUP = config('RECIPE_CHART_WARMUP', default=False, cast=bool)
+# Seconds browsers may reuse a chart image without revalidating (Cache-Control:
+# private, max-age); after that the ETag / Last-Modified make the check cheap
+RECIPE_CHART_MAX_AGE = config('RECIPE_CHART_MAX_AGE', default=60, cast=int)
+# matplotlib chart size in inches ("WIDTHxHEIGHT"), resolution, and whether
+# PNGs are re-encoded with a palette (several times smaller, ~2x render time)
+RECIPE_CHART_SIZE = config('RECIPE_CHART_SIZE', default='10x6')
+RECIPE_CHART_DPI = config('RECIPE_CHART_DPI', default=100, cast=int)
+RECIPE_CHART_PNG_OPTIMIZE = config('RECIPE_CHART_PNG_OPTIMIZE', default=False, cast=bool)
+# Chart workers per web process (recipes.chart_service): pre-warmed worker
+# processes for matplotlib, threads for the SVG engine
+RECIPE_CHART_WORKERS = config('RECIPE_CHART_WORKERS', default=2, cast=int)
+# Charts queued or drawing per web process before a "chart pending" image is
+# returned instead, and seconds a chart request waits for its drawing
+RECIPE_CHART_QUEUE = config('RECIPE_CHART_QUEUE', default=8, cast=int)
+RECIPE_CHART_TIMEOUT = config('RECIPE_CHART_TIMEOUT', default=5.0, cast=float)
+
+# Bearer token for /recipes/metrics/fragments/ (empty: staff logins only)
+RECIPE_METRICS_TOKEN = config('RECIPE_METRICS_TOKEN', default='')
+
 # Authentication settings
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'sales:home'
@@ -15,6 +15,9 @@ urlpatterns = [
     # Project includes the recipes app (for '/recipes/')
     path('recipes/', include('recipes.urls')), 
 
+    # Read-only JSON API (recipes.api)
+    path('api/', include('recipes.api_urls')),
+
     # Project defines the auth URLs directly
     path('login/', login_view, name='login'),
     path('logout/', logout_view, name='logout'),
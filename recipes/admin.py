@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Ingredient, Recipe, RecipeIngredient
+from .models import Ingredient, Recipe, RecipeIngredient, RecipeStats
 
 @admin.register(Ingredient)
 class IngredientAdmin(admin.ModelAdmin):
@@ -12,11 +12,27 @@ class RecipeIngredientInline(admin.TabularInline):
 
 @admin.register(Recipe)
 class RecipeAdmin(admin.ModelAdmin):
-    list_display = ("name", "cook_time_minutes", "created_at")
+    list_display = ("name", "cook_time_minutes", "ingredient_count", "created_at")
     search_fields = ("name", "description")
+    readonly_fields = ("ingredient_count", "ingredient_names")
     inlines = [RecipeIngredientInline]
 
 @admin.register(RecipeIngredient)
 class RecipeIngredientAdmin(admin.ModelAdmin):
     list_display = ("recipe", "ingredient", "quantity", "unit")
     list_select_related = ("recipe", "ingredient")
+
+@admin.register(RecipeStats)
+class RecipeStatsAdmin(admin.ModelAdmin):
+    # Maintained by signals / refresh_recipe_stats, so read-only here
+    list_display = ("kind", "key", "count")
+    list_filter = ("kind",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
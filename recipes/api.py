@@ -0,0 +1,212 @@
+# recipes/api.py
+"""
+Read-only JSON API (Django REST framework) for recipes and ingredients.
+
+    GET /api/recipes/           search filters as on the search page, plus
+                                ?fields=id,name,... and ?cursor=...
+    GET /api/recipes/<pk>/      one recipe (?fields= too)
+    GET /api/ingredients/       every ingredient, ?cursor=...
+
+Lists use the same (name, pk) keyset cursors as the HTML pages (ranked
+search hits, ?recipe_name=..., keep their relevance order and page by
+(search_rank, pk) instead) and a fast path: rows come from values_list() with only the requested columns, and
+ingredients from one query per page, so no DRF field objects run per row.
+The detail view goes through RecipeSerializer and returns the same shape.
+
+Responses carry an ETag. For recipes it's derived from the table's latest
+updated_at and row count before any rows are read, so a 304 costs a single
+aggregate query.
+"""
+
+import hashlib
+import json
+
+from django.db.models import Count, Max, Prefetch
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from rest_framework import serializers
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .forms import RecipeSearchForm
+from .models import Ingredient, Recipe, RecipeIngredient
+from .pagination import InvalidCursor, KeysetPaginator, get_page_size
+
+# Recipe fields a client can ask for; all of them by default
+RECIPE_FIELDS = (
+    "id", "name", "description", "cook_time_minutes", "difficulty", "pic",
+    "created_at", "updated_at", "ingredient_count", "ingredient_names", "ingredients",
+)
+# Formats datetimes exactly like the serializers do
+_datetime = serializers.DateTimeField()
+
+
+class IngredientLinkSerializer(serializers.ModelSerializer):
+    name = serializers.CharField(source="ingredient.name")
+
+    class Meta:
+        model = RecipeIngredient
+        fields = ["name", "quantity", "unit"]
+
+
+class RecipeSerializer(serializers.ModelSerializer):
+    """Reference serializer (detail view); accepts fields=[...] to trim."""
+
+    ingredients = IngredientLinkSerializer(source="recipeingredient_set", many=True, read_only=True)
+
+    class Meta:
+        model = Recipe
+        fields = list(RECIPE_FIELDS)
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in set(self.fields) - set(fields or self.fields):
+            self.fields.pop(name)
+
+
+def requested_fields(request):
+    """Validated ?fields= list (defaults to every field)."""
+    raw = request.query_params.get("fields")
+    if not raw:
+        return list(RECIPE_FIELDS)
+    fields = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = set(fields) - set(RECIPE_FIELDS)
+    if unknown or not fields:
+        raise ValidationError({"fields": f"Choose from {', '.join(RECIPE_FIELDS)}."})
+    return fields
+
+
+def recipe_rows(qs, fields, cursor, key="name", key_type=str):
+    """
+    Fast path: one keyset page of recipes as plain dicts with just these
+    fields, paged by (key, pk). Returns (rows, page).
+    """
+    columns = [name for name in fields if name not in ("id", "ingredients")]
+    # The paginator needs its key and pk whatever was asked for
+    rows = qs.values_list("pk", *dict.fromkeys([key, *columns]), named=True)
+    try:
+        page = KeysetPaginator(rows, get_page_size(), key=key, key_type=key_type).page(cursor)
+    except InvalidCursor:
+        raise NotFound("Invalid page cursor.")
+
+    ingredients = {}
+    if "ingredients" in fields and page.object_list:
+        links = (
+            RecipeIngredient.objects.filter(recipe_id__in=[row.pk for row in page])
+            .order_by("pk")
+            .values_list("recipe_id", "ingredient__name", "quantity", "unit")
+        )
+        for recipe_id, name, quantity, unit in links:
+            ingredients.setdefault(recipe_id, []).append({"name": name, "quantity": quantity, "unit": unit})
+
+    results = []
+    for row in page:
+        item = {}
+        for name in fields:
+            if name == "id":
+                item[name] = row.pk
+            elif name == "ingredients":
+                item[name] = ingredients.get(row.pk, [])
+            elif name in ("created_at", "updated_at"):
+                item[name] = _datetime.to_representation(getattr(row, name))
+            else:
+                item[name] = getattr(row, name)
+        results.append(item)
+    return results, page
+
+
+def page_links(request, page):
+    """Absolute next/previous URLs that keep the other query parameters."""
+    def link(cursor):
+        if cursor is None:
+            return None
+        params = request.query_params.copy()
+        params["cursor"] = cursor
+        return request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+    return {"next": link(page.next_cursor), "previous": link(page.previous_cursor)}
+
+
+class ConditionalAPIView(APIView):
+    """GET views that answer If-None-Match with 304 using a cheap ETag."""
+
+    def etag_for(self, request, *args, **kwargs):
+        """Quoted ETag computed before the heavy work, or None to skip."""
+        return None
+
+    def get(self, request, *args, **kwargs):
+        etag = self.etag_for(request, *args, **kwargs)
+        if etag:
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                return not_modified
+        response = self.build(request, *args, **kwargs)
+        if not etag:
+            # No cheap state to go on; hash what we send
+            body = json.dumps(response.data, sort_keys=True, default=str).encode()
+            etag = '"%s"' % hashlib.sha1(body).hexdigest()
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                return not_modified
+        response["ETag"] = etag
+        return response
+
+
+def recipes_state_etag(request, *extra):
+    """ETag from the recipe table's state plus the full request URL."""
+    state = Recipe.objects.aggregate(latest=Max("updated_at"), total=Count("pk"))
+    parts = [request.get_full_path(), state["latest"], state["total"], *extra]
+    return '"%s"' % hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+class RecipeListAPIView(ConditionalAPIView):
+    def etag_for(self, request):
+        return recipes_state_etag(request)
+
+    def build(self, request):
+        # Imported here: views.py is the search page's module
+        from .views import filter_recipes
+
+        fields = requested_fields(request)
+        form = RecipeSearchForm(request.query_params)
+        if not form.is_valid():
+            raise ValidationError(form.errors)
+        qs = filter_recipes(form.cleaned_data)
+        cursor = request.query_params.get("cursor")
+        text = form.cleaned_data.get("recipe_name")
+        if text:
+            # Best matches first, as on the search page: page by the
+            # search_rank filter_recipes() annotated, not by name
+            results, page = recipe_rows(qs, fields, cursor, key="search_rank", key_type=float)
+        else:
+            results, page = recipe_rows(qs, fields, cursor)
+        return Response({**page_links(request, page), "results": results})
+
+
+class RecipeDetailAPIView(ConditionalAPIView):
+    def etag_for(self, request, pk):
+        return recipes_state_etag(request, pk)
+
+    def build(self, request, pk):
+        fields = requested_fields(request)
+        qs = Recipe.objects.all()
+        if "ingredients" in fields:
+            qs = qs.prefetch_related(
+                Prefetch("recipeingredient_set", queryset=RecipeIngredient.objects.select_related("ingredient").order_by("pk"))
+            )
+        try:
+            recipe = qs.get(pk=pk)
+        except Recipe.DoesNotExist:
+            raise Http404("No such recipe.")
+        return Response(RecipeSerializer(recipe, fields=fields).data)
+
+
+class IngredientListAPIView(ConditionalAPIView):
+    def build(self, request):
+        rows = Ingredient.objects.values_list("pk", "name", named=True)
+        try:
+            page = KeysetPaginator(rows, get_page_size()).page(request.query_params.get("cursor"))
+        except InvalidCursor:
+            raise NotFound("Invalid page cursor.")
+        results = [{"id": row.pk, "name": row.name} for row in page]
+        return Response({**page_links(request, page), "results": results})
@@ -0,0 +1,12 @@
+# recipes/api_urls.py
+from django.urls import path
+
+from . import api
+
+app_name = 'api'
+
+urlpatterns = [
+    path('recipes/', api.RecipeListAPIView.as_view(), name='recipes'),
+    path('recipes/<int:pk>/', api.RecipeDetailAPIView.as_view(), name='recipe'),
+    path('ingredients/', api.IngredientListAPIView.as_view(), name='ingredients'),
+]
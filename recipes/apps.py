@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class RecipesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recipes'
+
+    def ready(self):
+        # Connect the signal handlers (search index upkeep)
+        from . import signals  # noqa: F401
+
+        # Optionally load the chart engine now instead of on the first chart
+        if getattr(settings, "RECIPE_CHART_WARMUP", False):
+            from .charts import warm_up_charts
+            warm_up_charts()
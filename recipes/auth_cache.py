@@ -0,0 +1,54 @@
+# recipes/auth_cache.py
+"""
+Cached users for logged-in pages.
+
+Every page checks request.user, which normally costs a user query per
+request. CachedModelBackend keeps the User in the "sessions" cache, so with
+a cached session engine the warm path touches neither the session table
+nor the user table. Signal handlers drop the entry whenever the user is
+saved or deleted (password change, deactivation, last_login...).
+
+Enable with RECIPE_CACHE_USERS=True; see settings.py.
+"""
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+USER_CACHE_ALIAS = "sessions"
+
+
+def _cache():
+    return caches[USER_CACHE_ALIAS]
+
+
+def user_key(user_id):
+    return f"auth-user:{user_id}"
+
+
+def forget_user(user_id):
+    """Drops the cached copy of this user (called when the user is written)."""
+    _cache().delete(user_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend whose get_user() (run once per request) reads the cache first."""
+
+    def get_user(self, user_id):
+        key = user_key(user_id)
+        user = _cache().get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                _cache().set(key, user, getattr(settings, "RECIPE_USER_CACHE_TIMEOUT", 300))
+        return user
+
+    async def aget_user(self, user_id):
+        """get_user() for async views (request.auser())."""
+        key = user_key(user_id)
+        user = await _cache().aget(key)
+        if user is None:
+            user = await super().aget_user(user_id)
+            if user is not None:
+                await _cache().aset(key, user, getattr(settings, "RECIPE_USER_CACHE_TIMEOUT", 300))
+        return user
@@ -0,0 +1,86 @@
+# recipes/chart_cache.py
+"""
+Cache for rendered search charts.
+
+Entries are keyed by chart type and variant (engine + image format) plus a
+fingerprint of the filtered result set (row count, highest pk and latest
+updated_at, from one aggregate query), so the same search never re-plots.
+Any write that can change a chart changes the fingerprint: saves move
+updated_at (bulk link writes through touch_recipes()), deletions the count
+and inserts the highest pk. Nothing needs invalidating; old entries simply
+age out of the "charts" cache through its TIMEOUT / MAX_ENTRIES settings.
+
+The key is derived from the database alone, so every worker computes the
+same one for the same data, whichever cache backend each of them uses
+(like api.recipes_state_etag()).
+
+Charts of every recipe (qs=None) are drawn from RecipeStats, so their
+fingerprint also covers that table: rebuilding it recreates its rows.
+
+The same key doubles as the chart endpoint's ETag, and the latest
+updated_at is its Last-Modified.
+"""
+
+import hashlib
+from collections import namedtuple
+
+from django.core.cache import caches
+from django.db.models import Count, Max
+
+from .models import Recipe, RecipeStats
+
+CHART_CACHE_ALIAS = "charts"
+
+# key: cache key, etag: quoted ETag, last_modified: epoch seconds
+ChartState = namedtuple("ChartState", ["key", "etag", "last_modified"])
+
+
+def _cache():
+    return caches[CHART_CACHE_ALIAS]
+
+
+def result_fingerprint(qs):
+    """
+    Short hash of the result set: row count, highest pk and latest
+    updated_at, computed by the database (no pk is loaded into Python).
+    Returns (hash, latest updated_at as epoch seconds or 0).
+    """
+    # An edited row moves updated_at, a deleted one the count and a new one
+    # the highest pk; the ordering is irrelevant to an aggregate
+    state = qs.order_by().aggregate(total=Count("pk"), last_pk=Max("pk"), latest=Max("updated_at"))
+    latest = state["latest"]
+    digest = hashlib.sha1(repr((state["total"], state["last_pk"], latest)).encode())
+    return digest.hexdigest(), int(latest.timestamp()) if latest else 0
+
+
+def chart_state(chart_type, qs, variant="png"):
+    """Cache key, ETag and Last-Modified for one chart of a result set (None = every recipe)."""
+    if qs is None:
+        fingerprint, latest = result_fingerprint(Recipe.objects.all())
+        stats = RecipeStats.objects.aggregate(total=Count("pk"), last_pk=Max("pk"))
+        fingerprint = f"all:{fingerprint}:{stats['total']}:{stats['last_pk']}"
+    else:
+        fingerprint, latest = result_fingerprint(qs)
+    key = f"recipe-chart:{chart_type}:{variant}:{fingerprint}"
+    etag = '"%s"' % hashlib.sha1(key.encode()).hexdigest()
+    return ChartState(key, etag, latest)
+
+
+def store_chart(state, chart):
+    """Caches a chart drawn after its request gave up waiting (see chart_service)."""
+    _cache().set(state.key, chart)
+
+
+async def aget_or_render_chart(state, render):
+    """
+    Returns the cached chart for this state, awaiting render() (a coroutine
+    function) and caching its result on a miss. Failed renders (None) are
+    not cached.
+    """
+    cache = _cache()
+    chart = await cache.aget(state.key)
+    if chart is None:
+        chart = await render()
+        if chart is not None:
+            await cache.aset(state.key, chart)
+    return chart
@@ -0,0 +1,203 @@
+# recipes/chart_service.py
+"""
+Chart rendering service used by the async chart view.
+
+Each engine gets a pool of RECIPE_CHART_WORKERS workers. pyplot keeps
+global state, so matplotlib (an "isolated" engine) draws in worker
+processes that import it and load its fonts once, at start-up; the SVG
+engine is cheap and thread-safe and draws on threads.
+
+The pool is bounded: at most RECIPE_CHART_QUEUE charts may be queued or
+drawing per web process, and a request waits at most RECIPE_CHART_TIMEOUT
+seconds. Past either limit render() raises ChartPending and the view
+answers 202 (with Retry-After) and a small "chart pending" image instead of
+making the search page wait. A chart that times out is still drawn, and on_late_result
+(e.g. storing it in the chart cache) gets it, so the retry is a cache hit.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+from django.conf import settings
+
+from .charts import CHART_ENGINES, achart_data, get_chart_engine
+
+logger = logging.getLogger(__name__)
+
+# Shown in place of a chart that isn't ready (sent as 202 + Retry-After,
+# which is what search.html retries on)
+PENDING_WIDTH, PENDING_HEIGHT = 640, 120
+PENDING_SVG = (
+    f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {PENDING_WIDTH} {PENDING_HEIGHT}" '
+    f'width="{PENDING_WIDTH}" height="{PENDING_HEIGHT}" font-family="sans-serif">'
+    '<rect width="100%" height="100%" fill="#f4f4f4"/>'
+    f'<text x="{PENDING_WIDTH / 2}" y="{PENDING_HEIGHT / 2 + 5}" text-anchor="middle" font-size="16" fill="#555">'
+    "Chart pending… it will appear in a moment.</text></svg>"
+).encode("utf-8")
+
+
+class ChartPending(Exception):
+    """The pool is full, or the chart wasn't ready within the timeout."""
+
+
+def _start_worker(engine_name):
+    # Runs once per worker process: import matplotlib and load fonts now,
+    # not during the first job
+    CHART_ENGINES[engine_name]().warm_up()
+
+
+def _render_in_worker(engine_name, chart_type, data, image_format):
+    return CHART_ENGINES[engine_name]().render(chart_type, data, image_format)
+
+
+class ChartService:
+    """Bounded pool of chart workers for one engine (see module docstring)."""
+
+    def __init__(self, engine_name, workers=2, queue_size=8, timeout=5.0):
+        self.engine_name = engine_name
+        self.isolated = getattr(CHART_ENGINES[engine_name], "isolated", False)
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._executor = None
+        self._in_flight = 0
+
+    @property
+    def in_flight(self):
+        """Charts queued or drawing right now."""
+        return self._in_flight
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                if self.isolated:
+                    self._executor = ProcessPoolExecutor(
+                        self.workers, mp_context=get_context("spawn"),
+                        initializer=_start_worker, initargs=(self.engine_name,),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="recipe-chart")
+            return self._executor
+
+    def _reset(self, broken):
+        # A worker process died (crash, OOM kill); start a fresh pool next time
+        if broken is None:
+            return
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def submit(self, engine, chart_type, data, image_format):
+        """
+        Queues one chart and returns its concurrent.futures.Future. Raises
+        ChartPending when queue_size charts are already queued or drawing.
+        """
+        with self._lock:
+            if self._in_flight >= self.queue_size:
+                raise ChartPending("Chart pool is full.")
+            self._in_flight += 1
+        try:
+            executor = self._pool()
+            if self.isolated:
+                # Only the engine name crosses the process boundary
+                try:
+                    future = executor.submit(_render_in_worker, self.engine_name, chart_type, data, image_format)
+                except BrokenProcessPool:
+                    self._reset(executor)
+                    future = self._pool().submit(_render_in_worker, self.engine_name, chart_type, data, image_format)
+            else:
+                future = executor.submit(engine.render, chart_type, data, image_format)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def render(self, engine, chart_type, data, image_format, on_late_result=None):
+        """Chart bytes, or ChartPending if it isn't ready within timeout."""
+        future = self.submit(engine, chart_type, data, image_format)
+        try:
+            # shield(): a timeout must not cancel the job itself
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.timeout)
+        except asyncio.TimeoutError:
+            if on_late_result is not None:
+                future.add_done_callback(lambda done: _deliver(done, on_late_result))
+            raise ChartPending("Chart is still being drawn.")
+        except BrokenProcessPool:
+            self._reset(self._executor)
+            raise ChartPending("Chart worker died; retrying with a fresh pool.")
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _deliver(future, callback):
+    if not future.cancelled() and future.exception() is None and future.result() is not None:
+        callback(future.result())
+
+
+# engine name -> ChartService, created on first use
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_chart_service(engine_name):
+    """The shared ChartService for this engine, configured from settings."""
+    with _services_lock:
+        if engine_name not in _services:
+            _services[engine_name] = ChartService(
+                engine_name,
+                workers=getattr(settings, "RECIPE_CHART_WORKERS", 2),
+                queue_size=getattr(settings, "RECIPE_CHART_QUEUE", 8),
+                timeout=getattr(settings, "RECIPE_CHART_TIMEOUT", 5.0),
+            )
+        return _services[engine_name]
+
+
+async def arender_chart(chart_type, qs, image_format=None, engine=None, on_late_result=None):
+    """
+    Renders one search chart as image bytes: the aggregates come from the
+    async ORM and the engine's ChartService draws. Returns None when there is nothing
+    to plot or drawing failed; raises ChartPending when the pool is busy.
+    qs=None charts every recipe from the RecipeStats summary rows.
+    """
+    # Not at module level: chart worker processes import this module
+    # without setting Django up, and stats needs the models
+    from .stats import astats_chart_data
+
+    engine = engine or get_chart_engine()
+    image_format = image_format or engine.formats[0]
+    data = await (astats_chart_data(chart_type) if qs is None else achart_data(chart_type, qs))
+    if data is None:
+        return None
+    service = get_chart_service(engine.name)
+    try:
+        return await service.render(engine, chart_type, data, image_format, on_late_result)
+    except ChartPending:
+        raise
+    except Exception:
+        # If something went wrong during plotting
+        logger.exception("Error generating chart %s", chart_type)
+        return None
+
+
+def shutdown_chart_services():
+    """Stops every pool (tests, or a worker shutting down)."""
+    with _services_lock:
+        services = list(_services.values())
+        _services.clear()
+    for service in services:
+        service.shutdown()
@@ -0,0 +1,434 @@
+# recipes/charts.py
+"""
+Chart engines for the three search charts.
+
+Each chart is computed first as plain aggregates (``chart_data``), then drawn
+by an engine:
+
+- SVGChartEngine: hand-built SVG, no third-party imports (default)
+- MatplotlibChartEngine: PNG or SVG via matplotlib's Figure API, imported
+  on first use
+
+Pick one with the RECIPE_CHART_ENGINE setting ("svg" or "matplotlib").
+"""
+
+import math
+import threading
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Case, Count, IntegerField, Value, When, Window
+from django.db.models.functions import TruncDate
+
+# Chart ids used by RecipeSearchForm.chart_type
+DIFFICULTY_CHART = "#1"
+COOK_TIME_CHART = "#2"
+GROWTH_CHART = "#3"
+
+# Same palette matplotlib uses by default
+COLORS = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b"]
+
+
+# Aggregates
+
+# Cook-time buckets for chart #2: (label, upper bound in minutes or None)
+COOK_TIME_BUCKETS = [
+    ("≤ 30 min", 30),
+    ("31–60 min", 60),
+    ("> 60 min", None),
+]
+
+
+def cook_time_bucket(minutes):
+    """Index into COOK_TIME_BUCKETS for a cook time."""
+    for i, (_, limit) in enumerate(COOK_TIME_BUCKETS):
+        if limit is None or minutes <= limit:
+            return i
+
+
+def cook_time_bucket_expression():
+    """cook_time_bucket() as a CASE/WHEN expression on cook_time_minutes."""
+    return Case(
+        *[
+            When(cook_time_minutes__lte=limit, then=Value(i))
+            for i, (_, limit) in enumerate(COOK_TIME_BUCKETS) if limit is not None
+        ],
+        default=Value(len(COOK_TIME_BUCKETS) - 1),
+        output_field=IntegerField(),
+    )
+
+
+def chart_rows(chart_type, qs):
+    """
+    The aggregate query behind each chart and a function turning one of its
+    rows into a data point, or None for an unknown chart type. Everything is
+    aggregated in the database, so only O(buckets) rows come back no matter
+    how many recipes match:
+
+    - "#1": (difficulty, count)
+    - "#2": (bucket label, count) (empty buckets dropped)
+    - "#3": (day, running total)
+    """
+    # Drop the result ordering, it would end up in the GROUP BY
+    qs = qs.order_by()
+
+    if chart_type == DIFFICULTY_CHART:
+        # Count recipes per difficulty
+        rows = qs.values("difficulty").annotate(count=Count("pk")).order_by("difficulty")
+        return rows, lambda row: (row["difficulty"], row["count"])
+
+    if chart_type == COOK_TIME_CHART:
+        # Number each bucket with CASE/WHEN, then count per bucket
+        rows = (
+            qs.filter(cook_time_minutes__isnull=False)
+            .annotate(bucket=cook_time_bucket_expression()).values("bucket")
+            .annotate(count=Count("pk")).order_by("bucket")
+        )
+        # Buckets with no recipes never come back, so the pie stays clean
+        return rows, lambda row: (COOK_TIME_BUCKETS[row["bucket"]][0], row["count"])
+
+    if chart_type == GROWTH_CHART:
+        # Running total per creation day: COUNT(*) OVER (ORDER BY day) counts
+        # every recipe up to and including that day; DISTINCT keeps one row per day
+        day = TruncDate("created_at")
+        rows = (
+            qs.filter(created_at__isnull=False)
+            .annotate(day=day, total=Window(Count("pk"), order_by=day.asc()))
+            .values_list("day", "total").distinct().order_by("day")
+        )
+        return rows, tuple
+
+    # Unknown chart type
+    return None
+
+
+def chart_data(chart_type, qs):
+    """Data points behind a chart (see chart_rows), or None if there is nothing to plot."""
+    query = chart_rows(chart_type, qs)
+    if query is None:
+        return None
+    rows, point = query
+    return [point(row) for row in rows] or None
+
+
+async def achart_data(chart_type, qs):
+    """chart_data() for async views (async ORM iteration)."""
+    query = chart_rows(chart_type, qs)
+    if query is None:
+        return None
+    rows, point = query
+    return [point(row) async for row in rows] or None
+
+
+# SVG engine
+
+def _nice_step(max_value, ticks=5):
+    """A 1/2/5 x 10^n tick step (at least 1) covering max_value in ~ticks steps."""
+    raw = max(max_value / ticks, 1)
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for factor in (1, 2, 5, 10):
+        if raw <= factor * magnitude:
+            return factor * magnitude
+    return 10 * magnitude
+
+
+class SVGChartEngine:
+    """Draws the charts as standalone SVG documents."""
+
+    name = "svg"
+    formats = ("svg",)
+    width, height = 640, 400
+    # Plot area margins: left, top, right, bottom
+    margin = (60, 50, 20, 95)
+
+    def warm_up(self):
+        """Nothing to preload."""
+
+    def render(self, chart_type, data, image_format="svg"):
+        draw = {
+            DIFFICULTY_CHART: self._bar,
+            COOK_TIME_CHART: self._pie,
+            GROWTH_CHART: self._line,
+        }[chart_type]
+        body = draw(data)
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {self.width} {self.height}" '
+            f'width="{self.width}" height="{self.height}" font-family="sans-serif" font-size="12">'
+            f'<rect width="100%" height="100%" fill="#fff"/>{body}</svg>'
+        ).encode("utf-8")
+
+    # Helpers
+
+    def _text(self, x, y, text, anchor="middle", size=12, extra=""):
+        return (
+            f'<text x="{x:.1f}" y="{y:.1f}" text-anchor="{anchor}" font-size="{size}"{extra}>'
+            f"{escape(str(text))}</text>"
+        )
+
+    def _title(self, title):
+        return self._text(self.width / 2, 28, title, size=16)
+
+    def _plot_box(self):
+        left, top, right, bottom = self.margin
+        return left, top, self.width - right, self.height - bottom
+
+    def _axes(self, max_value, x_label, y_label):
+        """Axes, horizontal grid and y ticks; returns the y scale function."""
+        x0, y0, x1, y1 = self._plot_box()
+        step = _nice_step(max_value)
+        top_value = step * math.ceil(max_value / step)
+
+        def scale_y(value):
+            return y1 - (value / top_value) * (y1 - y0)
+
+        parts = []
+        value = 0
+        while value <= top_value:
+            y = scale_y(value)
+            parts.append(f'<line x1="{x0}" y1="{y:.1f}" x2="{x1}" y2="{y:.1f}" stroke="#ddd"/>')
+            parts.append(self._text(x0 - 8, y + 4, value, anchor="end"))
+            value += step
+        parts.append(f'<line x1="{x0}" y1="{y1}" x2="{x1}" y2="{y1}" stroke="#333"/>')
+        parts.append(f'<line x1="{x0}" y1="{y0}" x2="{x0}" y2="{y1}" stroke="#333"/>')
+        parts.append(self._text((x0 + x1) / 2, self.height - 10, x_label))
+        parts.append(self._text(
+            18, (y0 + y1) / 2, y_label, extra=f' transform="rotate(-90 18 {(y0 + y1) / 2:.1f})"'
+        ))
+        return scale_y, "".join(parts)
+
+    # Charts
+
+    def _bar(self, data):
+        # Chart #1: Bar chart for difficulty
+        x0, _, x1, y1 = self._plot_box()
+        scale_y, axes = self._axes(max(count for _, count in data), "Difficulty Level", "Number of Recipes")
+        slot = (x1 - x0) / len(data)
+        parts = [self._title("Recipes by Difficulty"), axes]
+        for i, (label, count) in enumerate(data):
+            x = x0 + slot * i + slot * 0.1
+            y = scale_y(count)
+            parts.append(
+                f'<rect x="{x:.1f}" y="{y:.1f}" width="{slot * 0.8:.1f}" height="{y1 - y:.1f}" '
+                f'fill="{COLORS[i % len(COLORS)]}"/>'
+            )
+            parts.append(self._text(x + slot * 0.4, y1 + 18, label))
+        return "".join(parts)
+
+    def _pie(self, data):
+        # Chart #2: Pie chart for cooking time
+        cx, cy, r = self.width / 2, self.height / 2 + 15, 140
+        total = sum(count for _, count in data)
+        parts = [self._title("Cooking Time Distribution")]
+        # Start at 12 o'clock and go counter-clockwise, like matplotlib's startangle=90
+        angle = 90.0
+        for i, (label, count) in enumerate(data):
+            color = COLORS[i % len(COLORS)]
+            sweep = 360.0 * count / total
+            if count == total:
+                parts.append(f'<circle cx="{cx}" cy="{cy}" r="{r}" fill="{color}"/>')
+            else:
+                start, end = math.radians(angle), math.radians(angle + sweep)
+                sx, sy = cx + r * math.cos(start), cy - r * math.sin(start)
+                ex, ey = cx + r * math.cos(end), cy - r * math.sin(end)
+                large = 1 if sweep > 180 else 0
+                parts.append(
+                    f'<path d="M{cx},{cy} L{sx:.1f},{sy:.1f} A{r},{r} 0 {large} 0 {ex:.1f},{ey:.1f} Z" '
+                    f'fill="{color}" stroke="#fff"/>'
+                )
+            # Percentage inside the slice, label just outside it
+            middle = math.radians(angle + sweep / 2)
+            dx, dy = math.cos(middle), -math.sin(middle)
+            parts.append(self._text(cx + dx * r * 0.6, cy + dy * r * 0.6 + 4, f"{100.0 * count / total:.1f}%"))
+            parts.append(self._text(
+                cx + dx * (r + 14), cy + dy * (r + 14) + 4, label, anchor="start" if dx >= 0 else "end"
+            ))
+            angle += sweep
+        return "".join(parts)
+
+    def _line(self, data):
+        # Chart #3: Line chart for recipe growth
+        x0, _, x1, y1 = self._plot_box()
+        scale_y, axes = self._axes(data[-1][1], "Date Added", "Total Number of Recipes")
+        first, last = data[0][0].toordinal(), data[-1][0].toordinal()
+        span = (last - first) or 1
+
+        def scale_x(day):
+            if last == first:
+                return (x0 + x1) / 2
+            return x0 + 10 + (day.toordinal() - first) / span * (x1 - x0 - 20)
+
+        points = [(scale_x(day), scale_y(total)) for day, total in data]
+        parts = [self._title("Recipe Collection Growth Over Time"), axes]
+        parts.append(
+            '<polyline fill="none" stroke="%s" stroke-width="2" points="%s"/>'
+            % (COLORS[0], " ".join(f"{x:.1f},{y:.1f}" for x, y in points))
+        )
+        parts.extend(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="4" fill="{COLORS[0]}"/>' for x, y in points)
+        # Up to six date labels, rotated so they don't overlap
+        every = max(1, math.ceil(len(data) / 6))
+        for (day, _), (x, _) in list(zip(data, points))[::every]:
+            parts.append(self._text(
+                x, y1 + 14, day.strftime("%Y-%m-%d"), anchor="end",
+                extra=f' transform="rotate(-45 {x:.1f} {y1 + 14:.1f})"',
+            ))
+        return "".join(parts)
+
+
+# Matplotlib engine
+
+# (Figure, FigureCanvasAgg) once imported (see load_matplotlib)
+_matplotlib = None
+
+# Reused figures: (chart type, size, dpi) -> (figure, canvas, axes). Only one
+# thread may draw on them at a time (the chart service gives matplotlib
+# worker processes, so in practice each process draws alone anyway)
+_figures = {}
+_figures_lock = threading.Lock()
+
+# Fixed subplot margins per chart (fractions of the figure): no
+# tight_layout()/bbox_inches="tight" passes on every render
+CHART_MARGINS = {
+    DIFFICULTY_CHART: {"left": 0.08, "right": 0.97, "top": 0.92, "bottom": 0.1},
+    COOK_TIME_CHART: {"left": 0.05, "right": 0.95, "top": 0.92, "bottom": 0.05},
+    # Room for the rotated date labels
+    GROWTH_CHART: {"left": 0.08, "right": 0.97, "top": 0.92, "bottom": 0.2},
+}
+
+
+def load_matplotlib():
+    """
+    Imports matplotlib's Figure and Agg canvas on first call and returns
+    them. No pyplot: no global figure manager and no backend switching, and
+    list/detail/login/admin requests never pay for the import.
+    """
+    global _matplotlib
+    if _matplotlib is None:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        _matplotlib = (Figure, FigureCanvasAgg)
+    return _matplotlib
+
+
+def chart_size():
+    """(width, height) in inches from RECIPE_CHART_SIZE, e.g. "10x6"."""
+    width, height = str(getattr(settings, "RECIPE_CHART_SIZE", "10x6")).lower().split("x")
+    return float(width), float(height)
+
+
+def optimize_png(image):
+    """
+    Re-encodes a PNG with a 256-colour palette and zlib's best effort.
+    Charts use a handful of flat colours, so this is typically several
+    times smaller with no visible change.
+    """
+    from PIL import Image
+
+    with Image.open(BytesIO(image)) as png:
+        palette = png.convert("RGB").quantize(colors=256)
+    buf = BytesIO()
+    palette.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+class MatplotlibChartEngine:
+    """
+    The original matplotlib charts, drawn with the object-oriented API
+    (Figure + FigureCanvasAgg). Each chart type keeps one figure that is
+    cleared and redrawn. Size, DPI and PNG optimisation come from the
+    RECIPE_CHART_SIZE, RECIPE_CHART_DPI and RECIPE_CHART_PNG_OPTIMIZE
+    settings. matplotlib is only imported on first render.
+    """
+
+    name = "matplotlib"
+    formats = ("png", "svg")
+    # Draw in worker processes (see chart_service), not threads
+    isolated = True
+
+    def __init__(self, size=None, dpi=None, optimize=None):
+        self.size = size or chart_size()
+        self.dpi = dpi or getattr(settings, "RECIPE_CHART_DPI", 100)
+        if optimize is None:
+            optimize = getattr(settings, "RECIPE_CHART_PNG_OPTIMIZE", False)
+        self.optimize = optimize
+
+    def warm_up(self):
+        """Imports matplotlib and draws a throwaway chart (loads fonts)."""
+        self.render(DIFFICULTY_CHART, [("warm-up", 1)])
+
+    def _figure(self, chart_type):
+        """The reusable (figure, canvas, axes) for this chart type, cleared."""
+        key = (chart_type, self.size, self.dpi)
+        if key not in _figures:
+            Figure, FigureCanvasAgg = load_matplotlib()
+            fig = Figure(figsize=self.size, dpi=self.dpi)
+            canvas = FigureCanvasAgg(fig)
+            ax = fig.add_subplot()
+            fig.subplots_adjust(**CHART_MARGINS[chart_type])
+            _figures[key] = (fig, canvas, ax)
+        fig, canvas, ax = _figures[key]
+        ax.clear()
+        return fig, canvas, ax
+
+    def render(self, chart_type, data, image_format="png"):
+        with _figures_lock:
+            fig, canvas, ax = self._figure(chart_type)
+            labels = [label for label, _ in data]
+            values = [value for _, value in data]
+
+            # Chart #1: Bar chart for difficulty
+            if chart_type == DIFFICULTY_CHART:
+                ax.bar(labels, values, color=COLORS[:3])
+                ax.set_xlabel("Difficulty Level")
+                ax.set_ylabel("Number of Recipes")
+                ax.set_title("Recipes by Difficulty")
+
+            # Chart #2: Pie chart for cooking time
+            elif chart_type == COOK_TIME_CHART:
+                ax.pie(values, labels=labels, autopct="%1.1f%%", startangle=90)
+                ax.set_title("Cooking Time Distribution")
+                # Make it a circle
+                ax.axis("equal")
+
+            # Chart #3: Line chart for recipe growth
+            elif chart_type == GROWTH_CHART:
+                ax.plot(labels, values, marker="o", linestyle="-")
+                ax.set_xlabel("Date Added")
+                ax.set_ylabel("Total Number of Recipes")
+                ax.set_title("Recipe Collection Growth Over Time")
+                # Rotate date labels so they don't overlap
+                for label in ax.get_xticklabels():
+                    label.set_rotation(45)
+                    label.set_horizontalalignment("right")
+
+            # Save into a memory buffer
+            buf = BytesIO()
+            if image_format == "png":
+                canvas.print_png(buf)
+            else:
+                fig.savefig(buf, format=image_format, dpi=self.dpi)
+            image = buf.getvalue()
+        if image_format == "png" and self.optimize:
+            image = optimize_png(image)
+        return image
+
+
+CHART_ENGINES = {
+    SVGChartEngine.name: SVGChartEngine,
+    MatplotlibChartEngine.name: MatplotlibChartEngine,
+}
+
+
+def get_chart_engine():
+    """Engine selected by the RECIPE_CHART_ENGINE setting."""
+    return CHART_ENGINES[getattr(settings, "RECIPE_CHART_ENGINE", "svg")]()
+
+
+def warm_up_charts():
+    """
+    Preloads the selected engine (matplotlib import + fonts). Called from
+    RecipesConfig.ready() when RECIPE_CHART_WARMUP is on, so pre-forked
+    workers (gunicorn --preload) share the loaded modules.
+    """
+    get_chart_engine().warm_up()
+
@@ -0,0 +1,119 @@
+# recipes/exports.py
+"""
+Streaming exports of search results (CSV and NDJSON).
+
+Rows are read with .iterator(chunk_size=...), so only one chunk of recipes
+is in memory at a time; Django runs the ingredient prefetch once per chunk
+instead of once per recipe. Each chunk is turned into text and handed to
+StreamingHttpResponse as it is produced.
+
+Under ASGI the view uses the async generators (acsv_lines, andjson_lines)
+instead, which read the same chunks through .aiterator(): Django would
+otherwise buffer a sync generator's whole output before sending a byte.
+"""
+
+import csv
+import json
+
+from django.conf import settings
+from django.db.models import Prefetch
+
+from .models import RecipeIngredient
+
+CSV_HEADER = ["id", "name", "cook_time_minutes", "difficulty", "created_at", "description", "ingredients"]
+
+
+def get_chunk_size():
+    return getattr(settings, "RECIPE_EXPORT_CHUNK_SIZE", 500)
+
+
+def _with_links(qs):
+    """qs trimmed to the exported columns, prefetching ingredient rows."""
+    links = RecipeIngredient.objects.select_related("ingredient").only(
+        "recipe_id", "quantity", "unit", "ingredient__name",
+    )
+    qs = qs.only("pk", "name", "cook_time_minutes", "difficulty", "created_at", "description")
+    return qs.prefetch_related(Prefetch("recipeingredient_set", queryset=links, to_attr="links"))
+
+
+def iter_recipes(qs):
+    """Recipes of qs with their ingredient rows, one chunk at a time."""
+    return _with_links(qs).iterator(chunk_size=get_chunk_size())
+
+
+def aiter_recipes(qs):
+    """iter_recipes() for async generators (async ORM, same chunks)."""
+    return _with_links(qs).aiterator(chunk_size=get_chunk_size())
+
+
+def _ingredients(recipe):
+    return [
+        {"name": link.ingredient.name, "quantity": link.quantity, "unit": link.unit}
+        for link in recipe.links
+    ]
+
+
+class Echo:
+    """File-like object whose write() returns the line, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_row(writer, recipe):
+    ingredients = "; ".join(
+        " ".join(str(part) for part in (item["name"], item["quantity"], item["unit"]) if part != "")
+        for item in _ingredients(recipe)
+    )
+    return writer.writerow([
+        recipe.pk, recipe.name, recipe.cook_time_minutes, recipe.difficulty,
+        recipe.created_at.isoformat() if recipe.created_at else "",
+        recipe.description, ingredients,
+    ])
+
+
+def csv_lines(qs):
+    """CSV text for qs; ingredients as "name quantity unit; ..."."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    for recipe in iter_recipes(qs):
+        yield _csv_row(writer, recipe)
+
+
+async def acsv_lines(qs):
+    """csv_lines() as an async generator."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    async for recipe in aiter_recipes(qs):
+        yield _csv_row(writer, recipe)
+
+
+def _ndjson_line(recipe):
+    return json.dumps({
+        "id": recipe.pk,
+        "name": recipe.name,
+        "cook_time_minutes": recipe.cook_time_minutes,
+        "difficulty": recipe.difficulty,
+        "created_at": recipe.created_at.isoformat() if recipe.created_at else None,
+        "description": recipe.description,
+        "ingredients": _ingredients(recipe),
+    }) + "\n"
+
+
+def ndjson_lines(qs):
+    """One JSON object per line for qs."""
+    for recipe in iter_recipes(qs):
+        yield _ndjson_line(recipe)
+
+
+async def andjson_lines(qs):
+    """ndjson_lines() as an async generator."""
+    async for recipe in aiter_recipes(qs):
+        yield _ndjson_line(recipe)
+
+
+# format -> (line generator, async line generator, content type, file extension)
+EXPORT_FORMATS = {
+    "csv": (csv_lines, acsv_lines, "text/csv; charset=utf-8", "csv"),
+    "ndjson": (ndjson_lines, andjson_lines, "application/x-ndjson", "ndjson"),
+}
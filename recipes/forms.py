@@ -9,6 +9,12 @@ CHART_CHOICES = (
     ("#3", "Line — Recipe Growth Over Time"),
 )
 
+# Choices for how several ingredient terms are combined
+INGREDIENT_MATCH_CHOICES = (
+    ("any", "Any of them"),
+    ("all", "All of them"),
+)
+
 # Choices for the difficulty filter dropdown
 DIFFICULTY_CHOICES = (
     ("", "All"), 
@@ -37,6 +43,14 @@ class RecipeSearchForm(forms.Form):
         widget=forms.TextInput(attrs={"placeholder": "e.g., tomato, cheese", "class": "form-control"})
     )
 
+    # Match recipes with any (OR) or all (AND) of the ingredients
+    ingredients_match = forms.ChoiceField(
+        choices=INGREDIENT_MATCH_CHOICES,
+        required=False,
+        label="Ingredient Match",
+        widget=forms.Select(attrs={"class": "form-select"})
+    )
+
     # Filter by max cooking time (optional)
     max_cook_time = forms.IntegerField(
         required=False,
@@ -0,0 +1,136 @@
+# recipes/fragment_cache.py
+"""
+Cache for rendered recipe fragments (the detail body, the list cards).
+
+Keys are ``recipe-fragment:{fragment}:{pk}:{version}`` where the version is
+the recipe's updated_at in microseconds, so an edited recipe simply misses
+and its old entries age out of the "fragments" cache. Changes that don't go
+through Recipe.save() (ingredient links, ingredient renames) call
+touch_recipes(), which moves updated_at forward in one UPDATE.
+
+Hits and misses are counted per fragment in the same cache, so
+fragment_stats() sees every worker once the cache is shared.
+
+A page with many fragments (the list's cards) should look them all up at
+once with prefetch_fragments(): one get_many() for the page and one counter
+update per outcome, instead of a lookup and a counter bump per card. The
+{% recipefragment %} tag then only goes back to the cache to store a miss.
+"""
+
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+FRAGMENT_CACHE_ALIAS = "fragments"
+COUNTER_KEY = "recipe-fragment-stats:{fragment}:{outcome}"
+# Template context name of a page's PrefetchedFragments
+PREFETCHED_CONTEXT = "recipe_fragments"
+
+# Fragments rendered through the {% recipefragment %} tag
+FRAGMENTS = ("detail", "card")
+
+
+def _cache():
+    return caches[FRAGMENT_CACHE_ALIAS]
+
+
+def fragment_key(fragment, recipe):
+    """Cache key for one fragment of one recipe version (None if unversioned)."""
+    updated_at = getattr(recipe, "updated_at", None)
+    if recipe.pk is None or updated_at is None:
+        return None
+    version = int(updated_at.timestamp() * 1_000_000)
+    return f"recipe-fragment:{fragment}:{recipe.pk}:{version}"
+
+
+def _count(fragment, outcome, n=1):
+    if not n:
+        return
+    key = COUNTER_KEY.format(fragment=fragment, outcome=outcome)
+    cache = _cache()
+    # add() only creates the counter; incr() is atomic on shared backends
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key, n)
+    except ValueError:
+        # Culled between add() and incr(); start again from n
+        cache.set(key, n, timeout=None)
+
+
+class PrefetchedFragments:
+    """One fragment of a page of recipes, looked up (and counted) together."""
+
+    def __init__(self, fragment, keys, found):
+        self.fragment = fragment
+        self.keys = keys
+        # key -> cached html, for the hits
+        self.found = found
+
+
+def prefetch_fragments(fragment, recipes):
+    """
+    Fetches this fragment of every recipe with one get_many() and counts
+    the hits and misses in one go. Pass the result to the template as
+    PREFETCHED_CONTEXT.
+    """
+    keys = {key for key in (fragment_key(fragment, recipe) for recipe in recipes) if key}
+    found = _cache().get_many(list(keys)) if keys else {}
+    _count(fragment, "hits", len(found))
+    _count(fragment, "misses", len(keys) - len(found))
+    return PrefetchedFragments(fragment, keys, found)
+
+
+def get_or_render_fragment(fragment, recipe, render, prefetched=None):
+    """
+    Returns the cached fragment, calling render() and caching it on a miss.
+    prefetched (see prefetch_fragments) spares the lookup and the counting.
+    """
+    key = fragment_key(fragment, recipe)
+    if key is None:
+        return render()
+    if prefetched is not None and prefetched.fragment == fragment and key in prefetched.keys:
+        html = prefetched.found.get(key)
+        if html is None:
+            html = render()
+            _cache().set(key, str(html))
+        return mark_safe(html)
+    html = _cache().get(key)
+    if html is None:
+        _count(fragment, "misses")
+        html = render()
+        _cache().set(key, str(html))
+    else:
+        _count(fragment, "hits")
+    return mark_safe(html)
+
+
+def invalidate_recipe_fragments(recipe):
+    """Drops every cached fragment of this recipe's current version."""
+    keys = [fragment_key(fragment, recipe) for fragment in FRAGMENTS]
+    _cache().delete_many([key for key in keys if key])
+
+
+def touch_recipes(recipe_ids):
+    """Moves updated_at forward for these recipes (without sending signals)."""
+    from .models import Recipe
+
+    recipe_ids = {pk for pk in recipe_ids if pk is not None}
+    if recipe_ids:
+        Recipe.objects.filter(pk__in=recipe_ids).update(updated_at=timezone.now())
+
+
+def fragment_stats():
+    """{fragment: {"hits": n, "misses": n, "ratio": hits / lookups or None}}."""
+    keys = {
+        (fragment, outcome): COUNTER_KEY.format(fragment=fragment, outcome=outcome)
+        for fragment in FRAGMENTS
+        for outcome in ("hits", "misses")
+    }
+    values = _cache().get_many(list(keys.values()))
+    stats = {}
+    for fragment in FRAGMENTS:
+        hits = values.get(keys[fragment, "hits"], 0)
+        misses = values.get(keys[fragment, "misses"], 0)
+        lookups = hits + misses
+        stats[fragment] = {"hits": hits, "misses": misses, "ratio": hits / lookups if lookups else None}
+    return stats
@@ -0,0 +1,402 @@
+# recipes/importer.py
+"""
+Streaming importer for Django fixture files (dumpdata's JSON format).
+
+iter_json_array() reads a top-level JSON array a chunk at a time and yields
+one object at a time, so memory stays flat whatever the file size. With
+several workers, find_shards() cuts the file into byte ranges that a
+process pool parses and validates (iter_parallel_rows()), while the
+calling process stays the only writer. FixtureImporter groups the objects
+by model and writes them with bulk_create, one transaction per chunk of
+objects. Existing rows are either kept ("skip", like get_or_create) or
+overwritten ("upsert"). Only the models in IMPORT_MODELS can be imported;
+any other model in the file stops the import with a CommandError.
+
+Parents must come before children in the file (dumpdata orders them that
+way): a chunk is flushed model by model in the order models first appeared.
+"""
+
+import json
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import get_context
+
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.core.management.base import CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .fragment_cache import touch_recipes
+from .search_backends import get_search_backend
+from .search_index import ingredient_index
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# The models finish() knows how to bring indexes and caches up to date for
+IMPORT_MODELS = ("recipes.ingredient", "recipes.recipe", "recipes.recipeingredient")
+
+# Conflict target per model for upserts (default: the primary key). Links
+# are matched on their natural key, so their fixture pks don't matter.
+CONFLICT_FIELDS = {
+    "recipes.recipeingredient": ["recipe", "ingredient"],
+}
+
+
+def iter_json_array(fp, chunk_size=64 * 1024):
+    """Yields the values of the JSON array in a text file, one at a time."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+    # start -> "[" ; first -> value or "]" ; next -> "," or "]" ; value
+    state = "start"
+    while True:
+        pos = WHITESPACE.match(buf, pos).end()
+        if pos == len(buf):
+            if eof:
+                raise ValueError("Unexpected end of file inside the JSON array.")
+            chunk = fp.read(chunk_size)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+
+        char = buf[pos]
+        if state == "start":
+            if char == "\ufeff":
+                pos += 1
+                continue
+            if char != "[":
+                raise ValueError("A fixture file must hold a JSON array.")
+            pos, state = pos + 1, "first"
+            continue
+        if state in ("first", "next") and char == "]":
+            return
+        if state == "next":
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']' but found {char!r}.")
+            pos, state = pos + 1, "value"
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # Most likely the value continues in the next chunk
+            if eof:
+                raise
+            end = None
+        if end is None or (end == len(buf) and not eof):
+            # Incomplete (or possibly cut-off) value: read more and retry
+            chunk = fp.read(chunk_size)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+        yield value
+        pos, state = end, "next"
+
+
+# Start of a top-level fixture record; used to cut the file into shards.
+# Assumes no field value is itself a JSON object with a "model" key.
+RECORD_START = re.compile(rb'\{\s*"model"\s*:')
+BETWEEN_VALUES = re.compile(r"[ \t\n\r,]*")
+
+
+def find_shards(path, shard_bytes):
+    """
+    Cuts a fixture file into byte ranges [(start, end), ...] that each hold
+    whole records (every range starts at a record). Only reads a little
+    around each cut. The encoding must be ASCII-compatible (UTF-8, Latin-1).
+    """
+    def next_record(f, offset):
+        window = 64 * 1024
+        while True:
+            f.seek(offset)
+            data = f.read(window)
+            match = RECORD_START.search(data)
+            if match:
+                return offset + match.start()
+            if len(data) < window:
+                return None
+            # Keep an overlap so a record start cut in half is still found
+            offset += window - 32
+
+    boundaries = []
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        offset = 0
+        while offset < size:
+            start = next_record(f, offset)
+            if start is None:
+                break
+            if not boundaries or start > boundaries[-1]:
+                boundaries.append(start)
+            offset = max(start + 1, offset + shard_bytes)
+    return list(zip(boundaries, boundaries[1:] + [size]))
+
+
+def parse_shard(path, start, end, encoding):
+    """
+    Worker job: parses and validates the records in one byte range.
+    Returns (rows, errors) with rows as (label, values) pairs.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode(encoding)
+    decoder = json.JSONDecoder()
+    rows, errors = [], []
+    pos = 0
+    while True:
+        pos = BETWEEN_VALUES.match(text, pos).end()
+        if pos == len(text) or text[pos] == "]":
+            break
+        obj, pos = decoder.raw_decode(text, pos)
+        try:
+            rows.append(convert_object(obj))
+        except (ValidationError, LookupError, KeyError, TypeError) as e:
+            errors.append(describe_error(obj, e))
+    return rows, errors
+
+
+def _setup_worker():
+    import django
+
+    django.setup()
+
+
+def iter_parallel_rows(path, encoding, workers, shard_bytes=4 * 1024 * 1024, errors=None):
+    """
+    Yields converted (label, values) rows in file order while a process pool
+    parses and validates shards ahead. At most two shards per worker are in
+    flight, so memory stays bounded. Validation errors go into errors.
+    """
+    shards = find_shards(path, shard_bytes)
+    # Spawned workers share nothing with this process, our connection included,
+    # so it (and any atomic() block around the import) is left alone
+    with ProcessPoolExecutor(workers, mp_context=get_context("spawn"), initializer=_setup_worker) as pool:
+        pending = deque()
+        shards = iter(shards)
+        while True:
+            while len(pending) < workers * 2:
+                shard = next(shards, None)
+                if shard is None:
+                    break
+                pending.append(pool.submit(parse_shard, path, *shard, encoding))
+            if not pending:
+                return
+            rows, shard_errors = pending.popleft().result()
+            if errors is not None:
+                errors.extend(shard_errors)
+            yield from rows
+
+
+@contextmanager
+def fixture_dates(model):
+    """
+    Keeps auto_now/auto_now_add dates from the fixture: bulk_create would
+    otherwise stamp them with now. build() fills in the missing ones.
+    """
+    fields = [
+        f for f in model._meta.concrete_fields
+        if getattr(f, "auto_now", False) or getattr(f, "auto_now_add", False)
+    ]
+    flags = [(f.auto_now, f.auto_now_add) for f in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+_FIELD_MAPS = {}
+
+
+def _field_map(model):
+    """fixture field name -> (attname, field) for the model's concrete fields."""
+    if model not in _FIELD_MAPS:
+        _FIELD_MAPS[model] = {
+            field.name: (field.attname, field)
+            for field in model._meta.concrete_fields
+            if not field.primary_key
+        }
+    return _FIELD_MAPS[model]
+
+
+def convert_object(obj):
+    """
+    Validates one fixture object and returns (model label, field values by
+    attname). Raises ValidationError/LookupError/KeyError for bad objects.
+    Makes no queries, so import workers can run it.
+    """
+    model = apps.get_model(obj["model"])
+    values = {model._meta.pk.attname: obj.get("pk")}
+    fields = _field_map(model)
+    for name, value in obj.get("fields", {}).items():
+        if name not in fields:
+            # Many-to-many lists (links arrive as their own objects) and
+            # fields this schema no longer has
+            continue
+        attname, field = fields[name]
+        # Related rows may arrive later in the file, so only the id is kept
+        values[attname] = value if field.is_relation else field.clean(value, None)
+    # auto_now fields are always stamped now (it's a fresh version);
+    # auto_now_add ones keep the fixture's value if it has one
+    now = timezone.now()
+    for attname, field in fields.values():
+        if getattr(field, "auto_now", False):
+            values[attname] = now
+        elif getattr(field, "auto_now_add", False) and values.get(attname) is None:
+            values[attname] = now
+    return model._meta.label_lower, values
+
+
+def describe_error(obj, error):
+    label = obj.get("model", "?") if isinstance(obj, dict) else "?"
+    pk = obj.get("pk") if isinstance(obj, dict) else None
+    return f"{label} {pk}: {error}"
+
+
+class FixtureImporter:
+    """
+    Imports fixture objects in chunks:
+
+        importer = FixtureImporter(mode="upsert")
+        importer.run(iter_json_array(f))
+
+    chunk_size objects are committed per transaction; batch_size rows go
+    into each INSERT. stats maps model label -> rows inserted or updated,
+    skipped maps it to existing rows left alone in "skip" mode; objects
+    that fail validation are skipped and listed in errors.
+    """
+
+    MODES = ("skip", "upsert")
+
+    def __init__(self, mode="skip", chunk_size=10_000, batch_size=1000, progress=None):
+        if mode not in self.MODES:
+            raise ValueError(f"mode must be one of {self.MODES}")
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.progress = progress
+        self.stats = {}
+        self.skipped = {}
+        self.errors = []
+        # label -> pending model instances (insertion order = flush order)
+        self._pending = {}
+        self._pending_count = 0
+
+    def add(self, obj):
+        """Validates and queues one fixture object."""
+        try:
+            label, values = convert_object(obj)
+        except (ValidationError, LookupError, KeyError, TypeError) as e:
+            self.errors.append(describe_error(obj, e))
+            return
+        self.add_row(label, values)
+
+    def add_row(self, label, values):
+        """Queues one converted object (see convert_object)."""
+        if label not in IMPORT_MODELS:
+            raise CommandError(f"Can't import {label} objects; only {', '.join(IMPORT_MODELS)} are supported.")
+        self._pending.setdefault(label, []).append(apps.get_model(label)(**values))
+        self._pending_count += 1
+        if self._pending_count >= self.chunk_size:
+            self.flush()
+
+    def _write(self, label, instances):
+        model = type(instances[0])
+        options = {"batch_size": self.batch_size}
+        if self.mode == "skip":
+            options["ignore_conflicts"] = True
+        else:
+            unique_fields = CONFLICT_FIELDS.get(label, [model._meta.pk.name])
+            if model._meta.pk.name not in unique_fields:
+                # Let the database number rows matched on a natural key
+                for instance in instances:
+                    instance.pk = None
+            options.update(
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=[
+                    field.name for field in model._meta.concrete_fields
+                    if not field.primary_key and field.name not in unique_fields
+                ],
+            )
+        if self.mode == "skip":
+            # ignore_conflicts doesn't say which rows went in, so count the
+            # table around the insert (same transaction, nobody else's rows)
+            before = model.objects.count()
+        with fixture_dates(model):
+            model.objects.bulk_create(instances, **options)
+        written = len(instances)
+        if self.mode == "skip":
+            written = model.objects.count() - before
+            self.skipped[label] = self.skipped.get(label, 0) + len(instances) - written
+        self.stats[label] = self.stats.get(label, 0) + written
+
+    def flush(self):
+        """Writes everything pending in one transaction."""
+        # Not at module level: workers import this module before django.setup()
+        from .ingredient_fields import sync_ingredient_fields
+
+        if not self._pending_count:
+            return
+        with transaction.atomic():
+            # Recipes whose ingredient columns may now be out of date
+            recipe_ids = set()
+            for label, instances in self._pending.items():
+                if not instances:
+                    continue
+                self._write(label, instances)
+                if label == "recipes.recipe":
+                    recipe_ids.update(instance.pk for instance in instances if instance.pk is not None)
+                elif label == "recipes.recipeingredient":
+                    links = {instance.recipe_id for instance in instances}
+                    recipe_ids |= links
+                    # Cached detail fragments list the links; move their version
+                    touch_recipes(links)
+            # Just this chunk's recipes, so memory doesn't grow with the file
+            sync_ingredient_fields(recipe_ids)
+        self._pending = {label: [] for label in self._pending}
+        self._pending_count = 0
+        if self.progress:
+            self.progress(self.stats)
+
+    def finish(self):
+        """Flushes the rest, then fixes sequences, indexes and caches once."""
+        # Not at module level: workers import this module before django.setup()
+        from .stats import rebuild_recipe_stats
+
+        self.flush()
+        models = [apps.get_model(label) for label in self.stats]
+        with transaction.atomic():
+            # Rows came with explicit pks; move the sequences past them
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                    cursor.execute(sql)
+            # bulk_create sends no signals, so rebuild the search side once
+            get_search_backend().rebuild()
+            # ...and the chart statistics (flush() kept the ingredient columns)
+            rebuild_recipe_stats()
+        # After commit, if the caller wrapped the import in a transaction
+        transaction.on_commit(ingredient_index.clear)
+
+    def run(self, objects):
+        """Imports every object; returns (stats, seconds)."""
+        start = time.perf_counter()
+        for obj in objects:
+            self.add(obj)
+        self.finish()
+        return self.stats, time.perf_counter() - start
+
+    def run_rows(self, rows, errors=()):
+        """Like run(), for rows already converted elsewhere (e.g. by workers)."""
+        start = time.perf_counter()
+        for label, values in rows:
+            self.add_row(label, values)
+        self.finish()
+        self.errors.extend(errors)
+        return self.stats, time.perf_counter() - start
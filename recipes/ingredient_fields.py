@@ -0,0 +1,69 @@
+# recipes/ingredient_fields.py
+"""
+Denormalised ingredient columns on Recipe.
+
+Recipe.ingredient_count and Recipe.ingredient_names (the ingredient names,
+sorted case-insensitively and joined with ", ") let list cards, the search
+table, the API and the icontains search backend show or match a recipe's
+ingredients without joining through RecipeIngredient to Ingredient.
+
+Signal handlers call sync_ingredient_fields() for the recipes whose links
+or ingredient names changed; `manage.py check_ingredient_fields` finds rows
+that drifted anyway (raw SQL, update()) and --repair fixes them.
+"""
+
+from .models import Recipe, RecipeIngredient
+
+# Ingredient filter terms are split on commas, so a substring match for one
+# of them can't run across two names
+INGREDIENT_NAMES_SEPARATOR = ", "
+
+
+def join_ingredient_names(names):
+    return INGREDIENT_NAMES_SEPARATOR.join(sorted(names, key=lambda name: (name.lower(), name)))
+
+
+def ingredient_fields(recipe_ids=None):
+    """
+    {recipe id: (ingredient_count, ingredient_names)} computed from the link
+    table with one query; recipes without ingredients are left out.
+    """
+    links = RecipeIngredient.objects.all()
+    if recipe_ids is not None:
+        links = links.filter(recipe_id__in=recipe_ids)
+    names = {}
+    for recipe_id, name in links.values_list("recipe_id", "ingredient__name").order_by():
+        names.setdefault(recipe_id, []).append(name)
+    return {recipe_id: (len(found), join_ingredient_names(found)) for recipe_id, found in names.items()}
+
+
+def stale_ingredient_fields(recipe_ids=None):
+    """
+    {recipe id: (stored, expected)} for recipes whose columns disagree with
+    the link table (all recipes when recipe_ids is None).
+    """
+    expected = ingredient_fields(recipe_ids)
+    recipes = Recipe.objects.all()
+    if recipe_ids is not None:
+        recipes = recipes.filter(pk__in=recipe_ids)
+    stale = {}
+    for pk, count, names in recipes.values_list("pk", "ingredient_count", "ingredient_names").order_by("pk").iterator():
+        want = expected.get(pk, (0, ""))
+        if (count, names) != want:
+            stale[pk] = ((count, names), want)
+    return stale
+
+
+def sync_ingredient_fields(recipe_ids=None):
+    """
+    Brings the columns of these recipes (all when None) in line with the link
+    table; returns the ids that changed. Uses bulk_update(), so updated_at and the
+    Recipe signals are left alone.
+    """
+    stale = stale_ingredient_fields(recipe_ids)
+    recipes = [
+        Recipe(pk=pk, ingredient_count=count, ingredient_names=names)
+        for pk, (_, (count, names)) in stale.items()
+    ]
+    Recipe.objects.bulk_update(recipes, ["ingredient_count", "ingredient_names"], batch_size=500)
+    return list(stale)
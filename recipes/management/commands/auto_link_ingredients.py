@@ -1,7 +1,12 @@
-from django.core.management.base import BaseCommand
+import csv
+import json
+
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.apps import apps
 
+from recipes.signals import recipe_links_bulk_changed
+
 # Mapping: recipe name (exact, case-sensitive as in admin) -> list of ingredient names
 RECIPE_MAP = {
     "Caprese Salad": ["Tomato", "Fresh Mozzarella", "Basil", "Olive Oil"],
@@ -36,58 +41,153 @@ ALIASES = {
     "Egg": "Eggs",  # admin shows both "Egg" and "Eggs"; we'll normalize to whichever exists
 }
 
-def normalize_ingredient_name(name, Ingredient):
+def normalize_ingredient_name(name, ingredient_ids, aliases=ALIASES):
+    """
+    Returns the Ingredient id for name, or None. ingredient_ids maps every
+    Ingredient name to its id (loaded once, so no queries here).
+    """
     # prefer exact match
-    obj = Ingredient.objects.filter(name=name).first()
-    if obj:
-        return obj
+    if name in ingredient_ids:
+        return ingredient_ids[name]
     # try alias
-    alias = ALIASES.get(name)
-    if alias:
-        obj = Ingredient.objects.filter(name=alias).first()
-        if obj:
-            return obj
+    alias = aliases.get(name)
+    if alias and alias in ingredient_ids:
+        return ingredient_ids[alias]
     # try singular/plural swaps quick-n-dirty
-    if name.endswith("s"):
-        obj = Ingredient.objects.filter(name=name[:-1]).first()
-        if obj:
-            return obj
+    swapped = name[:-1] if name.endswith("s") else name + "s"
+    return ingredient_ids.get(swapped)
+
+def load_mapping(path):
+    """
+    Reads a mapping file. Returns (recipe name -> ingredient names, aliases).
+
+    JSON: {"Recipe": ["Ingredient", ...]} or
+          {"recipes": {"Recipe": [...]}, "aliases": {"Alias": "Ingredient"}}
+    CSV:  one link per row with "recipe" and "ingredient" columns
+    """
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            if path.lower().endswith(".csv"):
+                mapping = {}
+                for row in csv.DictReader(f):
+                    mapping.setdefault(row["recipe"].strip(), []).append(row["ingredient"].strip())
+                return check_mapping(path, mapping, {})
+            data = json.load(f)
+    except (OSError, ValueError, KeyError) as e:
+        raise CommandError(f"Can't read mapping file {path}: {e}")
+    if not isinstance(data, dict):
+        raise CommandError(f"Mapping file {path} must hold a JSON object.")
+    if isinstance(data.get("recipes"), dict):
+        return check_mapping(path, data["recipes"], data.get("aliases", {}))
+    return check_mapping(path, data, {})
+
+def check_mapping(path, mapping, aliases):
+    """
+    Returns (mapping, aliases) if every recipe maps to a list of ingredient
+    names and every alias to a name; raises CommandError naming the bad entries.
+    """
+    bad = []
+    for recipe, items in mapping.items():
+        if not isinstance(items, list) or not items:
+            bad.append(f"{recipe!r}: expected a list of ingredient names, got {items!r}")
+            continue
+        bad.extend(
+            f"{recipe!r}: ingredient {item!r} is not a name"
+            for item in items if not isinstance(item, str) or not item.strip()
+        )
+    if not isinstance(aliases, dict):
+        bad.append(f"aliases: expected an object, got {aliases!r}")
     else:
-        obj = Ingredient.objects.filter(name=name + "s").first()
-        if obj:
-            return obj
-    return None
+        bad.extend(
+            f"alias {alias!r}: {target!r} is not a name"
+            for alias, target in aliases.items() if not isinstance(target, str)
+        )
+    if bad:
+        raise CommandError(f"Invalid mapping file {path}:\n  " + "\n  ".join(bad))
+    return mapping, aliases
+
+def unknown_ingredients(mapping, ingredient_ids, aliases):
+    """(recipe, ingredient name) pairs of the mapping that match no Ingredient."""
+    return [
+        (recipe, item)
+        for recipe, items in mapping.items()
+        for item in items
+        if normalize_ingredient_name(item, ingredient_ids, aliases) is None
+    ]
 
 class Command(BaseCommand):
     help = "Links Ingredient rows to Recipe rows via RecipeIngredient for your seed recipes."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--mapping",
+            help="JSON or CSV file of recipe -> ingredients to use instead of the built-in seed map.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per INSERT.")
+
     def handle(self, *args, **opts):
         Recipe = apps.get_model("recipes", "Recipe")
         Ingredient = apps.get_model("recipes", "Ingredient")
         RecipeIngredient = apps.get_model("recipes", "RecipeIngredient")
 
-        self.stdout.write(self.style.NOTICE("Auto-linking ingredients for seed recipes…"))
+        mapping, aliases = RECIPE_MAP, ALIASES
+        if opts["mapping"]:
+            mapping, extra_aliases = load_mapping(opts["mapping"])
+            aliases = {**ALIASES, **extra_aliases}
+
+        self.stdout.write(self.style.NOTICE(f"Auto-linking ingredients for {len(mapping)} recipes…"))
 
-        created = 0
-        skipped = 0
         with transaction.atomic():
-            for rname, items in RECIPE_MAP.items():
-                recipe = Recipe.objects.filter(name=rname).first()
-                if not recipe:
+            # Everything needed comes from three queries, however big the map
+            ingredient_ids = dict(Ingredient.objects.values_list("name", "id"))
+            if opts["mapping"]:
+                # A mapping file is meant to be complete: refuse it rather than
+                # linking part of it (the seed map only warns, see below)
+                unknown = unknown_ingredients(mapping, ingredient_ids, aliases)
+                if unknown:
+                    raise CommandError(
+                        f"No Ingredient for {len(unknown)} mapped names in {opts['mapping']}:\n  "
+                        + "\n  ".join(f"{item!r} (recipe {recipe!r})" for recipe, item in unknown)
+                    )
+            recipe_ids = {}
+            # Oldest recipe wins if a name is used twice
+            for name, pk in Recipe.objects.filter(name__in=list(mapping)).order_by("-pk").values_list("name", "id"):
+                recipe_ids[name] = pk
+            existing = set(
+                RecipeIngredient.objects.filter(recipe_id__in=recipe_ids.values())
+                .values_list("recipe_id", "ingredient_id")
+            )
+
+            # Work out the missing links in memory
+            new_links = {}
+            skipped = 0
+            for rname, items in mapping.items():
+                recipe_id = recipe_ids.get(rname)
+                if recipe_id is None:
                     self.stdout.write(self.style.WARNING(f"- Recipe not found: {rname}"))
                     continue
                 for item in items:
-                    ing = normalize_ingredient_name(item, Ingredient)
-                    if not ing:
+                    ingredient_id = normalize_ingredient_name(item, ingredient_ids, aliases)
+                    if ingredient_id is None:
                         self.stdout.write(self.style.WARNING(f"  • Ingredient not found for '{item}' (recipe '{rname}')"))
                         continue
-                    exists = RecipeIngredient.objects.filter(recipe=recipe, ingredient=ing).exists()
-                    if exists:
+                    link = (recipe_id, ingredient_id)
+                    if link in existing or link in new_links:
                         skipped += 1
                         continue
                     # quantity left blank; you can adjust logic here if you have quantity fields
-                    RecipeIngredient.objects.create(recipe=recipe, ingredient=ing)
-                    created += 1
+                    new_links[link] = RecipeIngredient(recipe_id=recipe_id, ingredient_id=ingredient_id)
 
-        self.stdout.write(self.style.SUCCESS(f"Done. Created {created} links; skipped {skipped} existing."))
+            # One INSERT per batch; rows linked meanwhile by someone else are
+            # skipped, and ignore_conflicts hides which, so count around it
+            links = RecipeIngredient.objects.filter(recipe_id__in=recipe_ids.values())
+            before = links.count()
+            RecipeIngredient.objects.bulk_create(
+                new_links.values(), batch_size=opts["batch_size"], ignore_conflicts=True,
+            )
+            created = links.count() - before
+            skipped += len(new_links) - created
+            # bulk_create sends no signals, so refresh indexes and caches here
+            recipe_links_bulk_changed(recipe_id for recipe_id, _ in new_links)
 
+        self.stdout.write(self.style.SUCCESS(f"Done. Created {created} links; skipped {skipped} existing."))
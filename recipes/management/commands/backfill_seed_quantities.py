@@ -1,6 +1,13 @@
-from django.core.management.base import BaseCommand
+import csv
+import json
+import math
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 from decimal import Decimal
 from recipes.models import Recipe, Ingredient, RecipeIngredient
+from recipes.signals import recipe_links_bulk_changed
 
 # Minimal, sane defaults for your 22 seed recipes
 PLAN = {
@@ -96,14 +103,99 @@ PLAN = {
     ],
 }
 
+def validate_plan(plan):
+    """
+    Checks every row before anything is written: a plan with bad rows is
+    refused as a whole (CommandError listing each one) rather than half
+    applied. Returns the plan with quantities as floats.
+    """
+    errors = []
+    checked = {}
+    unit_length = RecipeIngredient._meta.get_field("unit").max_length
+    for recipe_name, items in plan.items():
+        rows = checked[recipe_name] = []
+        for number, item in enumerate(items, 1):
+            where = f"{recipe_name} row {number}"
+            if len(item) != 3:
+                errors.append(f"{where}: expected [ingredient, quantity, unit], got {list(item)!r}")
+                continue
+            ing_name, qty, unit = item
+            where += f" ({ing_name})"
+            try:
+                # float(True) works, but a JSON true is no quantity
+                if isinstance(qty, bool):
+                    raise ValueError
+                qty = float(qty)
+            except (TypeError, ValueError):
+                errors.append(f"{where}: quantity {qty!r} is not a number")
+                continue
+            if not math.isfinite(qty) or qty < 0:
+                errors.append(f"{where}: quantity {qty!r} must be a finite number >= 0")
+            if not isinstance(ing_name, str) or not ing_name.strip():
+                errors.append(f"{where}: ingredient name {ing_name!r} is empty")
+            if not isinstance(unit, str) or len(unit) > unit_length:
+                errors.append(f"{where}: unit {unit!r} must be text of at most {unit_length} characters")
+            rows.append((ing_name, qty, unit))
+    if errors:
+        raise CommandError("Invalid plan:\n" + "\n".join(errors))
+    return checked
+
+
+def load_plan(path):
+    """
+    Reads a plan file in the same shape as PLAN.
+
+    JSON: {"Recipe": [["Ingredient", quantity, "unit"], ...]}
+    CSV:  "recipe", "ingredient", "quantity" and "unit" columns, one row each
+    """
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            if path.lower().endswith(".csv"):
+                plan = {}
+                for row in csv.DictReader(f):
+                    item = (row["ingredient"].strip(), row["quantity"], (row.get("unit") or "").strip())
+                    plan.setdefault(row["recipe"].strip(), []).append(item)
+                return plan
+            data = json.load(f)
+        return {recipe: [tuple(item) for item in items] for recipe, items in data.items()}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        raise CommandError(f"Can't read plan file {path}: {e}")
+
+
 class Command(BaseCommand):
     help = "Backfill quantities and units for seed RecipeIngredients."
 
+    def add_arguments(self, parser):
+        parser.add_argument("--plan", help="JSON or CSV file to use instead of the built-in PLAN.")
+        parser.add_argument(
+            "--batched", action="store_true",
+            help="Resolve names in two queries and upsert every row with bulk_create.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per upsert in --batched mode.")
+
     def handle(self, *args, **opts):
+        plan = validate_plan(load_plan(opts["plan"]) if opts["plan"] else PLAN)
+        start = time.perf_counter()
+        if opts["batched"]:
+            created_or_updated, missing_ingredients = self.backfill_batched(plan, opts["batch_size"])
+        else:
+            created_or_updated, missing_ingredients = self.backfill_rows(plan)
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. Set quantities/units on {created_or_updated} recipe-ingredient rows."
+        ))
+        rate = created_or_updated / elapsed if elapsed else 0
+        self.stdout.write(f"{elapsed:.3f}s, {rate:.0f} rows/s")
+        if missing_ingredients:
+            self.stdout.write("Missing Ingredient rows for: " + ", ".join(sorted(missing_ingredients)))
+
+    def backfill_rows(self, plan):
+        """One recipe/ingredient lookup and write per row (the original mode)."""
         created_or_updated = 0
         missing_ingredients = set()
 
-        for recipe_name, items in PLAN.items():
+        for recipe_name, items in plan.items():
             try:
                 recipe = Recipe.objects.get(name=recipe_name)
             except Recipe.DoesNotExist:
@@ -122,8 +214,46 @@ class Command(BaseCommand):
                 ri.save(update_fields=["quantity", "unit"])
                 created_or_updated += 1
 
-        self.stdout.write(self.style.SUCCESS(
-            f"Done. Set quantities/units on {created_or_updated} recipe-ingredient rows."
-        ))
-        if missing_ingredients:
-            self.stdout.write("Missing Ingredient rows for: " + ", ".join(sorted(missing_ingredients)))
+        return created_or_updated, missing_ingredients
+
+    def backfill_batched(self, plan, batch_size):
+        """Two lookups, then INSERT ... ON CONFLICT (recipe, ingredient) DO UPDATE."""
+        missing_ingredients = set()
+        ingredient_names = {ing_name for items in plan.values() for ing_name, _, _ in items}
+
+        with transaction.atomic():
+            # Oldest recipe wins if a name is used twice
+            recipe_ids = dict(
+                Recipe.objects.filter(name__in=list(plan)).order_by("-pk").values_list("name", "id")
+            )
+            ingredient_ids = dict(
+                Ingredient.objects.filter(name__in=ingredient_names).values_list("name", "id")
+            )
+
+            # Keyed by link so a repeated row updates instead of conflicting twice
+            rows = {}
+            for recipe_name, items in plan.items():
+                recipe_id = recipe_ids.get(recipe_name)
+                if recipe_id is None:
+                    self.stdout.write(f"Recipe not found: {recipe_name}")
+                    continue
+                for ing_name, qty, unit in items:
+                    ingredient_id = ingredient_ids.get(ing_name)
+                    if ingredient_id is None:
+                        missing_ingredients.add(ing_name)
+                        continue
+                    rows[recipe_id, ingredient_id] = RecipeIngredient(
+                        recipe_id=recipe_id, ingredient_id=ingredient_id, quantity=float(qty), unit=unit,
+                    )
+
+            RecipeIngredient.objects.bulk_create(
+                rows.values(),
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=["recipe", "ingredient"],
+                update_fields=["quantity", "unit"],
+            )
+            # bulk_create sends no signals, so refresh indexes and caches here
+            recipe_links_bulk_changed(recipe_id for recipe_id, _ in rows)
+
+        return len(rows), missing_ingredients
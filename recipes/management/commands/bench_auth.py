@@ -0,0 +1,83 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from recipes.models import Recipe
+
+CACHED_BACKEND = "recipes.auth_cache.CachedModelBackend"
+MODEL_BACKEND = "django.contrib.auth.backends.ModelBackend"
+
+# name -> (SESSION_ENGINE, authentication backend)
+MODES = {
+    "db": ("django.contrib.sessions.backends.db", MODEL_BACKEND),
+    "cached_db": ("django.contrib.sessions.backends.cached_db", MODEL_BACKEND),
+    "cached_db+users": ("django.contrib.sessions.backends.cached_db", CACHED_BACKEND),
+    "signed_cookies+users": ("django.contrib.sessions.backends.signed_cookies", CACHED_BACKEND),
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Count session/user queries per logged-in page for each session and user-cache mode."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20, help="Warm requests per page.")
+        parser.add_argument("--mode", choices=sorted(MODES), action="append", help="Only run these modes.")
+
+    def pages(self, recipe):
+        return {
+            "login": reverse("login"),
+            "list": reverse("recipes:list"),
+            "detail": reverse("recipes:detail", kwargs={"pk": recipe.pk}),
+            "search": reverse("recipes:search"),
+        }
+
+    def measure(self, mode, user, recipe, repeat):
+        engine, backend = MODES[mode]
+        with override_settings(SESSION_ENGINE=engine, AUTHENTICATION_BACKENDS=[backend], ALLOWED_HOSTS=["testserver"]):
+            caches["sessions"].clear()
+            client = Client()
+            client.force_login(user, backend=backend)
+            results = {}
+            for page, url in self.pages(recipe).items():
+                # First request warms the session/user caches
+                client.get(url, secure=True)
+                start = time.perf_counter()
+                with CaptureQueriesContext(connection) as ctx:
+                    for _ in range(repeat):
+                        client.get(url, secure=True)
+                elapsed = (time.perf_counter() - start) / repeat
+                sqls = [q["sql"] for q in ctx.captured_queries]
+                results[page] = (
+                    len(sqls) / repeat,
+                    sum('"django_session"' in sql for sql in sqls) / repeat,
+                    sum('"auth_user"' in sql for sql in sqls) / repeat,
+                    elapsed * 1000,
+                )
+            return results
+
+    def handle(self, *args, **opts):
+        modes = opts["mode"] or list(MODES)
+        self.stdout.write(f"{'mode':<22} {'page':<8} {'queries':>8} {'session':>8} {'user':>6} {'ms':>7}")
+        # Throwaway user and recipe; everything is rolled back at the end
+        try:
+            with transaction.atomic():
+                user = get_user_model().objects.create_user("bench-auth", password="bench-auth-password")
+                recipe = Recipe.objects.create(name="Bench Soup", cook_time_minutes=10)
+                for mode in modes:
+                    for page, (queries, session, users, ms) in self.measure(mode, user, recipe, opts["repeat"]).items():
+                        self.stdout.write(f"{mode:<22} {page:<8} {queries:>8.1f} {session:>8.1f} {users:>6.1f} {ms:>7.2f}")
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            caches["sessions"].clear()
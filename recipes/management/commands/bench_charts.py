@@ -0,0 +1,104 @@
+import statistics
+import time
+from datetime import date, timedelta
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+
+from recipes.charts import (
+    COLORS, COOK_TIME_CHART, DIFFICULTY_CHART, GROWTH_CHART, MatplotlibChartEngine, SVGChartEngine,
+)
+
+CHARTS = {
+    DIFFICULTY_CHART: "bar",
+    COOK_TIME_CHART: "pie",
+    GROWTH_CHART: "line",
+}
+
+
+def sample_data(days):
+    return {
+        DIFFICULTY_CHART: [("Easy", 12), ("Hard", 4), ("Intermediate", 9), ("Medium", 7)],
+        COOK_TIME_CHART: [("≤ 30 min", 14), ("31–60 min", 11), ("> 60 min", 7)],
+        GROWTH_CHART: [(date(2025, 1, 1) + timedelta(days=i), 3 * i + 1) for i in range(days)],
+    }
+
+
+class PyplotEngine:
+    """What the matplotlib engine used to do: a new pyplot figure per chart."""
+
+    def __init__(self):
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        self.plt = plt
+
+    def render(self, chart_type, data, image_format="png"):
+        plt = self.plt
+        fig, ax = plt.subplots(figsize=(10, 6))
+        try:
+            labels = [label for label, _ in data]
+            values = [value for _, value in data]
+            if chart_type == DIFFICULTY_CHART:
+                ax.bar(labels, values, color=COLORS[:3])
+                ax.set_xlabel("Difficulty Level")
+                ax.set_ylabel("Number of Recipes")
+                ax.set_title("Recipes by Difficulty")
+            elif chart_type == COOK_TIME_CHART:
+                ax.pie(values, labels=labels, autopct="%1.1f%%", startangle=90)
+                ax.set_title("Cooking Time Distribution")
+                ax.axis("equal")
+            else:
+                ax.plot(labels, values, marker="o", linestyle="-")
+                ax.set_xlabel("Date Added")
+                ax.set_ylabel("Total Number of Recipes")
+                ax.set_title("Recipe Collection Growth Over Time")
+                plt.setp(ax.get_xticklabels(), rotation=45, ha="right")
+            fig.tight_layout()
+            buf = BytesIO()
+            fig.savefig(buf, format=image_format, dpi=100, bbox_inches="tight")
+            return buf.getvalue()
+        finally:
+            plt.close(fig)
+
+
+# name -> (engine factory, description)
+MODES = {
+    "pyplot": (PyplotEngine, "old engine: pyplot figure per chart, tight_layout + bbox_inches"),
+    "figure": (lambda: MatplotlibChartEngine(optimize=False), "Figure + FigureCanvasAgg, reused figures"),
+    "figure+optimize": (lambda: MatplotlibChartEngine(optimize=True), "same, PNG palette-optimised"),
+    "svg": (SVGChartEngine, "built-in SVG engine"),
+}
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark chart rendering: time and bytes per chart for each engine mode."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20, help="Renders per chart (after the first).")
+        parser.add_argument("--days", type=int, default=60, help="Points on the growth chart.")
+        parser.add_argument("--mode", choices=list(MODES), action="append", help="Only run these modes.")
+
+    def handle(self, *args, **opts):
+        data = sample_data(opts["days"])
+        self.stdout.write(self.style.NOTICE(f"Rendering each chart 1 + {opts['repeat']} times per mode…"))
+        self.stdout.write(f"{'mode':<16} {'chart':<6} {'first (ms)':>11} {'median (ms)':>12} {'bytes':>9}")
+        for mode in opts["mode"] or list(MODES):
+            factory, description = MODES[mode]
+            engine = factory()
+            image_format = "svg" if mode == "svg" else "png"
+            for chart_type, label in CHARTS.items():
+                # First render includes imports, font loading and figure setup
+                start = time.perf_counter()
+                image = engine.render(chart_type, data[chart_type], image_format)
+                first = time.perf_counter() - start
+                times = []
+                for _ in range(opts["repeat"]):
+                    start = time.perf_counter()
+                    engine.render(chart_type, data[chart_type], image_format)
+                    times.append(time.perf_counter() - start)
+                median = statistics.median(times) if times else first
+                self.stdout.write(
+                    f"{mode:<16} {label:<6} {first * 1000:>11.1f} {median * 1000:>12.1f} {len(image):>9}"
+                )
+            self.stdout.write(f"  ({description})")
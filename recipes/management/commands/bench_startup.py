@@ -0,0 +1,74 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter: boots Django, loads the URLconf (what every
+# worker does before its first request) and reports time + peak RSS
+CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+import importlib
+from django.conf import settings
+importlib.import_module(settings.ROOT_URLCONF)
+if sys.argv[1] == "eager":
+    # What recipes/views.py used to do at import time
+    import pandas
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot
+elapsed = time.perf_counter() - start
+try:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    rss_mb = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+except ImportError:
+    rss_mb = None
+print(json.dumps({"seconds": elapsed, "rss_mb": rss_mb}))
+"""
+
+# name -> (argument for CHILD, extra environment, description)
+MODES = {
+    "eager": ("eager", {}, "pandas + matplotlib at import (old views.py)"),
+    "lazy": ("lazy", {"RECIPE_CHART_WARMUP": "False"}, "chart libraries loaded on first chart"),
+    "warmup": (
+        "lazy",
+        {"RECIPE_CHART_WARMUP": "True", "RECIPE_CHART_ENGINE": "matplotlib"},
+        "matplotlib preloaded in RecipesConfig.ready()",
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = "Measure worker startup time and memory with eager vs lazy chart imports."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per mode (median is reported).")
+        parser.add_argument("--mode", choices=sorted(MODES), action="append", help="Only run these modes.")
+
+    def run_child(self, mode):
+        arg, extra_env, _ = MODES[mode]
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE, **extra_env)
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD, arg],
+            env=env, cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout
+        return json.loads(out.strip().splitlines()[-1])
+
+    def handle(self, *args, **opts):
+        modes = opts["mode"] or ["eager", "lazy", "warmup"]
+        self.stdout.write(self.style.NOTICE(f"Booting Django {opts['repeat']}x per mode…"))
+        self.stdout.write(f"{'mode':<8} {'startup (s)':>12} {'peak RSS (MB)':>14}  notes")
+        for mode in modes:
+            runs = [self.run_child(mode) for _ in range(opts["repeat"])]
+            seconds = statistics.median(r["seconds"] for r in runs)
+            rss = [r["rss_mb"] for r in runs if r["rss_mb"] is not None]
+            rss_text = f"{statistics.median(rss):.1f}" if rss else "n/a"
+            self.stdout.write(f"{mode:<8} {seconds:>12.3f} {rss_text:>14}  {MODES[mode][2]}")
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.fragment_cache import touch_recipes
+from recipes.ingredient_fields import stale_ingredient_fields, sync_ingredient_fields
+
+# Mismatches listed in full; the rest are only counted
+SHOW_STALE = 10
+
+
+class Command(BaseCommand):
+    help = "Check Recipe.ingredient_count / ingredient_names against the ingredient links (--repair fixes them)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repair", action="store_true", help="Rewrite the recipes that are out of date.")
+
+    def handle(self, *args, **opts):
+        stale = stale_ingredient_fields()
+        if not stale:
+            self.stdout.write(self.style.SUCCESS("Ingredient columns are up to date."))
+            return
+
+        self.stdout.write(self.style.WARNING(f"{len(stale)} recipes have out-of-date ingredient columns:"))
+        for pk, ((count, names), (want_count, want_names)) in list(stale.items())[:SHOW_STALE]:
+            self.stdout.write(f"  recipe {pk}: {count} {names!r} -> {want_count} {want_names!r}")
+        if len(stale) > SHOW_STALE:
+            self.stdout.write(f"  … and {len(stale) - SHOW_STALE} more")
+
+        if not opts["repair"]:
+            self.stdout.write("Run again with --repair to fix them.")
+            return
+        with transaction.atomic():
+            repaired = sync_ingredient_fields(list(stale))
+            # New version for cached cards / API ETags
+            touch_recipes(repaired)
+        self.stdout.write(self.style.SUCCESS(f"Repaired {len(repaired)} recipes."))
@@ -0,0 +1,79 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+
+from recipes.models import Recipe, RecipeIngredient
+from recipes.views import filter_recipes
+
+
+def canonical_queries():
+    """
+    (label, queryset, acceptable indexes) for the queries behind recipe_search
+    and the list pages. An empty tuple means "just show the plan". Name search
+    runs in the full-text backend (its own index, see search_backends.py).
+    """
+    yield (
+        "difficulty + max cook time",
+        filter_recipes({"difficulty": "Easy", "max_cook_time": 30}),
+        ("recipe_difficulty_time_idx",),
+    )
+    yield (
+        "difficulty only",
+        filter_recipes({"difficulty": "Hard"}),
+        ("recipe_difficulty_time_idx",),
+    )
+    yield (
+        "max cook time only",
+        filter_recipes({"max_cook_time": 30}),
+        # Either filter by time, or walk the name index to skip the sort
+        ("recipe_cook_time_idx", "recipe_name_id_idx"),
+    )
+    yield (
+        "keyset page (name, pk)",
+        Recipe.objects.filter(Q(name__gt="M") | Q(name="M", pk__gt=1), name__gte="M").order_by("name", "pk")[:25],
+        ("recipe_name_id_idx",),
+    )
+    yield (
+        "ingredient -> recipes",
+        RecipeIngredient.objects.filter(ingredient_id__in=[1, 2]).values_list("recipe_id", flat=True),
+        ("recipeingr_ingr_recipe_idx",),
+    )
+
+
+class Command(BaseCommand):
+    help = "Print EXPLAIN plans for the canonical recipe search queries (use --check in CI)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check", action="store_true",
+            help="Fail if a query's plan doesn't use one of its expected indexes.",
+        )
+
+    def explain(self, qs):
+        if connection.vendor != "postgresql":
+            return qs.explain()
+        # Small tables make Postgres prefer sequential scans; turn them off so
+        # the plan shows whether a usable index exists at all
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            return qs.explain()
+
+    def handle(self, *args, **opts):
+        failures = []
+        for label, qs, indexes in canonical_queries():
+            plan = self.explain(qs)
+            ok = not indexes or any(name in plan for name in indexes)
+            style = self.style.SUCCESS if ok else self.style.ERROR
+            self.stdout.write(style(f"== {label}"))
+            self.stdout.write(plan)
+            if not ok:
+                failures.append(f"{label} (expected {' or '.join(indexes)})")
+
+        if failures:
+            message = "Plans without their index: " + "; ".join(failures)
+            if opts["check"]:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS("All plans use their indexes."))
@@ -0,0 +1,88 @@
+import time
+from contextlib import closing
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError
+
+from recipes.importer import FixtureImporter, iter_json_array, iter_parallel_rows
+
+# How many validation errors to print before summarising the rest
+SHOW_ERRORS = 20
+
+
+class Command(BaseCommand):
+    help = "Stream a fixture file (e.g. recipes_data_utf8.json) into the database in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default="recipes_data_utf8.json", help="Fixture file to import.")
+        parser.add_argument("--encoding", default="utf-8-sig", help="File encoding (default utf-8-sig).")
+        parser.add_argument(
+            "--mode", choices=FixtureImporter.MODES, default="skip",
+            help="skip: keep rows that already exist; upsert: overwrite them.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=10_000, help="Objects per transaction.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per INSERT.")
+        parser.add_argument(
+            "--workers", type=int, default=1,
+            help="Processes parsing and validating the file; this process stays the only writer.",
+        )
+        parser.add_argument("--shard-mb", type=float, default=4, help="Megabytes of file per worker job.")
+
+    def progress(self, stats):
+        if self.verbosity:
+            total = sum(stats.values())
+            elapsed = time.perf_counter() - self.started
+            self.stdout.write(f"  {total} objects written, {total / elapsed:.0f} objects/s")
+
+    @staticmethod
+    def ascii_compatible(encoding):
+        # Shards are cut on raw bytes, so record starts must look the same
+        try:
+            return b'{"model":'.decode(encoding) == '{"model":'
+        except (LookupError, UnicodeDecodeError):
+            return False
+
+    def handle(self, *args, **opts):
+        self.verbosity = opts["verbosity"]
+        workers = opts["workers"]
+        if workers > 1 and not self.ascii_compatible(opts["encoding"]):
+            raise CommandError("--workers needs an ASCII-compatible encoding such as UTF-8 or Latin-1.")
+
+        importer = FixtureImporter(
+            mode=opts["mode"], chunk_size=opts["chunk_size"], batch_size=opts["batch_size"],
+            progress=self.progress,
+        )
+        self.stdout.write(self.style.NOTICE(
+            f"Importing {opts['path']} ({opts['mode']}, {workers} worker{'s' if workers > 1 else ''})…"
+        ))
+        self.started = time.perf_counter()
+        try:
+            if workers > 1:
+                errors = []
+                rows = iter_parallel_rows(
+                    opts["path"], opts["encoding"], workers,
+                    shard_bytes=int(opts["shard_mb"] * 1024 * 1024), errors=errors,
+                )
+                # closing() shuts the pool down here, even if a write fails
+                with closing(rows):
+                    stats, seconds = importer.run_rows(rows, errors)
+            else:
+                with open(opts["path"], encoding=opts["encoding"]) as f:
+                    stats, seconds = importer.run(iter_json_array(f))
+        except (OSError, ValueError, LookupError, KeyError, ValidationError, DatabaseError) as e:
+            # Chunks committed before the error stay; rerunning in skip mode resumes
+            raise CommandError(f"Import failed after {sum(importer.stats.values())} objects: {e}")
+
+        for label, count in stats.items():
+            skipped = importer.skipped.get(label)
+            self.stdout.write(f"  {label}: {count}" + (f" ({skipped} already there, skipped)" if skipped else ""))
+        for error in importer.errors[:SHOW_ERRORS]:
+            self.stdout.write(self.style.WARNING(f"  Skipped {error}"))
+        if len(importer.errors) > SHOW_ERRORS:
+            self.stdout.write(self.style.WARNING(f"  … and {len(importer.errors) - SHOW_ERRORS} more invalid objects"))
+        total = sum(stats.values())
+        rate = total / seconds if seconds else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Successfully loaded {total} objects in {seconds:.2f}s ({rate:.0f} objects/s)"
+        ))
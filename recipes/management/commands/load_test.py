@@ -0,0 +1,84 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent GET requests at a running server (WSGI or ASGI) and report "
+        "throughput and latency per URL. Logged-in pages need --user; the session is "
+        "created in this project's database, so it only works with db/cached_db/"
+        "signed_cookies sessions shared with the server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="+", help="Absolute URLs, requested round-robin.")
+        parser.add_argument("--requests", type=int, default=200, help="Total requests.")
+        parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight at once.")
+        parser.add_argument("--user", help="Username to log in as (session cookie sent with every request).")
+        parser.add_argument("--timeout", type=float, default=30, help="Seconds before a request counts as failed.")
+
+    def session_cookie(self, username):
+        try:
+            user = get_user_model().objects.get(username=username)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user named {username!r}.")
+        client = Client()
+        client.force_login(user)
+        return f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+    def fetch(self, url, headers, timeout):
+        """(url, status or error name, seconds) for one request."""
+        request = urllib.request.Request(url, headers=headers)
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+            status = type(e).__name__
+        return url, status, time.perf_counter() - start
+
+    def handle(self, *args, **opts):
+        for url in opts["urls"]:
+            if urlsplit(url).scheme not in ("http", "https"):
+                raise CommandError(f"Not an absolute http(s) URL: {url}")
+        headers = {}
+        if opts["user"]:
+            headers["Cookie"] = self.session_cookie(opts["user"])
+
+        urls = [opts["urls"][i % len(opts["urls"])] for i in range(opts["requests"])]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(opts["concurrency"]) as pool:
+            results = list(pool.map(lambda url: self.fetch(url, headers, opts["timeout"]), urls))
+        elapsed = time.perf_counter() - started
+
+        by_url = defaultdict(list)
+        statuses = Counter()
+        for url, status, seconds in results:
+            by_url[url].append(seconds)
+            statuses[status] += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(results)} requests, concurrency {opts['concurrency']}: "
+            f"{elapsed:.2f}s, {len(results) / elapsed:.1f} req/s"
+        ))
+        self.stdout.write("  status: " + ", ".join(f"{status} x{count}" for status, count in sorted(statuses.items(), key=str)))
+        for url, times in by_url.items():
+            times.sort()
+            p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+            self.stdout.write(
+                f"  {url}\n    p50 {statistics.median(times) * 1000:.0f} ms, "
+                f"p95 {p95 * 1000:.0f} ms, max {times[-1] * 1000:.0f} ms"
+            )
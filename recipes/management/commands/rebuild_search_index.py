@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.search_backends import IcontainsSearchBackend, get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index used by recipe_search."
+
+    def handle(self, *args, **opts):
+        backend = get_search_backend()
+        name = type(backend).__name__
+        if isinstance(backend, IcontainsSearchBackend):
+            self.stdout.write(self.style.WARNING(f"{name} has no index to rebuild (run migrate to create one)."))
+            return
+
+        self.stdout.write(self.style.NOTICE(f"Rebuilding search index with {name}…"))
+        with transaction.atomic():
+            backend.rebuild()
+        self.stdout.write(self.style.SUCCESS("Done."))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from recipes.stats import rebuild_recipe_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the RecipeStats summary rows behind the unfiltered charts."
+
+    def handle(self, *args, **opts):
+        self.stdout.write(self.style.NOTICE("Recounting recipes by difficulty, cook time and day…"))
+        rows = rebuild_recipe_stats()
+        self.stdout.write(self.style.SUCCESS(f"Done: {rows} rows."))
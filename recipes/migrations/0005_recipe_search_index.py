@@ -0,0 +1,72 @@
+# Full-text search index for recipe_search (see recipes/search_backends.py)
+# The SQL is a copy of the backends' install()/rebuild() as they were at
+# this migration, so later changes to the app code can't alter it
+
+from django.db import DatabaseError, migrations
+
+FTS_TABLE = "recipes_recipe_fts"
+GIN_INDEX = "recipes_recipe_search_vector_gin"
+# Ingredient names of recipe r, as one space-separated string
+INGREDIENT_NAMES = (
+    "SELECT {aggregate}(i.name, ' ') FROM recipes_recipeingredient ri "
+    "JOIN recipes_ingredient i ON i.id = ri.ingredient_id WHERE ri.recipe_id = r.id"
+)
+
+
+def create_sqlite_index(cursor):
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+        "USING fts5(name, description, ingredients, tokenize='unicode61')"
+    )
+    # Fill the new index with the existing recipes
+    cursor.execute(
+        f"INSERT INTO {FTS_TABLE} (rowid, name, description, ingredients) "
+        f"SELECT r.id, r.name, r.description, COALESCE(({INGREDIENT_NAMES.format(aggregate='group_concat')}), '') "
+        "FROM recipes_recipe r"
+    )
+
+
+def create_postgres_index(cursor):
+    cursor.execute("ALTER TABLE recipes_recipe ADD COLUMN IF NOT EXISTS search_vector tsvector")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {GIN_INDEX} ON recipes_recipe USING gin (search_vector)")
+    cursor.execute(
+        "UPDATE recipes_recipe r SET search_vector = "
+        "setweight(to_tsvector('simple', COALESCE(r.name, '')), 'A') || "
+        "setweight(to_tsvector('simple', COALESCE(r.description, '')), 'B') || "
+        f"setweight(to_tsvector('simple', COALESCE(({INGREDIENT_NAMES.format(aggregate='string_agg')}), '')), 'C')"
+    )
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == "postgresql":
+            create_postgres_index(cursor)
+        elif vendor == "sqlite":
+            try:
+                create_sqlite_index(cursor)
+            except DatabaseError:
+                # e.g. SQLite compiled without FTS5: the fallback backend takes over
+                pass
+        # Other databases use the icontains fallback, nothing to create
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == "postgresql":
+            cursor.execute(f"DROP INDEX IF EXISTS {GIN_INDEX}")
+            cursor.execute("ALTER TABLE recipes_recipe DROP COLUMN IF EXISTS search_vector")
+        elif vendor == "sqlite":
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0004_alter_recipe_pic"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
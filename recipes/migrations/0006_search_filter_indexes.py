@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0005_recipe_search_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                fields=["difficulty", "cook_time_minutes"],
+                name="recipe_difficulty_time_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                fields=["cook_time_minutes"], name="recipe_cook_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(fields=["name", "id"], name="recipe_name_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="recipeingredient",
+            index=models.Index(
+                fields=["ingredient", "recipe"], name="recipeingr_ingr_recipe_idx"
+            ),
+        ),
+    ]
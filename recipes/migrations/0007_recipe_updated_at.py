@@ -0,0 +1,26 @@
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def copy_created_at(apps, schema_editor):
+    # Existing recipes start out "last updated" when they were created
+    Recipe = apps.get_model("recipes", "Recipe")
+    Recipe.objects.update(updated_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0006_search_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+    ]
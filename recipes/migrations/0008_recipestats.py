@@ -0,0 +1,85 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:13
+
+from django.db import migrations, models
+from django.db.models import Case, Count, IntegerField, Value, When
+from django.db.models.functions import TruncDate
+
+# Upper bound (minutes) of each cook-time bucket but the last, as in
+# recipes.charts.COOK_TIME_BUCKETS when this migration was written
+COOK_TIME_LIMITS = [30, 60]
+
+
+def fill_recipe_stats(apps, schema_editor):
+    # Same counts as rebuild_recipe_stats(), from the historical models; the
+    # aggregation is copied here so later changes to recipes.stats can't
+    # alter this migration
+    Recipe = apps.get_model("recipes", "Recipe")
+    RecipeStats = apps.get_model("recipes", "RecipeStats")
+    recipes = Recipe.objects.order_by()
+    counts = {}
+    for difficulty, count in recipes.values_list("difficulty").annotate(count=Count("pk")):
+        counts["difficulty", difficulty] = count
+    bucket = Case(
+        *[When(cook_time_minutes__lte=limit, then=Value(i)) for i, limit in enumerate(COOK_TIME_LIMITS)],
+        default=Value(len(COOK_TIME_LIMITS)),
+        output_field=IntegerField(),
+    )
+    buckets = (
+        recipes.filter(cook_time_minutes__isnull=False)
+        .annotate(bucket=bucket)
+        .values_list("bucket").annotate(count=Count("pk"))
+    )
+    for index, count in buckets:
+        counts["cook_time", str(index)] = count
+    days = (
+        recipes.filter(created_at__isnull=False)
+        .annotate(day=TruncDate("created_at"))
+        .values_list("day").annotate(count=Count("pk"))
+    )
+    for day, count in days:
+        counts["day", day.isoformat()] = count
+    RecipeStats.objects.bulk_create(
+        RecipeStats(kind=kind, key=key, count=count) for (kind, key), count in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0007_recipe_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecipeStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("difficulty", "Difficulty"),
+                            ("cook_time", "Cook-time bucket"),
+                            ("day", "Creation day"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("key", models.CharField(max_length=40)),
+                ("count", models.IntegerField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "recipe stats",
+                "unique_together": {("kind", "key")},
+            },
+        ),
+        migrations.RunPython(fill_recipe_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:18
+
+from django.db import migrations, models
+
+
+def fill_ingredient_fields(apps, schema_editor):
+    # Same values as sync_ingredient_fields(), from the historical models
+    # (names sorted case-insensitively, joined with ", "; copied here so later
+    # changes to recipes.ingredient_fields can't alter this migration)
+    Recipe = apps.get_model("recipes", "Recipe")
+    RecipeIngredient = apps.get_model("recipes", "RecipeIngredient")
+    names = {}
+    for recipe_id, name in RecipeIngredient.objects.values_list("recipe_id", "ingredient__name").order_by():
+        names.setdefault(recipe_id, []).append(name)
+    recipes = [
+        Recipe(
+            pk=pk, ingredient_count=len(found),
+            ingredient_names=", ".join(sorted(found, key=lambda name: (name.lower(), name))),
+        )
+        for pk, found in names.items()
+    ]
+    Recipe.objects.bulk_update(recipes, ["ingredient_count", "ingredient_names"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0008_recipestats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="ingredient_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="recipe",
+            name="ingredient_names",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.RunPython(fill_ingredient_fields, migrations.RunPython.noop),
+    ]
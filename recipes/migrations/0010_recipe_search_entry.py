@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0009_recipe_ingredient_fields"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecipeSearchEntry",
+            fields=[
+                (
+                    "recipe",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_entry",
+                        serialize=False,
+                        to="recipes.recipe",
+                    ),
+                ),
+                ("document", models.TextField(db_column="recipes_recipe_fts")),
+                ("rank", models.FloatField()),
+            ],
+            options={
+                "db_table": "recipes_recipe_fts",
+                "managed": False,
+            },
+        ),
+    ]
@@ -26,6 +26,13 @@ class Recipe(models.Model):
         "Ingredient", through="RecipeIngredient", related_name="recipes"
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # Version stamp for cached fragments; also moved forward when the recipe's
+    # ingredients change (see recipes/fragment_cache.py)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Denormalised from the ingredient links, so lists and searches need no
+    # join (kept current by signals, see recipes/ingredient_fields.py)
+    ingredient_count = models.PositiveIntegerField(default=0, editable=False)
+    ingredient_names = models.TextField(blank=True, default="", editable=False)
 
     # --- ADDED FOR EXERCISE 2.7 ---
     DIFFICULTY_CHOICES = (
@@ -44,6 +51,13 @@ class Recipe(models.Model):
 
     class Meta:
         ordering = ["name"]
+        # Match the recipe_search filters and the (name, pk) keyset pages;
+        # see `python manage.py explain_search`
+        indexes = [
+            models.Index(fields=["difficulty", "cook_time_minutes"], name="recipe_difficulty_time_idx"),
+            models.Index(fields=["cook_time_minutes"], name="recipe_cook_time_idx"),
+            models.Index(fields=["name", "id"], name="recipe_name_id_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -58,4 +72,69 @@ class RecipeIngredient(models.Model):
     unit = models.CharField(max_length=32, blank=True)
 
     class Meta:
-        unique_together = ("recipe", "ingredient")
\ No newline at end of file
+        unique_together = ("recipe", "ingredient")
+        # Ingredient-first for reverse lookups (ingredient -> recipes)
+        indexes = [
+            models.Index(fields=["ingredient", "recipe"], name="recipeingr_ingr_recipe_idx"),
+        ]
+
+
+class RecipeStats(models.Model):
+    """
+    Pre-aggregated recipe counts behind the unfiltered search charts: one
+    row per difficulty, cook-time bucket and creation day. Kept current by
+    signals (see recipes/stats.py); `refresh_recipe_stats` rebuilds it.
+    """
+    DIFFICULTY = "difficulty"
+    COOK_TIME = "cook_time"
+    DAY = "day"
+    KIND_CHOICES = (
+        (DIFFICULTY, "Difficulty"),
+        (COOK_TIME, "Cook-time bucket"),
+        (DAY, "Creation day"),
+    )
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    # Difficulty, bucket index (see charts.COOK_TIME_BUCKETS) or ISO date
+    key = models.CharField(max_length=40)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("kind", "key")
+        verbose_name_plural = "recipe stats"
+
+    def __str__(self):
+        return f"{self.kind} {self.key}: {self.count}"
+
+class Match(models.Lookup):
+    """field__match=query: SQLite's MATCH operator, for FTS5 columns."""
+    lookup_name = "match"
+    # The query is FTS syntax, not a value of the column's type
+    prepare_rhs = False
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+class RecipeSearchEntry(models.Model):
+    """
+    One row of the SQLite FTS5 search index (created by migration 0005), so
+    a search can join it and order by its bm25 rank in the same query. Only
+    SQLiteFTS5SearchBackend uses it; other databases have no such table.
+    """
+    recipe = models.OneToOneField(
+        Recipe, on_delete=models.DO_NOTHING, primary_key=True,
+        db_column="rowid", db_constraint=False, related_name="search_entry",
+    )
+    # FTS5 hidden columns: the one named after the table takes the MATCH
+    # query, "rank" is the score (bm25; lower is better)
+    document = models.TextField(db_column="recipes_recipe_fts")
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "recipes_recipe_fts"
+
+RecipeSearchEntry._meta.get_field("document").register_lookup(Match)
+RecipeSearchEntry._meta.get_field("rank").register_lookup(Match)
@@ -0,0 +1,141 @@
+# recipes/pagination.py
+"""
+Keyset (seek) pagination ordered by (name, pk).
+
+Instead of OFFSET, each page remembers the (name, pk) of its first and last
+rows in an opaque cursor and the next query seeks past them, e.g.
+``WHERE name > 'Pie' OR (name = 'Pie' AND id > 7) ORDER BY name, id``.
+That costs the same on page 1 and page 1000, and rows inserted or deleted
+meanwhile never shift items across pages (no duplicates, no gaps).
+
+Another unique-with-pk ordering works the same way: the API pages ranked
+search hits by (search_rank, pk), the float score the search backend
+annotates.
+"""
+
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    """Raised for cursors that can't be decoded."""
+
+
+def encode_cursor(direction, name, pk):
+    """
+    Opaque token for "continue after (name, pk)" ("n") or "before" ("p").
+    name is the sort key's value (a string, or a search rank).
+    """
+    raw = json.dumps([direction, name, pk], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """Returns (direction, name, pk) from a cursor made by encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        direction, name, pk = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(token) from e
+    if direction not in ("n", "p") or not isinstance(name, (str, int, float)) or not isinstance(pk, int):
+        raise InvalidCursor(token)
+    return direction, name, pk
+
+
+def get_page_size():
+    return getattr(settings, "RECIPE_PAGE_SIZE", 24)
+
+
+class KeysetPage:
+    """One page of rows plus cursors to its neighbours (None at the ends)."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+class KeysetPaginator:
+    """
+    Pages through a queryset by (name, pk). Works with model instances and
+    with values_list(named=True) rows, as long as they have name and pk.
+    key/key_type switch the first column to another field or annotation.
+    """
+
+    def __init__(self, queryset, per_page=None, key="name", key_type=str):
+        self.queryset = queryset
+        self.per_page = per_page or get_page_size()
+        self.key = key
+        self.key_type = key_type
+
+    def page(self, cursor=None):
+        """The first page, or the page before/after the given cursor."""
+        qs, backwards = self._seek(cursor)
+        return self._page(list(qs), cursor, backwards)
+
+    async def apage(self, cursor=None):
+        """page() for async views (async ORM iteration)."""
+        qs, backwards = self._seek(cursor)
+        return self._page([row async for row in qs], cursor, backwards)
+
+    def _seek(self, cursor):
+        """The (unevaluated) query for one page plus one extra row."""
+        qs = self.queryset
+        backwards = False
+        key = self.key
+        if cursor:
+            direction, value, pk = decode_cursor(cursor)
+            # A cursor from another ordering (e.g. a name for a rank)
+            if type(value) is not self.key_type:
+                raise InvalidCursor(cursor)
+            backwards = direction == "p"
+            # The extra name__gte/lte bound is implied by the OR, but lets the
+            # database range-seek recipe_name_id_idx instead of scanning it
+            before, after = ("lt", "lte") if backwards else ("gt", "gte")
+            qs = qs.filter(
+                Q(**{f"{key}__{before}": value}) | Q(**{key: value, f"pk__{before}": pk}),
+                **{f"{key}__{after}": value},
+            )
+        order = (f"-{key}", "-pk") if backwards else (key, "pk")
+        # Fetch one extra row to know whether there is more in that direction
+        return qs.order_by(*order)[: self.per_page + 1], backwards
+
+    def _page(self, rows, cursor, backwards):
+        more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if backwards:
+            rows.reverse()
+        if not rows:
+            return KeysetPage([])
+
+        first, last = rows[0], rows[-1]
+        # Going forward there is a previous page iff we came from a cursor,
+        # going backward there is always a next page (the one we came from)
+        has_next = more if not backwards else True
+        has_previous = bool(cursor) if not backwards else more
+        return KeysetPage(
+            rows,
+            next_cursor=encode_cursor("n", getattr(last, self.key), last.pk) if has_next else None,
+            previous_cursor=encode_cursor("p", getattr(first, self.key), first.pk) if has_previous else None,
+        )
@@ -0,0 +1,241 @@
+# recipes/search_backends.py
+"""
+Full-text search backends for recipe_search.
+
+Every backend narrows a Recipe queryset to the matches of a text with
+``ranked(qs, text)``, annotating each row with its ``search_rank`` (lower is
+better) in the same query, so the database does the ordering and keyset
+pages seek on that column. ``search(text)`` is the plain list of matching
+recipe ids, best first. Matches cover the recipe name, description and
+ingredient names:
+
+- PostgresSearchBackend: tsvector column + GIN index on recipes_recipe
+- SQLiteFTS5SearchBackend: FTS5 shadow table (development database), joined
+  through the unmanaged RecipeSearchEntry model
+- IcontainsSearchBackend: plain ORM fallback for anything else
+
+Pick one with the RECIPE_SEARCH_BACKEND setting (a dotted path, or "auto" to
+choose by database vendor). The index is kept current by recipes/signals.py
+and can be rebuilt with ``python manage.py rebuild_search_index``.
+"""
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import DatabaseError, connection
+from django.db.models import BooleanField, Case, F, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .search_index import tokenize
+
+# Raw table names (used by the SQL below)
+RECIPE_TABLE = "recipes_recipe"
+INGREDIENT_TABLE = "recipes_ingredient"
+LINK_TABLE = "recipes_recipeingredient"
+FTS_TABLE = "recipes_recipe_fts"
+GIN_INDEX = "recipes_recipe_search_vector_gin"
+
+
+class BaseSearchBackend:
+    """Interface shared by all search backends."""
+
+    def is_available(self):
+        return True
+
+    def ranked(self, qs, text):
+        """qs narrowed to the matches of text and annotated with a float search_rank (lower = better)."""
+        raise NotImplementedError
+
+    def search(self, text, limit=None):
+        """Returns matching recipe ids, most relevant first (at most limit, if given)."""
+        from .models import Recipe
+
+        ids = self.ranked(Recipe.objects.all(), text).order_by("search_rank", "name", "pk").values_list("pk", flat=True)
+        return list(ids[:limit] if limit else ids)
+
+    @staticmethod
+    def no_matches(qs):
+        # Nothing to look for (e.g. only punctuation): no rows, same columns
+        return qs.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def index_recipes(self, recipe_ids):
+        """(Re)indexes the given recipes; deleted ids are dropped."""
+
+    def rebuild(self):
+        """Re-creates the whole index from the recipe tables."""
+
+
+class IcontainsSearchBackend(BaseSearchBackend):
+    """ORM-only fallback: substring match, name hits ranked first."""
+
+    def ranked(self, qs, text):
+        text = (text or "").strip()
+        if not text:
+            return self.no_matches(qs)
+        # Ingredient names come from the denormalised column: no join, no DISTINCT
+        matches = (
+            Q(name__icontains=text)
+            | Q(description__icontains=text)
+            | Q(ingredient_names__icontains=text)
+        )
+        rank = Case(When(name__icontains=text, then=Value(0.0)), default=Value(1.0), output_field=FloatField())
+        return qs.filter(matches).annotate(search_rank=rank)
+
+
+class SQLiteFTS5SearchBackend(BaseSearchBackend):
+    """FTS5 shadow table keyed by recipe id (rowid), ranked with bm25."""
+
+    # bm25 column weights: name, description, ingredients
+    weights = (10.0, 2.0, 5.0)
+
+    @staticmethod
+    def install(cursor):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            "USING fts5(name, description, ingredients, tokenize='unicode61')"
+        )
+
+    @staticmethod
+    def uninstall(cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+    def is_available(self):
+        return FTS_TABLE in connection.introspection.table_names()
+
+    @staticmethod
+    def build_query(text):
+        # Every word must appear, each as a prefix ("piz" finds "pizza")
+        return " ".join(f'"{word}"*' for word in tokenize(text))
+
+    def ranked(self, qs, text):
+        query = self.build_query(text)
+        if not query:
+            return self.no_matches(qs)
+        # One join to the index: SQLite walks the FTS matches and looks each
+        # recipe up by pk; "rank MATCH" picks the weighted bm25() as the score
+        weights = ", ".join(str(weight) for weight in self.weights)
+        return qs.filter(
+            search_entry__document__match=query,
+            search_entry__rank__match=f"bm25({weights})",
+        ).annotate(search_rank=F("search_entry__rank"))
+
+    def _populate(self, cursor, where="", params=()):
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, description, ingredients) "
+            f"SELECT r.id, r.name, r.description, "
+            f"COALESCE((SELECT group_concat(i.name, ' ') FROM {LINK_TABLE} ri "
+            f"JOIN {INGREDIENT_TABLE} i ON i.id = ri.ingredient_id WHERE ri.recipe_id = r.id), '') "
+            f"FROM {RECIPE_TABLE} r {where}",
+            params,
+        )
+
+    def index_recipes(self, recipe_ids):
+        recipe_ids = list(recipe_ids)
+        if not recipe_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(recipe_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", recipe_ids)
+            self._populate(cursor, f"WHERE r.id IN ({placeholders})", recipe_ids)
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            self._populate(cursor)
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """Weighted tsvector column on recipes_recipe with a GIN index."""
+
+    # "simple" keeps prefix matching predictable (no stemming)
+    config = "simple"
+
+    @staticmethod
+    def install(cursor):
+        cursor.execute(f"ALTER TABLE {RECIPE_TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {GIN_INDEX} ON {RECIPE_TABLE} USING gin (search_vector)")
+
+    @staticmethod
+    def uninstall(cursor):
+        cursor.execute(f"DROP INDEX IF EXISTS {GIN_INDEX}")
+        cursor.execute(f"ALTER TABLE {RECIPE_TABLE} DROP COLUMN IF EXISTS search_vector")
+
+    def is_available(self):
+        with connection.cursor() as cursor:
+            columns = connection.introspection.get_table_description(cursor, RECIPE_TABLE)
+        return any(col.name == "search_vector" for col in columns)
+
+    @staticmethod
+    def build_query(text):
+        return " & ".join(f"{word}:*" for word in tokenize(text))
+
+    def ranked(self, qs, text):
+        query = self.build_query(text)
+        if not query:
+            return self.no_matches(qs)
+        # search_vector isn't a model field (the migration adds it), hence
+        # the raw expressions; ts_rank is negated so that lower is better
+        tsquery = "to_tsquery(%s, %s)"
+        params = (self.config, query)
+        return qs.alias(
+            search_match=RawSQL(f"{RECIPE_TABLE}.search_vector @@ {tsquery}", params, output_field=BooleanField()),
+        ).filter(search_match=True).annotate(
+            search_rank=RawSQL(f"-ts_rank({RECIPE_TABLE}.search_vector, {tsquery})", params, output_field=FloatField()),
+        )
+
+    def _update(self, cursor, where="", params=()):
+        cursor.execute(
+            f"UPDATE {RECIPE_TABLE} r SET search_vector = "
+            f"setweight(to_tsvector(%s, COALESCE(r.name, '')), 'A') || "
+            f"setweight(to_tsvector(%s, COALESCE(r.description, '')), 'B') || "
+            f"setweight(to_tsvector(%s, COALESCE((SELECT string_agg(i.name, ' ') FROM {LINK_TABLE} ri "
+            f"JOIN {INGREDIENT_TABLE} i ON i.id = ri.ingredient_id WHERE ri.recipe_id = r.id), '')), 'C') "
+            f"{where}",
+            [self.config, self.config, self.config, *params],
+        )
+
+    def index_recipes(self, recipe_ids):
+        recipe_ids = list(recipe_ids)
+        if not recipe_ids:
+            return
+        with connection.cursor() as cursor:
+            self._update(cursor, "WHERE r.id = ANY(%s)", [recipe_ids])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            self._update(cursor)
+
+
+# Backend used for each database vendor when RECIPE_SEARCH_BACKEND is "auto"
+VENDOR_BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteFTS5SearchBackend,
+}
+
+_backend = None
+
+
+def get_search_backend():
+    """Returns the configured backend, falling back to icontains if its index is missing."""
+    global _backend
+    if _backend is None:
+        path = getattr(settings, "RECIPE_SEARCH_BACKEND", "auto")
+        if path == "auto":
+            backend_class = VENDOR_BACKENDS.get(connection.vendor, IcontainsSearchBackend)
+        else:
+            backend_class = import_string(path)
+        backend = backend_class()
+        try:
+            available = backend.is_available()
+        except DatabaseError:
+            available = False
+        _backend = backend if available else IcontainsSearchBackend()
+    return _backend
+
+
+@receiver(setting_changed)
+def reset_search_backend(setting, **kwargs):
+    global _backend
+    if setting in ("RECIPE_SEARCH_BACKEND", "DATABASES"):
+        _backend = None
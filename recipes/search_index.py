@@ -0,0 +1,164 @@
+# recipes/search_index.py
+
+import re
+import threading
+import time
+
+from django.conf import settings
+
+# Split ingredient names into lower-case words ("Olive Oil" -> ["olive", "oil"])
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Lower-cases text and splits it into word tokens."""
+    return TOKEN_RE.findall((text or "").lower())
+
+
+class IngredientIndex:
+    """
+    In-memory inverted index: ingredient words -> ingredient ids -> recipe ids.
+
+    Built lazily from the database on first use, then kept current by the
+    signal handlers in recipes/signals.py. Each process holds its own copy,
+    so it is also rebuilt every RECIPE_INGREDIENT_INDEX_TTL seconds to pick
+    up writes made by other workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built_at = None
+        # ingredient id -> lower-cased name
+        self._names = {}
+        # word -> set of ingredient ids
+        self._tokens = {}
+        # ingredient id -> set of recipe ids
+        self._recipes = {}
+
+    # Building / resetting
+
+    def clear(self):
+        """Drops everything; the next lookup rebuilds from the database."""
+        with self._lock:
+            self._built_at = None
+            self._names = {}
+            self._tokens = {}
+            self._recipes = {}
+
+    def _is_stale(self):
+        if self._built_at is None:
+            return True
+        ttl = getattr(settings, "RECIPE_INGREDIENT_INDEX_TTL", 300)
+        return bool(ttl) and time.monotonic() - self._built_at > ttl
+
+    def _build(self):
+        # Imported here so the module can load before the app registry is ready
+        from .models import Ingredient, RecipeIngredient
+
+        names = {}
+        tokens = {}
+        recipes = {}
+        # One query for the ingredient names...
+        for pk, name in Ingredient.objects.values_list("pk", "name"):
+            names[pk] = name.lower()
+            for token in tokenize(name):
+                tokens.setdefault(token, set()).add(pk)
+        # ...and one for the recipe links
+        for recipe_id, ingredient_id in RecipeIngredient.objects.values_list("recipe_id", "ingredient_id"):
+            recipes.setdefault(ingredient_id, set()).add(recipe_id)
+
+        self._names, self._tokens, self._recipes = names, tokens, recipes
+        self._built_at = time.monotonic()
+
+    def _ensure_built(self):
+        if self._is_stale():
+            self._build()
+
+    # Incremental updates (called from signals)
+
+    def set_ingredient(self, ingredient_id, name):
+        """Adds an ingredient or re-indexes it after a rename."""
+        with self._lock:
+            if self._built_at is None:
+                return
+            self._drop_tokens(ingredient_id)
+            self._names[ingredient_id] = name.lower()
+            for token in tokenize(name):
+                self._tokens.setdefault(token, set()).add(ingredient_id)
+
+    def remove_ingredient(self, ingredient_id):
+        with self._lock:
+            if self._built_at is None:
+                return
+            self._drop_tokens(ingredient_id)
+            self._names.pop(ingredient_id, None)
+            self._recipes.pop(ingredient_id, None)
+
+    def add_link(self, recipe_id, ingredient_id):
+        with self._lock:
+            if self._built_at is None:
+                return
+            self._recipes.setdefault(ingredient_id, set()).add(recipe_id)
+
+    def remove_link(self, recipe_id, ingredient_id):
+        with self._lock:
+            if self._built_at is None:
+                return
+            self._recipes.get(ingredient_id, set()).discard(recipe_id)
+
+    def _drop_tokens(self, ingredient_id):
+        old_name = self._names.get(ingredient_id)
+        if old_name is None:
+            return
+        for token in tokenize(old_name):
+            ids = self._tokens.get(token)
+            if ids is not None:
+                ids.discard(ingredient_id)
+                if not ids:
+                    del self._tokens[token]
+
+    # Lookups
+
+    def _ingredients_matching(self, term):
+        """Ingredient ids whose name contains term, like name__icontains."""
+        term = term.lower()
+        words = tokenize(term)
+        if not words:
+            return set()
+        # Narrow down with the word index: every word of the term must be
+        # part of some word of the ingredient name
+        candidates = None
+        for word in words:
+            ids = set()
+            for token, token_ids in self._tokens.items():
+                if word in token:
+                    ids |= token_ids
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return set()
+        # Then confirm the full term really is a substring of the name
+        return {pk for pk in candidates if term in self._names.get(pk, "")}
+
+    def recipe_ids(self, terms, match_all=False):
+        """
+        Returns the set of recipe ids using any (or, with match_all, every)
+        ingredient term.
+        """
+        with self._lock:
+            self._ensure_built()
+            result = None
+            for term in terms:
+                ids = set()
+                for ingredient_id in self._ingredients_matching(term):
+                    ids |= self._recipes.get(ingredient_id, set())
+                if result is None:
+                    result = ids
+                elif match_all:
+                    result &= ids
+                else:
+                    result |= ids
+            return result or set()
+
+
+# Shared per-process index used by the views
+ingredient_index = IngredientIndex()
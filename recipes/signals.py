@@ -0,0 +1,238 @@
+# recipes/signals.py
+
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .auth_cache import forget_user
+from .fragment_cache import invalidate_recipe_fragments, touch_recipes
+from .ingredient_fields import sync_ingredient_fields
+from .models import Ingredient, Recipe, RecipeIngredient
+from .search_backends import get_search_backend
+from .search_index import ingredient_index
+from .stats import STATS_FIELDS, adjust_stats, recipe_stats_keys, stats_keys
+
+
+# Ingredient index upkeep (keeps recipe_search's in-memory index current)
+# The index lives outside the database, so it only changes once the write
+# commits: a rolled-back transaction leaves it as it was. Outside a
+# transaction on_commit() runs the update straight away.
+
+def update_index(method, *args):
+    transaction.on_commit(partial(method, *args))
+
+
+@receiver(post_save, sender=Ingredient)
+def index_ingredient_saved(sender, instance, **kwargs):
+    update_index(ingredient_index.set_ingredient, instance.pk, instance.name)
+
+
+@receiver(post_delete, sender=Ingredient)
+def index_ingredient_deleted(sender, instance, **kwargs):
+    update_index(ingredient_index.remove_ingredient, instance.pk)
+
+
+@receiver(pre_save, sender=RecipeIngredient)
+def remember_old_link(sender, instance, **kwargs):
+    # Edits can move a row to another recipe/ingredient, so note the old pair
+    instance._old_link = None
+    if instance.pk:
+        instance._old_link = (
+            RecipeIngredient.objects.filter(pk=instance.pk)
+            .values_list("recipe_id", "ingredient_id")
+            .first()
+        )
+
+
+@receiver(post_save, sender=RecipeIngredient)
+def index_link_saved(sender, instance, **kwargs):
+    old_link = getattr(instance, "_old_link", None)
+    if old_link and old_link != (instance.recipe_id, instance.ingredient_id):
+        update_index(ingredient_index.remove_link, *old_link)
+    update_index(ingredient_index.add_link, instance.recipe_id, instance.ingredient_id)
+
+
+@receiver(post_delete, sender=RecipeIngredient)
+def index_link_deleted(sender, instance, **kwargs):
+    update_index(ingredient_index.remove_link, instance.recipe_id, instance.ingredient_id)
+
+
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def index_links_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # recipe.ingredients.add()/remove() bulk-write the join table without
+    # sending post_save/post_delete, so handle them here
+    if action in ("post_add", "post_remove"):
+        for other_pk in pk_set or ():
+            recipe_id, ingredient_id = (other_pk, instance.pk) if reverse else (instance.pk, other_pk)
+            if action == "post_add":
+                update_index(ingredient_index.add_link, recipe_id, ingredient_id)
+            else:
+                update_index(ingredient_index.remove_link, recipe_id, ingredient_id)
+    elif action == "post_clear":
+        # clear() doesn't say which rows went away; rebuild on next lookup
+        update_index(ingredient_index.clear)
+
+
+# Full-text index upkeep (name, description and ingredient names per recipe)
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def search_recipe_changed(sender, instance, **kwargs):
+    get_search_backend().index_recipes([instance.pk])
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def search_link_changed(sender, instance, **kwargs):
+    recipe_ids = {instance.recipe_id}
+    old_link = getattr(instance, "_old_link", None)
+    if old_link:
+        recipe_ids.add(old_link[0])
+    get_search_backend().index_recipes(recipe_ids)
+
+
+@receiver(post_save, sender=Ingredient)
+def search_ingredient_renamed(sender, instance, created, **kwargs):
+    if created:
+        return
+    recipe_ids = RecipeIngredient.objects.filter(ingredient=instance).values_list("recipe_id", flat=True)
+    get_search_backend().index_recipes(recipe_ids)
+
+
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def search_links_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        # Remember which recipes lose this ingredient before the rows go
+        instance._cleared_recipe_ids = list(
+            RecipeIngredient.objects.filter(ingredient=instance).values_list("recipe_id", flat=True)
+        )
+    elif action in ("post_add", "post_remove"):
+        get_search_backend().index_recipes((pk_set or ()) if reverse else [instance.pk])
+    elif action == "post_clear":
+        get_search_backend().index_recipes(getattr(instance, "_cleared_recipe_ids", ()) if reverse else [instance.pk])
+
+
+# Denormalised ingredient columns (Recipe.ingredient_count / ingredient_names)
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def ingredient_fields_link_changed(sender, instance, **kwargs):
+    recipe_ids = {instance.recipe_id}
+    old_link = getattr(instance, "_old_link", None)
+    if old_link:
+        recipe_ids.add(old_link[0])
+    sync_ingredient_fields(recipe_ids)
+
+
+@receiver(post_save, sender=Ingredient)
+def ingredient_fields_renamed(sender, instance, created, **kwargs):
+    if not created:
+        sync_ingredient_fields(RecipeIngredient.objects.filter(ingredient=instance).values_list("recipe_id", flat=True))
+
+
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def ingredient_fields_links_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("post_add", "post_remove"):
+        sync_ingredient_fields((pk_set or ()) if reverse else [instance.pk])
+    elif action == "post_clear":
+        # search_links_changed noted the affected recipes at pre_clear
+        sync_ingredient_fields(getattr(instance, "_cleared_recipe_ids", ()) if reverse else [instance.pk])
+
+
+# Bulk writes (bulk_create/update skip every handler above)
+
+def recipe_links_bulk_changed(recipe_ids):
+    """
+    Brings the indexes and caches up to date after ingredient links for these
+    recipes were written in bulk. Call it inside the same transaction.
+    """
+    recipe_ids = set(recipe_ids)
+    if not recipe_ids:
+        return
+    # This worker rebuilds its ingredient index on the next lookup; others
+    # catch up within RECIPE_INGREDIENT_INDEX_TTL
+    update_index(ingredient_index.clear)
+    get_search_backend().index_recipes(recipe_ids)
+    sync_ingredient_fields(recipe_ids)
+    touch_recipes(recipe_ids)
+
+
+# Recipe statistics upkeep (RecipeStats rows behind the unfiltered charts)
+
+@receiver(pre_save, sender=Recipe)
+def remember_old_stats(sender, instance, **kwargs):
+    # Edits can move a recipe to another difficulty/bucket/day, so note the
+    # rows it counted towards (also covers loaddata, which sets explicit pks)
+    instance._old_stats_keys = []
+    if instance.pk is not None:
+        old = Recipe.objects.filter(pk=instance.pk).values_list(*STATS_FIELDS).first()
+        if old:
+            instance._old_stats_keys = stats_keys(*old)
+
+
+@receiver(post_save, sender=Recipe)
+def stats_recipe_saved(sender, instance, **kwargs):
+    old_keys = getattr(instance, "_old_stats_keys", [])
+    new_keys = recipe_stats_keys(instance)
+    adjust_stats([key for key in old_keys if key not in new_keys], -1)
+    adjust_stats([key for key in new_keys if key not in old_keys], +1)
+
+
+@receiver(post_delete, sender=Recipe)
+def stats_recipe_deleted(sender, instance, **kwargs):
+    adjust_stats(recipe_stats_keys(instance), -1)
+
+
+# Fragment cache upkeep (cached detail bodies and list cards)
+
+@receiver(pre_save, sender=Recipe)
+def stamp_loaded_recipe(sender, instance, raw, **kwargs):
+    # loaddata saves raw, which skips auto_now; fixtures from before
+    # updated_at existed start out "last updated" when created (as in 0007)
+    if raw and instance.updated_at is None:
+        instance.updated_at = instance.created_at or timezone.now()
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def fragments_recipe_changed(sender, instance, **kwargs):
+    # save(update_fields=[...]) without updated_at keeps the version, so drop
+    # the entries for it; a moved version misses by itself
+    invalidate_recipe_fragments(instance)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def fragments_link_changed(sender, instance, **kwargs):
+    recipe_ids = {instance.recipe_id}
+    old_link = getattr(instance, "_old_link", None)
+    if old_link:
+        recipe_ids.add(old_link[0])
+    touch_recipes(recipe_ids)
+
+
+@receiver(post_save, sender=Ingredient)
+def fragments_ingredient_renamed(sender, instance, created, **kwargs):
+    if not created:
+        touch_recipes(RecipeIngredient.objects.filter(ingredient=instance).values_list("recipe_id", flat=True))
+
+
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def fragments_links_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("post_add", "post_remove"):
+        touch_recipes((pk_set or ()) if reverse else [instance.pk])
+    elif action == "post_clear":
+        # search_links_changed noted the affected recipes at pre_clear
+        touch_recipes(getattr(instance, "_cleared_recipe_ids", ()) if reverse else [instance.pk])
+
+
+# Cached users (recipes.auth_cache.CachedModelBackend)
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def cached_user_changed(sender, instance, **kwargs):
+    forget_user(instance.pk)
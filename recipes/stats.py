@@ -0,0 +1,132 @@
+# recipes/stats.py
+"""
+Materialised recipe statistics (RecipeStats) for the unfiltered charts.
+
+Counts per difficulty, cook-time bucket and creation day are kept in a
+small table. Signal handlers move them by ±1 whenever a recipe is saved or
+deleted; bulk writes that skip signals (the fixture importer, raw SQL)
+rebuild them with rebuild_recipe_stats() or `manage.py refresh_recipe_stats`.
+
+The charts for "every recipe" then read a handful of rows instead of
+aggregating the recipe table (stats_chart_data()).
+"""
+
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .charts import (
+    COOK_TIME_BUCKETS, COOK_TIME_CHART, DIFFICULTY_CHART, GROWTH_CHART,
+    cook_time_bucket, cook_time_bucket_expression,
+)
+from .models import Recipe, RecipeStats
+
+# Recipe fields the statistics depend on
+STATS_FIELDS = ("difficulty", "cook_time_minutes", "created_at")
+
+
+def stats_keys(difficulty, cook_time_minutes, created_at):
+    """The (kind, key) rows one recipe counts towards."""
+    keys = [(RecipeStats.DIFFICULTY, difficulty)]
+    if cook_time_minutes is not None:
+        keys.append((RecipeStats.COOK_TIME, str(cook_time_bucket(cook_time_minutes))))
+    if created_at is not None:
+        # Same day TruncDate("created_at") gives (current time zone)
+        day = timezone.localdate(created_at) if timezone.is_aware(created_at) else created_at.date()
+        keys.append((RecipeStats.DAY, day.isoformat()))
+    return keys
+
+
+def recipe_stats_keys(recipe):
+    return stats_keys(*(getattr(recipe, field) for field in STATS_FIELDS))
+
+
+def adjust_stats(keys, delta):
+    """Adds delta to the count of each (kind, key) row, creating missing rows."""
+    if not keys:
+        return
+    if delta > 0:
+        RecipeStats.objects.bulk_create(
+            [RecipeStats(kind=kind, key=key) for kind, key in keys], ignore_conflicts=True,
+        )
+    for kind, key in keys:
+        RecipeStats.objects.filter(kind=kind, key=key).update(count=F("count") + delta)
+
+
+def count_recipe_stats(recipes):
+    """{(kind, key): count} aggregated from a Recipe queryset (three queries)."""
+    recipes = recipes.order_by()
+    counts = {}
+    for difficulty, count in recipes.values_list("difficulty").annotate(count=Count("pk")):
+        counts[(RecipeStats.DIFFICULTY, difficulty)] = count
+    buckets = (
+        recipes.filter(cook_time_minutes__isnull=False)
+        .annotate(bucket=cook_time_bucket_expression())
+        .values_list("bucket").annotate(count=Count("pk"))
+    )
+    for bucket, count in buckets:
+        counts[(RecipeStats.COOK_TIME, str(bucket))] = count
+    days = (
+        recipes.filter(created_at__isnull=False)
+        .annotate(day=TruncDate("created_at"))
+        .values_list("day").annotate(count=Count("pk"))
+    )
+    for day, count in days:
+        counts[(RecipeStats.DAY, day.isoformat())] = count
+    return counts
+
+
+def rebuild_recipe_stats():
+    """Recomputes every RecipeStats row from the recipe table; returns the row count."""
+    rows = [
+        RecipeStats(kind=kind, key=key, count=count)
+        for (kind, key), count in count_recipe_stats(Recipe.objects.all()).items()
+    ]
+    with transaction.atomic():
+        RecipeStats.objects.all().delete()
+        RecipeStats.objects.bulk_create(rows)
+    return len(rows)
+
+
+def _stats_rows(chart_type):
+    """(queryset, function turning its rows into chart data) for a chart."""
+    kind = {
+        DIFFICULTY_CHART: RecipeStats.DIFFICULTY,
+        COOK_TIME_CHART: RecipeStats.COOK_TIME,
+        GROWTH_CHART: RecipeStats.DAY,
+    }[chart_type]
+    rows = RecipeStats.objects.filter(kind=kind, count__gt=0).order_by("key").values_list("key", "count")
+
+    def build(rows):
+        if chart_type == COOK_TIME_CHART:
+            rows = sorted((int(key), count) for key, count in rows)
+            return [(COOK_TIME_BUCKETS[bucket][0], count) for bucket, count in rows]
+        if chart_type == GROWTH_CHART:
+            # Per-day counts -> running total (ISO dates sort by date)
+            data, total = [], 0
+            for key, count in rows:
+                total += count
+                data.append((date.fromisoformat(key), total))
+            return data
+        return list(rows)
+
+    return rows, build
+
+
+def stats_chart_data(chart_type):
+    """chart_data() for every recipe, from RecipeStats (None if nothing to plot)."""
+    if chart_type not in (DIFFICULTY_CHART, COOK_TIME_CHART, GROWTH_CHART):
+        return None
+    rows, build = _stats_rows(chart_type)
+    return build(list(rows)) or None
+
+
+async def astats_chart_data(chart_type):
+    """stats_chart_data() for async views."""
+    if chart_type not in (DIFFICULTY_CHART, COOK_TIME_CHART, GROWTH_CHART):
+        return None
+    rows, build = _stats_rows(chart_type)
+    return build([row async for row in rows]) or None
@@ -0,0 +1,38 @@
+from django import template
+
+from recipes.fragment_cache import PREFETCHED_CONTEXT, get_or_render_fragment
+
+register = template.Library()
+
+
+class RecipeFragmentNode(template.Node):
+    def __init__(self, nodelist, fragment, recipe):
+        self.nodelist = nodelist
+        self.fragment = fragment
+        self.recipe = recipe
+
+    def render(self, context):
+        fragment = self.fragment.resolve(context)
+        recipe = self.recipe.resolve(context)
+        return get_or_render_fragment(
+            fragment, recipe, lambda: self.nodelist.render(context), context.get(PREFETCHED_CONTEXT),
+        )
+
+
+@register.tag
+def recipefragment(parser, token):
+    """
+    Caches the enclosed template block per recipe version:
+
+        {% recipefragment "card" object %} ... {% endrecipefragment %}
+
+    The block must only depend on the recipe (nothing per user or request).
+    Pages of recipes can look every fragment up at once first, see
+    recipes.fragment_cache.prefetch_fragments().
+    """
+    bits = token.split_contents()
+    if len(bits) != 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes a fragment name and a recipe.")
+    nodelist = parser.parse(("endrecipefragment",))
+    parser.delete_first_token()
+    return RecipeFragmentNode(nodelist, parser.compile_filter(bits[1]), parser.compile_filter(bits[2]))
@@ -0,0 +1,139 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from recipes.api import RECIPE_FIELDS, RecipeSerializer
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from recipes.pagination import encode_cursor
+from recipes.search_index import ingredient_index
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class RecipeAPITest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="client", password="password123")
+        tomato = Ingredient.objects.create(name="Tomato")
+        basil = Ingredient.objects.create(name="Basil")
+        cls.soup = Recipe.objects.create(
+            name="Tomato Soup", description="Warm", cook_time_minutes=30, difficulty="Easy",
+        )
+        RecipeIngredient.objects.create(recipe=cls.soup, ingredient=tomato, quantity=4, unit="cups")
+        RecipeIngredient.objects.create(recipe=cls.soup, ingredient=basil, quantity=5, unit="")
+        cls.stew = Recipe.objects.create(name="Stew", cook_time_minutes=120, difficulty="Hard")
+
+    def setUp(self):
+        ingredient_index.clear()
+        self.client.login(username="client", password="password123")
+        self.url = reverse("api:recipes")
+
+    def tearDown(self):
+        ingredient_index.clear()
+
+    def test_login_required(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_list_matches_serializer(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual([item["name"] for item in data["results"]], ["Stew", "Tomato Soup"])
+        self.assertIsNone(data["next"])
+        # The fast path and the DRF serializer agree field for field
+        expected = RecipeSerializer(Recipe.objects.get(pk=self.soup.pk)).data
+        self.assertEqual(data["results"][1], dict(expected))
+        self.assertEqual(list(data["results"][1]), list(RECIPE_FIELDS))
+
+    def test_detail_matches_list(self):
+        listed = self.client.get(self.url, {"ingredients": "basil"}).json()["results"]
+        detail = self.client.get(reverse("api:recipe", args=[self.soup.pk])).json()
+        self.assertEqual(listed, [detail])
+        self.assertEqual(detail["ingredients"][1], {"name": "Basil", "quantity": 5.0, "unit": ""})
+
+    def test_sparse_fields(self):
+        data = self.client.get(self.url, {"fields": "id,cook_time_minutes"}).json()
+        self.assertEqual(data["results"][0], {"id": self.stew.pk, "cook_time_minutes": 120})
+        detail = self.client.get(reverse("api:recipe", args=[self.soup.pk]), {"fields": "name"}).json()
+        self.assertEqual(detail, {"name": "Tomato Soup"})
+        self.assertEqual(self.client.get(self.url, {"fields": "id,secret"}).status_code, 400)
+
+    def test_filters_and_errors(self):
+        data = self.client.get(self.url, {"difficulty": "Hard", "fields": "name"}).json()
+        self.assertEqual(data["results"], [{"name": "Stew"}])
+        self.assertEqual(self.client.get(self.url, {"max_cook_time": "-5"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"cursor": "nope"}).status_code, 404)
+        self.assertEqual(self.client.get(reverse("api:recipe", args=[999999])).status_code, 404)
+
+    @override_settings(RECIPE_PAGE_SIZE=1)
+    def test_cursor_pages(self):
+        first = self.client.get(self.url, {"fields": "name"}).json()
+        self.assertEqual(first["results"], [{"name": "Stew"}])
+        self.assertIn("fields=name", first["next"])
+        second = self.client.get(first["next"]).json()
+        self.assertEqual(second["results"], [{"name": "Tomato Soup"}])
+        self.assertIsNone(second["next"])
+        self.assertEqual(self.client.get(second["previous"]).json()["results"], first["results"])
+
+    @override_settings(RECIPE_PAGE_SIZE=1)
+    def test_search_pages_keep_the_rank_order(self):
+        # Stew (a name match) outranks Tomato Soup (a description match)
+        # although Tomato Soup sorts first by name
+        self.soup.description = "Thicker than a stew"
+        self.soup.save()
+        first = self.client.get(self.url, {"recipe_name": "stew", "fields": "name"}).json()
+        self.assertEqual(first["results"], [{"name": "Stew"}])
+        second = self.client.get(first["next"]).json()
+        self.assertEqual(second["results"], [{"name": "Tomato Soup"}])
+        self.assertIsNone(second["next"])
+        self.assertEqual(self.client.get(second["previous"]).json()["results"], first["results"])
+        # A name cursor means nothing in rank order
+        response = self.client.get(self.url, {"recipe_name": "stew", "cursor": encode_cursor("n", "a", 1)})
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_queries(self):
+        # Session, user, ETag aggregate, one page of rows, their ingredients
+        with self.assertNumQueries(5):
+            self.client.get(self.url)
+        with self.assertNumQueries(4):
+            self.client.get(self.url, {"fields": "id,name"})
+
+    def test_etag_not_modified(self):
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+        # Session, user and the aggregate; no rows are read
+        with self.assertNumQueries(3):
+            cached = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        # Other parameters, other ETag
+        self.assertNotEqual(self.client.get(self.url, {"fields": "name"})["ETag"], etag)
+        # Any recipe change (here a new ingredient link) moves it
+        RecipeIngredient.objects.create(recipe=self.stew, ingredient=Ingredient.objects.get(name="Basil"))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_detail_etag(self):
+        url = reverse("api:recipe", args=[self.soup.pk])
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.soup.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class IngredientAPITest(TestCase):
+
+    def setUp(self):
+        User.objects.create_user(username="client", password="password123")
+        self.client.login(username="client", password="password123")
+        for name in ("Salt", "Basil", "Tomato"):
+            Ingredient.objects.create(name=name)
+        self.url = reverse("api:ingredients")
+
+    @override_settings(RECIPE_PAGE_SIZE=2)
+    def test_pages_and_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual([item["name"] for item in response.json()["results"]], ["Basil", "Salt"])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+        rest = self.client.get(response.json()["next"]).json()
+        self.assertEqual([item["name"] for item in rest["results"]], ["Tomato"])
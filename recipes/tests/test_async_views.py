@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from recipes import views
+from recipes.chart_service import arender_chart
+from recipes.charts import SVGChartEngine, achart_data, chart_data
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from recipes.search_index import ingredient_index
+
+
+class SlowEngine(SVGChartEngine):
+    """SVG engine that takes a while and remembers which thread drew."""
+
+    threads = []
+
+    def render(self, chart_type, data, image_format="svg"):
+        self.threads.append(threading.current_thread().name)
+        time.sleep(0.2)
+        return super().render(chart_type, data, image_format)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class AsyncViewsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="async", password="password123")
+        cls.soup = Recipe.objects.create(name="Tomato Soup", cook_time_minutes=30, difficulty="Easy")
+        RecipeIngredient.objects.create(recipe=cls.soup, ingredient=Ingredient.objects.create(name="Tomato"))
+        Recipe.objects.create(name="Stew", cook_time_minutes=120, difficulty="Hard")
+
+    def setUp(self):
+        ingredient_index.clear()
+        caches["charts"].clear()
+
+    def tearDown(self):
+        ingredient_index.clear()
+
+    def test_views_are_async(self):
+        for view in (views.recipe_list, views.recipe_detail, views.recipe_search, views.recipe_chart):
+            self.assertTrue(iscoroutinefunction(view), view)
+
+    async def test_pages_with_async_client(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("recipes:list"))
+        self.assertContains(response, "Tomato Soup")
+        response = await self.async_client.get(reverse("recipes:detail", args=[self.soup.pk]))
+        self.assertContains(response, "Tomato")
+        self.assertEqual((await self.async_client.get(reverse("recipes:detail", args=[999999]))).status_code, 404)
+        response = await self.async_client.post(reverse("recipes:search"), {"ingredients": "tomato"})
+        self.assertEqual([row.name for row in response.context["recipes"]], ["Tomato Soup"])
+        response = await self.async_client.get(reverse("recipes:chart"), {"chart_type": "#1", "format": "svg"})
+        self.assertEqual(response["Content-Type"], "image/svg+xml")
+
+    async def test_login_required(self):
+        response = await self.async_client.get(reverse("recipes:list"))
+        self.assertEqual(response.status_code, 302)
+
+    async def test_async_chart_data_matches(self):
+        for chart_type in ("#1", "#2", "#3"):
+            self.assertEqual(
+                await achart_data(chart_type, Recipe.objects.all()),
+                await sync_to_async(chart_data)(chart_type, Recipe.objects.all()),
+            )
+
+    async def test_chart_drawn_off_the_event_loop(self):
+        SlowEngine.threads = []
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        image = await arender_chart("#1", Recipe.objects.all(), engine=SlowEngine())
+        task.cancel()
+        self.assertTrue(image.startswith(b"<svg"))
+        self.assertTrue(SlowEngine.threads[0].startswith("recipe-chart"))
+        # The loop kept running while the chart was drawn
+        self.assertGreater(ticks, 5)
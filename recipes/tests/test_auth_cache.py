@@ -0,0 +1,46 @@
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from recipes.auth_cache import USER_CACHE_ALIAS, user_key
+
+CACHED_BACKEND = "recipes.auth_cache.CachedModelBackend"
+
+
+@override_settings(
+    SECURE_SSL_REDIRECT=False,
+    SESSION_ENGINE="django.contrib.sessions.backends.cached_db",
+    AUTHENTICATION_BACKENDS=[CACHED_BACKEND],
+)
+class CachedAuthTest(TestCase):
+
+    def setUp(self):
+        caches[USER_CACHE_ALIAS].clear()
+        self.user = User.objects.create_user(username="cached", password="password123")
+        self.client.force_login(self.user, backend=CACHED_BACKEND)
+        self.url = reverse("recipes:search")
+
+    def test_warm_request_has_no_session_or_user_queries(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["user"], self.user)
+
+    def test_saving_the_user_drops_the_cached_copy(self):
+        self.client.get(self.url)
+        self.assertIsNotNone(caches[USER_CACHE_ALIAS].get(user_key(self.user.pk)))
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(caches[USER_CACHE_ALIAS].get(user_key(self.user.pk)))
+        # Inactive users are logged out on their next request
+        self.assertRedirects(self.client.get(self.url), f"{reverse('login')}?next={self.url}")
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies")
+    def test_signed_cookie_sessions(self):
+        self.client.force_login(self.user, backend=CACHED_BACKEND)
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
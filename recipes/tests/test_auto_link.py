@@ -0,0 +1,104 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from recipes.search_index import ingredient_index
+
+
+class AutoLinkIngredientsTest(TestCase):
+
+    def setUp(self):
+        ingredient_index.clear()
+        for name in ("Eggs", "Milk", "Butter", "Tomato", "Fresh Mozzarella"):
+            Ingredient.objects.create(name=name)
+        self.omelette = Recipe.objects.create(name="OMELETTE", cook_time_minutes=5)
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        ingredient_index.clear()
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command("auto_link_ingredients", *args, stdout=out)
+        return out.getvalue()
+
+    def links(self, recipe):
+        return set(recipe.ingredients.values_list("name", flat=True))
+
+    def test_seed_map_links_once(self):
+        self.assertIn("Created 3 links", self.run_command())
+        self.assertEqual(self.links(self.omelette), {"Eggs", "Milk", "Butter"})
+        self.assertIn("Created 0 links; skipped 3", self.run_command())
+        # bulk_create bypasses the signals; the search index still sees the links
+        self.assertEqual(ingredient_index.recipe_ids(["milk"]), {self.omelette.pk})
+
+    def test_json_mapping_with_aliases(self):
+        salad = Recipe.objects.create(name="Salad", cook_time_minutes=5)
+        path = self.write("map.json", json.dumps({
+            "recipes": {"Salad": ["Tomatoes", "Mozz"]},
+            "aliases": {"Mozz": "Fresh Mozzarella"},
+        }))
+        self.run_command("--mapping", path)
+        self.assertEqual(self.links(salad), {"Tomato", "Fresh Mozzarella"})
+
+    def test_bad_mapping_files_are_refused(self):
+        salad = Recipe.objects.create(name="Salad", cook_time_minutes=5)
+        # Unknown ingredients: nothing is linked, every one is named
+        path = self.write("map.json", json.dumps({"Salad": ["Tomato", "Unknown", "Mystery"]}))
+        with self.assertRaisesMessage(CommandError, "'Unknown' (recipe 'Salad')"):
+            self.run_command("--mapping", path)
+        self.assertEqual(self.links(salad), set())
+
+        # Values that aren't lists of names
+        path = self.write("map.json", json.dumps({
+            "recipes": {"Salad": "Tomato", "OMELETTE": ["Eggs", 3]},
+            "aliases": {"Mozz": ["Fresh Mozzarella"]},
+        }))
+        with self.assertRaises(CommandError) as ctx:
+            self.run_command("--mapping", path)
+        for entry in ("'Salad'", "ingredient 3", "alias 'Mozz'"):
+            self.assertIn(entry, str(ctx.exception))
+
+    def test_csv_mapping_query_count_does_not_grow(self):
+        rows = ["recipe,ingredient"]
+        for i in range(50):
+            Recipe.objects.create(name=f"Dish {i}", cook_time_minutes=10)
+            rows += [f"Dish {i},Eggs", f"Dish {i},Milk"]
+        path = self.write("map.csv", "\n".join(rows))
+        with CaptureQueriesContext(connection) as ctx:
+            self.run_command("--mapping", path)
+        self.assertEqual(RecipeIngredient.objects.count(), 100)
+        # Lookups, one INSERT, search index upkeep: nowhere near one per link
+        self.assertLess(len(ctx.captured_queries), 15)
+
+    def test_links_made_meanwhile_are_not_counted(self):
+        # Another process links Eggs after the command looked up existing links
+        eggs = Ingredient.objects.get(name="Eggs")
+        real_count = QuerySet.count
+
+        def racing_count(qs):
+            if not RecipeIngredient.objects.filter(ingredient=eggs).exists():
+                RecipeIngredient.objects.create(recipe=self.omelette, ingredient=eggs)
+            return real_count(qs)
+
+        with mock.patch.object(QuerySet, "count", racing_count):
+            output = self.run_command()
+        self.assertIn("Created 2 links; skipped 1", output)
+        self.assertEqual(self.links(self.omelette), {"Eggs", "Milk", "Butter"})
@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from recipes.search_index import ingredient_index
+
+
+class BackfillSeedQuantitiesTest(TestCase):
+
+    def setUp(self):
+        ingredient_index.clear()
+        self.caprese = Recipe.objects.create(name="Caprese Salad", cook_time_minutes=10)
+        for name in ("Tomato", "Fresh Mozzarella", "Basil"):
+            Ingredient.objects.create(name=name)
+        # One link already exists with a placeholder quantity
+        RecipeIngredient.objects.create(
+            recipe=self.caprese, ingredient=Ingredient.objects.get(name="Tomato"), quantity=0,
+        )
+
+    def tearDown(self):
+        ingredient_index.clear()
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command("backfill_seed_quantities", *args, stdout=out)
+        return out.getvalue()
+
+    def quantities(self):
+        return {
+            ri.ingredient.name: (ri.quantity, ri.unit)
+            for ri in self.caprese.recipeingredient_set.select_related("ingredient")
+        }
+
+    def test_batched_matches_row_by_row(self):
+        self.run_command()
+        row_by_row = self.quantities()
+        RecipeIngredient.objects.update(quantity=0, unit="")
+
+        output = self.run_command("--batched")
+        self.assertEqual(self.quantities(), row_by_row)
+        self.assertEqual(row_by_row["Fresh Mozzarella"], (8.0, "oz"))
+        self.assertIn("rows/s", output)
+        self.assertIn("Missing Ingredient rows for:", output)
+
+    def test_batched_csv_plan_in_a_few_queries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "plan.csv")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("recipe,ingredient,quantity,unit\n")
+                f.write("Caprese Salad,Tomato,3,\nCaprese Salad,Basil,6,leaves\nCaprese Salad,Tomato,2,\n")
+            with CaptureQueriesContext(connection) as ctx:
+                output = self.run_command("--batched", "--plan", path)
+        self.assertIn("Set quantities/units on 2 recipe-ingredient rows", output)
+        # Repeated rows: the last one wins
+        self.assertEqual(self.quantities(), {"Tomato": (2.0, ""), "Basil": (6.0, "leaves")})
+        self.assertLess(len(ctx.captured_queries), 15)
+        # The new link is searchable although no signals ran
+        self.assertEqual(ingredient_index.recipe_ids(["basil"]), {self.caprese.pk})
+
+    def test_bad_plan_is_refused_before_any_write(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "plan.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"Caprese Salad": [
+                    ["Tomato", 3, ""], ["Basil", "lots", "leaves"], ["Fresh Mozzarella", -8, "oz"],
+                ]}, f)
+            for args in (["--plan", path], ["--batched", "--plan", path]):
+                with self.assertRaises(CommandError) as ctx:
+                    self.run_command(*args)
+                # Every bad row is reported, and the good one was not applied
+                self.assertIn("Basil", str(ctx.exception))
+                self.assertIn("-8", str(ctx.exception))
+                self.assertEqual(self.quantities(), {"Tomato": (0.0, "")})
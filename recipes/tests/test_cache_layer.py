@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from recipe_project.cache import TieredCache, build_caches
+
+# A locmem cache stands in for the shared server in these tests
+SHARED = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tiered-test-shared"}
+
+
+def make_tiered(**options):
+    return TieredCache("test", {"OPTIONS": {"SHARED": SHARED, **options}})
+
+
+def fake_config(values):
+    """Stands in for decouple's config() with the given environment."""
+    def config(name, default=None, cast=None):
+        value = values.get(name, default)
+        return cast(value) if cast and name in values else value
+    return config
+
+
+class TieredCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.worker_a = make_tiered()
+        self.worker_b = make_tiered()
+        self.worker_a.clear()
+
+    def test_reads_fall_through_to_the_shared_tier(self):
+        self.worker_a.set("k", "v")
+        self.assertEqual(self.worker_b.get("k"), "v")
+        # Now also in worker b's memory
+        self.assertEqual(self.worker_b.local.get("k"), "v")
+        self.assertEqual(self.worker_b.get_many(["k", "nope"]), {"k": "v"})
+
+    def test_local_copy_is_short_lived(self):
+        self.worker_a.set("k", "v", timeout=600)
+        with mock.patch("django.core.cache.backends.locmem.time.time", return_value=10**12):
+            self.assertIsNone(self.worker_a.local.get("k"))
+
+    def test_counters_add_up_across_workers(self):
+        self.worker_a.add("hits", 0)
+        self.worker_a.incr("hits")
+        self.worker_b.incr("hits")
+        self.assertEqual(self.worker_a.get("hits"), 2)
+
+    def test_delete_reaches_both_tiers(self):
+        self.worker_a.set("k", "v")
+        self.worker_a.delete("k")
+        self.assertIsNone(self.worker_a.get("k"))
+        self.assertIsNone(self.worker_a.shared.get("k"))
+
+    def test_shared_only_keys_skip_memory(self):
+        worker_a = make_tiered(SHARED_ONLY=(":hits",))
+        worker_b = make_tiered(SHARED_ONLY=(":hits",))
+        worker_a.set("card:hits", 1)
+        self.assertEqual(worker_b.get("card:hits"), 1)
+        # Another worker's bump is seen at once, not after LOCAL_TIMEOUT
+        worker_a.incr("card:hits")
+        self.assertEqual(worker_b.get("card:hits"), 2)
+        self.assertEqual(worker_b.get_many(["card:hits"]), {"card:hits": 2})
+        self.assertIsNone(worker_b.local.get("card:hits"))
+
+        worker_a.set_many({"detail:hits": 5, "card": "<li>"})
+        self.assertIsNone(worker_a.local.get("detail:hits"))
+        self.assertEqual(worker_a.local.get("card"), "<li>")
+
+
+class BuildCachesTest(SimpleTestCase):
+    aliases = {"default", "charts", "fragments", "sessions"}
+
+    def test_default_is_plain_locmem(self):
+        caches = build_caches(fake_config({}))
+        self.assertEqual(set(caches), self.aliases)
+        self.assertEqual(caches["charts"]["BACKEND"], "django.core.cache.backends.locmem.LocMemCache")
+        self.assertEqual(caches["charts"]["TIMEOUT"], 600)
+
+    def test_tiered_redis(self):
+        caches = build_caches(fake_config({
+            "RECIPE_CACHE_SHARED": "redis", "RECIPE_CACHE_LOCAL": "True", "RECIPE_CACHE_URL": "redis://cache:6379/0",
+        }))
+        charts = caches["charts"]
+        self.assertEqual(charts["BACKEND"], "recipe_project.cache.TieredCache")
+        shared = charts["OPTIONS"]["SHARED"]
+        self.assertEqual(shared["LOCATION"], "redis://cache:6379/0")
+        self.assertEqual(shared["KEY_PREFIX"], "recipe-charts")
+        self.assertNotIn("OPTIONS", shared)
+        self.assertIn(":hits", caches["fragments"]["OPTIONS"]["SHARED_ONLY"])
+        # Logouts and deactivated users must reach every worker at once
+        self.assertEqual(caches["sessions"]["BACKEND"], "django.core.cache.backends.redis.RedisCache")
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            build_caches(fake_config({"RECIPE_CACHE_SHARED": "memcached"}))
+
@@ -0,0 +1,84 @@
+# recipes/tests/test_chart_cache.py
+
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.test import TestCase
+from recipes.chart_cache import aget_or_render_chart, chart_state, result_fingerprint
+from recipes.models import Recipe
+from recipes.stats import rebuild_recipe_stats
+
+
+class ChartCacheTest(TestCase):
+
+    def setUp(self):
+        caches["charts"].clear()
+        self.soup = Recipe.objects.create(name="Soup", cook_time_minutes=30, difficulty="Easy")
+        self.stew = Recipe.objects.create(name="Stew", cook_time_minutes=90, difficulty="Hard")
+        self.renders = 0
+
+    async def render(self):
+        self.renders += 1
+        return f"chart-{self.renders}"
+
+    async def render_nothing(self):
+        return None
+
+    def test_fingerprint_depends_on_result_set_only(self):
+        everything = Recipe.objects.all()
+        # One aggregate query, whatever the size of the result set
+        with self.assertNumQueries(1):
+            digest, latest = result_fingerprint(everything)
+        self.assertEqual(result_fingerprint(Recipe.objects.order_by("-name")), (digest, latest))
+        self.assertEqual(latest, int(self.stew.updated_at.timestamp()))
+        self.assertNotEqual(result_fingerprint(everything.filter(difficulty="Easy"))[0], digest)
+        # Edits and deletions inside the result set change it too
+        self.soup.save()
+        self.assertNotEqual(result_fingerprint(everything)[0], digest)
+        edited = result_fingerprint(everything)[0]
+        self.soup.delete()
+        self.assertNotEqual(result_fingerprint(everything)[0], edited)
+
+    def chart(self, chart_type, qs, variant="png"):
+        return async_to_sync(aget_or_render_chart)(chart_state(chart_type, qs, variant), self.render)
+
+    def test_same_chart_and_results_render_once(self):
+        qs = Recipe.objects.all()
+        self.assertEqual(self.chart("#1", qs), "chart-1")
+        self.assertEqual(self.chart("#1", qs), "chart-1")
+        # A different chart type, format or result set is a separate entry
+        self.assertEqual(self.chart("#2", qs), "chart-2")
+        self.assertEqual(self.chart("#2", qs, "svg"), "chart-3")
+        self.assertEqual(self.chart("#1", qs.filter(pk=self.soup.pk)), "chart-4")
+        self.assertEqual(self.renders, 4)
+
+    def test_recipe_writes_invalidate(self):
+        qs = Recipe.objects.all()
+        before = chart_state("#1", qs)
+        self.chart("#1", qs)
+        # Same pks, but the chart itself would change
+        self.stew.difficulty = "Easy"
+        self.stew.save()
+        after = chart_state("#1", qs)
+        self.assertNotEqual(before.etag, after.etag)
+        self.assertGreaterEqual(after.last_modified, before.last_modified)
+        self.assertEqual(self.chart("#1", qs), "chart-2")
+
+    def test_state_comes_from_the_database(self):
+        # Every worker derives the same key, whatever is (or isn't) in its cache
+        before = chart_state("#1", None)
+        caches["charts"].clear()
+        self.assertEqual(chart_state("#1", None), before)
+        # A RecipeStats rebuild recreates the rows behind the "every recipe" charts
+        rebuild_recipe_stats()
+        self.assertNotEqual(chart_state("#1", None).key, before.key)
+        # Deleting a recipe changes both kinds of state
+        qs_state = chart_state("#1", Recipe.objects.all())
+        self.soup.delete()
+        self.assertNotEqual(chart_state("#1", Recipe.objects.all()).key, qs_state.key)
+        self.assertNotEqual(chart_state("#1", None).key, before.key)
+
+    def test_failed_renders_are_not_cached(self):
+        state = chart_state("#1", Recipe.objects.all())
+        get_or_render = async_to_sync(aget_or_render_chart)
+        self.assertIsNone(get_or_render(state, self.render_nothing))
+        self.assertEqual(get_or_render(state, self.render), "chart-1")
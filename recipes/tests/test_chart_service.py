@@ -0,0 +1,114 @@
+import asyncio
+import threading
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from recipes.chart_cache import chart_state, store_chart
+from recipes.chart_service import PENDING_SVG, ChartPending, ChartService
+from recipes.charts import SVGChartEngine
+from recipes.models import Recipe
+
+DATA = [("Easy", 2), ("Hard", 1)]
+
+
+class BlockingEngine(SVGChartEngine):
+    """SVG engine that waits for the test to let it finish."""
+
+    def __init__(self):
+        self.go = threading.Event()
+
+    def render(self, chart_type, data, image_format="svg"):
+        self.go.wait(5)
+        return super().render(chart_type, data, image_format)
+
+
+class ChartServiceTest(SimpleTestCase):
+
+    def setUp(self):
+        self.engine = BlockingEngine()
+        self.service = ChartService("svg", workers=1, queue_size=2, timeout=0.05)
+
+    def tearDown(self):
+        self.engine.go.set()
+        self.service.shutdown()
+
+    def test_renders_when_free(self):
+        self.engine.go.set()
+        image = asyncio.run(self.service.render(self.engine, "#1", DATA, "svg"))
+        self.assertTrue(image.startswith(b"<svg"))
+        self.assertEqual(self.service.in_flight, 0)
+
+    def test_full_queue_is_pending(self):
+        first = self.service.submit(self.engine, "#1", DATA, "svg")
+        self.service.submit(self.engine, "#1", DATA, "svg")
+        with self.assertRaises(ChartPending):
+            self.service.submit(self.engine, "#1", DATA, "svg")
+        self.engine.go.set()
+        first.result(5)
+        # Finished jobs free their slot
+        self.service.submit(self.engine, "#1", DATA, "svg").result(5)
+
+    def test_timeout_is_pending_and_late_result_delivered(self):
+        late = []
+        delivered = threading.Event()
+
+        def keep(chart):
+            late.append(chart)
+            delivered.set()
+
+        with self.assertRaises(ChartPending):
+            asyncio.run(self.service.render(self.engine, "#1", DATA, "svg", on_late_result=keep))
+        # The job wasn't cancelled; its chart arrives afterwards
+        self.engine.go.set()
+        self.assertTrue(delivered.wait(5))
+        self.assertTrue(late[0].startswith(b"<svg"))
+
+    def test_matplotlib_in_worker_process(self):
+        service = ChartService("matplotlib", workers=1, queue_size=2, timeout=60)
+        self.assertTrue(service.isolated)
+        try:
+            image = asyncio.run(service.render(None, "#1", DATA, "png"))
+        finally:
+            service.shutdown()
+        self.assertTrue(image.startswith(b"\x89PNG"))
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ChartPendingViewTest(TestCase):
+
+    def setUp(self):
+        caches["charts"].clear()
+        User.objects.create_user(username="charts", password="password123")
+        self.client.login(username="charts", password="password123")
+        Recipe.objects.create(name="Soup", cook_time_minutes=30, difficulty="Easy")
+        self.params = {"chart_type": "#1", "format": "svg"}
+
+    def test_placeholder_then_cached_chart(self):
+        with mock.patch.object(ChartService, "render", side_effect=ChartPending("busy")):
+            response = self.client.get(reverse("recipes:chart"), self.params)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.content, PENDING_SVG)
+        self.assertEqual(response["Retry-After"], "2")
+        self.assertIn("no-store", response["Cache-Control"])
+        self.assertNotIn("ETag", response)
+
+        # The late chart lands in the cache; the retry is served from it
+        # (no filters: the "every recipe" key, see chart_state)
+        state = chart_state("#1", None, "svg.svg")
+        store_chart(state, b"<svg>late</svg>")
+        with mock.patch.object(ChartService, "render") as render:
+            response = self.client.get(reverse("recipes:chart"), {**self.params, "retry": "1"})
+        render.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"<svg>late</svg>")
+
+    def test_failed_render_is_logged(self):
+        with mock.patch.object(ChartService, "render", side_effect=RuntimeError("boom")), \
+                self.assertLogs("recipes.chart_service", "ERROR") as logs:
+            response = self.client.get(reverse("recipes:chart"), self.params)
+        self.assertEqual(response.status_code, 404)
+        self.assertIn("Error generating chart #1", logs.output[0])
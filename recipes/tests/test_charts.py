@@ -0,0 +1,107 @@
+# recipes/tests/test_charts.py
+
+from datetime import date, timedelta
+from io import BytesIO
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+from recipes import charts
+from recipes.chart_service import arender_chart
+from recipes.charts import MatplotlibChartEngine, SVGChartEngine, chart_data
+from recipes.models import Recipe
+
+
+class ChartDataTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Recipe.objects.create(name="Toast", cook_time_minutes=5, difficulty="Easy")
+        Recipe.objects.create(name="Soup", cook_time_minutes=45, difficulty="Easy")
+        Recipe.objects.create(name="Roast", cook_time_minutes=120, difficulty="Hard")
+
+    def test_difficulty_counts(self):
+        self.assertEqual(chart_data("#1", Recipe.objects.all()), [("Easy", 2), ("Hard", 1)])
+
+    def test_cook_time_buckets_drop_empty_ones(self):
+        self.assertEqual(
+            chart_data("#2", Recipe.objects.filter(cook_time_minutes__lt=60)),
+            [("≤ 30 min", 1), ("31–60 min", 1)],
+        )
+
+    def test_growth_is_a_running_total_per_day(self):
+        # Move one recipe two days back: two points, 1 then 3
+        roast = Recipe.objects.get(name="Roast")
+        Recipe.objects.filter(pk=roast.pk).update(created_at=roast.created_at - timedelta(days=2))
+        data = chart_data("#3", Recipe.objects.all())
+        self.assertEqual([total for _, total in data], [1, 3])
+        self.assertEqual(data[1][0] - data[0][0], timedelta(days=2))
+
+    def test_aggregates_come_back_in_one_small_query(self):
+        for chart_type in ("#1", "#2", "#3"):
+            with self.assertNumQueries(1):
+                chart_data(chart_type, Recipe.objects.order_by("name"))
+
+    def test_nothing_to_plot(self):
+        self.assertIsNone(chart_data("#1", Recipe.objects.none()))
+        self.assertIsNone(chart_data("#9", Recipe.objects.all()))
+        self.assertIsNone(async_to_sync(arender_chart)("#1", Recipe.objects.none()))
+
+
+class SVGChartEngineTest(TestCase):
+
+    def test_renders_each_chart_as_svg(self):
+        engine = SVGChartEngine()
+        bar = engine.render("#1", [("Easy", 2), ("Hard", 1)]).decode()
+        self.assertTrue(bar.startswith("<svg"))
+        self.assertEqual(bar.count("<rect"), 3)  # background + two bars
+        self.assertIn("Recipes by Difficulty", bar)
+
+        pie = engine.render("#2", [("≤ 30 min", 1), ("> 60 min", 3)]).decode()
+        self.assertEqual(pie.count("<path"), 2)
+        self.assertIn("75.0%", pie)
+        # A single bucket is a full circle
+        self.assertIn("<circle", engine.render("#2", [("> 60 min", 3)]).decode())
+
+        day = date(2025, 10, 1)
+        line = engine.render("#3", [(day, 1), (day.replace(day=9), 2)]).decode()
+        self.assertIn("<polyline", line)
+        self.assertIn("2025-10-09", line)
+
+    def test_labels_are_escaped(self):
+        svg = SVGChartEngine().render("#1", [("<b>&", 1)]).decode()
+        self.assertIn("&lt;b&gt;&amp;", svg)
+
+
+class MatplotlibChartEngineTest(TestCase):
+
+    def test_warm_up_loads_matplotlib_once(self):
+        MatplotlibChartEngine().warm_up()
+        loaded = charts._matplotlib
+        self.assertIsNotNone(loaded)
+        self.assertIs(charts.load_matplotlib(), loaded)
+
+    def test_figures_are_reused_per_chart_type(self):
+        engine = MatplotlibChartEngine(size=(4, 3), dpi=50, optimize=False)
+        first = engine.render("#1", [("Easy", 2), ("Hard", 1)])
+        figure = charts._figures[("#1", (4, 3), 50)]
+        second = engine.render("#1", [("Medium", 5)])
+        self.assertIs(charts._figures[("#1", (4, 3), 50)], figure)
+        # Cleared between renders: only the new bar, only the new label
+        fig, canvas, ax = figure
+        self.assertEqual(len(ax.patches), 1)
+        self.assertEqual([label.get_text() for label in ax.get_xticklabels()], ["Medium"])
+        self.assertTrue(first.startswith(b"\x89PNG") and second.startswith(b"\x89PNG"))
+
+    def test_size_dpi_and_optimize(self):
+        from PIL import Image
+
+        data = [(date(2025, 10, 1) + timedelta(days=i), i + 1) for i in range(10)]
+        plain = MatplotlibChartEngine(size=(4, 3), dpi=50, optimize=False).render("#3", data)
+        small = MatplotlibChartEngine(size=(4, 3), dpi=50, optimize=True).render("#3", data)
+        with Image.open(BytesIO(plain)) as image:
+            self.assertEqual(image.size, (200, 150))
+        with Image.open(BytesIO(small)) as image:
+            self.assertEqual((image.size, image.mode), ((200, 150), "P"))
+        self.assertLess(len(small), len(plain))
+        svg = MatplotlibChartEngine(size=(4, 3), dpi=50).render("#2", [("≤ 30 min", 1)], "svg")
+        self.assertIn(b"<svg", svg)
@@ -0,0 +1,78 @@
+import csv
+import io
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from recipes.search_index import ingredient_index
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class RecipeExportViewTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="analyst", password="password123")
+        tomato = Ingredient.objects.create(name="Tomato")
+        basil = Ingredient.objects.create(name="Basil")
+        cls.soup = Recipe.objects.create(name="Tomato Soup", cook_time_minutes=30, difficulty="Easy")
+        RecipeIngredient.objects.create(recipe=cls.soup, ingredient=tomato, quantity=4, unit="cups")
+        RecipeIngredient.objects.create(recipe=cls.soup, ingredient=basil, quantity=5, unit="")
+        cls.stew = Recipe.objects.create(name="Stew", cook_time_minutes=120, difficulty="Hard")
+
+    def setUp(self):
+        ingredient_index.clear()
+        self.client.login(username="analyst", password="password123")
+        self.url = reverse("recipes:export")
+
+    def tearDown(self):
+        ingredient_index.clear()
+
+    def body(self, response):
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv(self):
+        response = self.client.get(self.url, {"format": "csv"})
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn('filename="recipes.csv"', response["Content-Disposition"])
+        rows = list(csv.DictReader(io.StringIO(self.body(response))))
+        self.assertEqual([row["name"] for row in rows], ["Stew", "Tomato Soup"])
+        self.assertEqual(rows[1]["ingredients"], "Tomato 4.0 cups; Basil 5.0")
+
+    def test_ndjson_with_filters(self):
+        response = self.client.get(self.url, {"format": "ndjson", "ingredients": "basil"})
+        lines = [json.loads(line) for line in self.body(response).splitlines()]
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]["id"], self.soup.pk)
+        self.assertIn({"name": "Basil", "quantity": 5.0, "unit": ""}, lines[0]["ingredients"])
+
+    @override_settings(RECIPE_EXPORT_CHUNK_SIZE=2)
+    def test_one_prefetch_per_chunk(self):
+        for i in range(5):
+            Recipe.objects.create(name=f"Dish {i}", cook_time_minutes=10)
+        # Session, user, recipes, then one ingredient query per chunk of 2 (7 recipes)
+        with self.assertNumQueries(3 + 4):
+            lines = self.body(self.client.get(self.url, {"format": "ndjson"})).splitlines()
+        self.assertEqual(len(lines), 7)
+
+    async def test_asgi_streams_through_the_async_orm(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.url, {"format": "csv"})
+        # An async generator, so ASGI sends each chunk as it is read
+        self.assertTrue(response.is_async)
+        body = "".join([chunk.decode() async for chunk in response.streaming_content])
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual([row["name"] for row in rows], ["Stew", "Tomato Soup"])
+        self.assertEqual(rows[1]["ingredients"], "Tomato 4.0 cups; Basil 5.0")
+
+    def test_bad_requests(self):
+        self.assertEqual(self.client.get(self.url, {"format": "xml"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"max_cook_time": "soon"}).status_code, 400)
+
+    def test_search_page_links_to_exports(self):
+        response = self.client.post(reverse("recipes:search"), {"difficulty": "Easy", "chart_type": "#1"})
+        self.assertContains(response, "Download CSV")
+        self.assertEqual(response.context["exports"]["csv"], f"{self.url}?difficulty=Easy&format=csv")
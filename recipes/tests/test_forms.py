@@ -12,11 +12,12 @@ class RecipeSearchFormTest(TestCase):
         # Check if the keys match exactly the fields we defined
         self.assertEqual(
             list(form.fields.keys()),
-            ["recipe_name", "ingredients", "max_cook_time", "difficulty", "chart_type"],
+            ["recipe_name", "ingredients", "ingredients_match", "max_cook_time", "difficulty", "chart_type"],
         )
         # Check field labels match what we set
         self.assertEqual(form.fields['recipe_name'].label, "Recipe Name")
         self.assertEqual(form.fields['ingredients'].label, "Ingredients (comma-separated)")
+        self.assertEqual(form.fields['ingredients_match'].label, "Ingredient Match")
         self.assertEqual(form.fields['max_cook_time'].label, "Max Cooking Time (minutes)")
         self.assertEqual(form.fields['difficulty'].label, "Difficulty")
         self.assertEqual(form.fields['chart_type'].label, "Chart")
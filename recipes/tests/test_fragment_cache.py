@@ -0,0 +1,142 @@
+import json
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import serializers
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from recipes.fragment_cache import _cache, fragment_key, fragment_stats, get_or_render_fragment, prefetch_fragments
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+
+
+class CacheCallLog:
+    """Passes everything on to a cache, noting which methods were called."""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.calls = []
+
+    def __getattr__(self, name):
+        self.calls.append(name)
+        return getattr(self.cache, name)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class FragmentCacheTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="frag", password="password123")
+        cls.salt = Ingredient.objects.create(name="Salt")
+
+    def setUp(self):
+        _cache().clear()
+        self.recipe = Recipe.objects.create(name="Soup", cook_time_minutes=20, difficulty="Easy")
+        RecipeIngredient.objects.create(recipe=self.recipe, ingredient=self.salt, quantity=2, unit="g")
+        self.url = reverse("recipes:detail", kwargs={"pk": self.recipe.pk})
+        self.client.login(username="frag", password="password123")
+
+    def test_second_detail_view_is_a_hit_and_skips_the_ingredient_query(self):
+        self.client.get(self.url)
+        # Session, user, recipe; the ingredient list comes from the fragment
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertContains(response, "Salt: 2.0 g")
+        self.assertEqual(fragment_stats()["detail"], {"hits": 1, "misses": 1, "ratio": 0.5})
+
+    def test_list_cards_are_cached(self):
+        self.client.get(reverse("recipes:list"))
+        self.client.get(reverse("recipes:list"))
+        self.assertEqual(fragment_stats()["card"]["hits"], 1)
+
+    def test_list_page_fetches_its_cards_at_once(self):
+        for n in range(3):
+            Recipe.objects.create(name=f"Stew {n}", cook_time_minutes=30)
+        self.client.get(reverse("recipes:list"))
+        log = CacheCallLog(_cache())
+        with mock.patch("recipes.fragment_cache._cache", return_value=log):
+            response = self.client.get(reverse("recipes:list"))
+        self.assertContains(response, "Stew 2")
+        # One lookup for the four cards and one bump of the hit counter
+        self.assertEqual(log.calls, ["get_many", "add", "incr"])
+        self.assertEqual(fragment_stats()["card"], {"hits": 4, "misses": 4, "ratio": 0.5})
+
+    def test_prefetched_misses_are_rendered_and_stored(self):
+        other = Recipe.objects.create(name="Stew", cook_time_minutes=60)
+        get_or_render_fragment("card", self.recipe, lambda: "<li>Soup</li>")
+        prefetched = prefetch_fragments("card", [self.recipe, other])
+        self.assertEqual(get_or_render_fragment("card", self.recipe, lambda: "stale", prefetched), "<li>Soup</li>")
+        self.assertEqual(get_or_render_fragment("card", other, lambda: "<li>Stew</li>", prefetched), "<li>Stew</li>")
+        self.assertEqual(_cache().get(fragment_key("card", other)), "<li>Stew</li>")
+        # The first lookup plus the page's one hit and one miss
+        self.assertEqual(fragment_stats()["card"], {"hits": 1, "misses": 2, "ratio": 1 / 3})
+
+    def test_editing_the_recipe_moves_the_version(self):
+        self.client.get(self.url)
+        old_key = fragment_key("detail", Recipe.objects.get(pk=self.recipe.pk))
+        self.recipe.description = "Now with croutons"
+        self.recipe.save()
+        self.assertNotEqual(fragment_key("detail", self.recipe), old_key)
+        self.assertContains(self.client.get(self.url), "Now with croutons")
+
+    def test_save_with_update_fields_drops_the_current_entry(self):
+        self.client.get(self.url)
+        self.recipe.refresh_from_db()
+        self.recipe.description = "Quietly changed"
+        self.recipe.save(update_fields=["description"])
+        self.assertContains(self.client.get(self.url), "Quietly changed")
+
+    def test_ingredient_changes_refresh_the_detail(self):
+        self.client.get(self.url)
+        pepper = Ingredient.objects.create(name="Pepper")
+        self.recipe.ingredients.add(pepper, through_defaults={"quantity": 1, "unit": "pinch"})
+        self.assertContains(self.client.get(self.url), "Pepper: 1.0 pinch")
+
+        pepper.name = "Black Pepper"
+        pepper.save()
+        self.assertContains(self.client.get(self.url), "Black Pepper: 1.0 pinch")
+
+        RecipeIngredient.objects.filter(ingredient=pepper).get().delete()
+        self.assertNotContains(self.client.get(self.url), "Black Pepper")
+
+
+@override_settings(RECIPE_METRICS_TOKEN="s3cret", SECURE_SSL_REDIRECT=False)
+class FragmentMetricsViewTest(TestCase):
+    url = reverse("recipes:fragment_metrics")
+
+    def test_needs_token_or_staff(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        response = self.client.get(self.url, HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(response.status_code, 403)
+
+        User.objects.create_user(username="staff", password="password123", is_staff=True)
+        self.client.login(username="staff", password="password123")
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_reports_counters(self):
+        _cache().clear()
+        recipe = Recipe.objects.create(name="Stew", cook_time_minutes=60)
+        get_or_render_fragment("card", recipe, lambda: "<li>Stew</li>")
+        get_or_render_fragment("card", recipe, lambda: "<li>Stew</li>")
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION="Bearer s3cret")
+        body = response.content.decode()
+        self.assertIn('recipe_fragment_cache_hits_total{fragment="card"} 1', body)
+        self.assertIn('recipe_fragment_cache_misses_total{fragment="card"} 1', body)
+        self.assertIn('recipe_fragment_cache_hit_ratio{fragment="card"} 0.5000', body)
+
+
+class LoadedRecipeVersionTest(TestCase):
+
+    def test_fixture_without_updated_at_loads(self):
+        # Fixtures dumped before updated_at existed (e.g. recipes_data_utf8.json)
+        data = json.dumps([{
+            "model": "recipes.recipe", "pk": 500,
+            "fields": {"name": "Old Soup", "cook_time_minutes": 20, "difficulty": "Easy",
+                       "created_at": "2025-10-15T22:27:07.849Z"},
+        }])
+        for obj in serializers.deserialize("json", data):
+            obj.save()
+        recipe = Recipe.objects.get(pk=500)
+        self.assertEqual(recipe.updated_at, recipe.created_at)
@@ -0,0 +1,160 @@
+import io
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase
+
+from recipes.importer import (
+    FixtureImporter, convert_object, find_shards, iter_json_array, iter_parallel_rows, parse_shard,
+)
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from recipes.search_index import ingredient_index
+
+FIXTURE = [
+    {"model": "recipes.ingredient", "pk": 1, "fields": {"name": "Tomato"}},
+    {"model": "recipes.ingredient", "pk": 2, "fields": {"name": "Basil"}},
+    {"model": "recipes.recipe", "pk": 10, "fields": {
+        "name": "Tomato Soup", "description": "Red", "cook_time_minutes": 30, "pic": "recipes/soup.webp",
+        "created_at": "2025-10-15T22:27:07.849Z", "difficulty": "Easy",
+    }},
+    {"model": "recipes.recipeingredient", "pk": 100, "fields": {
+        "recipe": 10, "ingredient": 1, "quantity": 4.0, "unit": "cups",
+    }},
+    {"model": "recipes.recipeingredient", "pk": 101, "fields": {
+        "recipe": 10, "ingredient": 2, "quantity": 5.0, "unit": "leaves",
+    }},
+]
+
+
+def without_stamps(rows):
+    return [(label, {k: v for k, v in values.items() if k != "updated_at"}) for label, values in rows]
+
+
+class IterJsonArrayTest(SimpleTestCase):
+    def test_tiny_chunks(self):
+        text = "\ufeff [ " + ", ".join(json.dumps(obj, indent=2) for obj in FIXTURE) + " ]\n"
+        for chunk_size in (1, 7, 1 << 16):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(list(iter_json_array(io.StringIO(text), chunk_size)), FIXTURE)
+
+    def test_empty_and_broken(self):
+        self.assertEqual(list(iter_json_array(io.StringIO("[]"))), [])
+        for text in ('{"model": 1}', '[{"a": 1}', '[{"a": 1} {"b": 2}]', '[{"a": '):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                list(iter_json_array(io.StringIO(text), 4))
+
+
+class ShardTest(SimpleTestCase):
+    def test_shards_hold_whole_records(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "fixture.json")
+            with open(path, "w", encoding="utf-8-sig") as f:
+                json.dump(FIXTURE, f, indent=2)
+            for shard_bytes in (1, 100, 1 << 20):
+                with self.subTest(shard_bytes=shard_bytes):
+                    rows = []
+                    for start, end in find_shards(path, shard_bytes):
+                        shard_rows, errors = parse_shard(path, start, end, "utf-8-sig")
+                        self.assertEqual(errors, [])
+                        rows += shard_rows
+                    # Same rows, same order (auto_now stamps differ per call)
+                    expected = [convert_object(obj) for obj in FIXTURE]
+                    self.assertEqual(without_stamps(rows), without_stamps(expected))
+
+
+class ImportRecipesCommandTest(TestCase):
+
+    def setUp(self):
+        ingredient_index.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "fixture.json")
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(FIXTURE, f)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        ingredient_index.clear()
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command("import_recipes", self.path, *args, stdout=out)
+        return out.getvalue()
+
+    def test_imports_links_and_keeps_fixture_dates(self):
+        output = self.run_command("--chunk-size", "2", "--batch-size", "1")
+        self.assertIn("Successfully loaded 5 objects", output)
+        soup = Recipe.objects.get(pk=10)
+        self.assertEqual(soup.created_at.isoformat(), "2025-10-15T22:27:07.849000+00:00")
+        self.assertEqual(set(soup.ingredients.values_list("name", flat=True)), {"Tomato", "Basil"})
+        # Indexes were refreshed although bulk_create sent no signals
+        self.assertEqual(ingredient_index.recipe_ids(["basil"]), {10})
+        # New rows don't collide with the imported pks
+        self.assertGreater(Recipe.objects.create(name="New", cook_time_minutes=1).pk, 10)
+
+    def test_skip_keeps_existing_rows_and_upsert_overwrites(self):
+        self.run_command()
+        Recipe.objects.filter(pk=10).update(name="Edited")
+        RecipeIngredient.objects.filter(ingredient_id=1).update(quantity=1)
+
+        output = self.run_command()
+        self.assertEqual(Recipe.objects.get(pk=10).name, "Edited")
+        self.assertEqual(RecipeIngredient.objects.count(), 2)
+        # Only real inserts are counted as loaded
+        self.assertIn("recipes.recipe: 0 (1 already there, skipped)", output)
+        self.assertIn("Successfully loaded 0 objects", output)
+
+        self.run_command("--mode", "upsert")
+        self.assertEqual(Recipe.objects.get(pk=10).name, "Tomato Soup")
+        self.assertEqual(RecipeIngredient.objects.get(ingredient_id=1).quantity, 4.0)
+        self.assertEqual(RecipeIngredient.objects.count(), 2)
+        self.assertEqual(Ingredient.objects.count(), 2)
+
+    def test_ingredient_columns_are_synced_per_chunk(self):
+        with mock.patch("recipes.ingredient_fields.sync_ingredient_fields") as sync:
+            FixtureImporter(chunk_size=3).run(FIXTURE)
+        # Never the whole table (None), only the recipes each chunk touched
+        self.assertEqual([call.args[0] for call in sync.call_args_list], [{10}, {10}])
+        FixtureImporter(mode="upsert").run(FIXTURE)
+        self.assertEqual(Recipe.objects.get(pk=10).ingredient_names, "Basil, Tomato")
+
+    def test_unsupported_models_are_refused(self):
+        user = {"model": "auth.user", "pk": 1, "fields": {"username": "eve", "password": "x"}}
+        with self.assertRaisesMessage(CommandError, "Can't import auth.user objects"):
+            FixtureImporter().run(FIXTURE + [user])
+        stats = {"model": "recipes.recipestats", "pk": 1, "fields": {"kind": "day", "key": "x", "count": 1}}
+        with self.assertRaises(CommandError):
+            FixtureImporter().run([stats])
+
+    def test_parallel_workers(self):
+        output = self.run_command("--workers", "2", "--shard-mb", "0.0001")
+        self.assertIn("Successfully loaded 5 objects", output)
+        self.assertEqual(Recipe.objects.get(pk=10).recipeingredient_set.count(), 2)
+
+    def test_parallel_rows_leave_the_callers_connection_open(self):
+        # Closing it would break an atomic() block the caller is in
+        with transaction.atomic(), mock.patch.object(connection, "close") as close:
+            rows = list(iter_parallel_rows(self.path, "utf-8", 2, shard_bytes=100))
+            self.assertEqual(Recipe.objects.count(), 0)
+        close.assert_not_called()
+        self.assertEqual(len(rows), len(FIXTURE))
+
+    def test_invalid_objects_are_reported_and_skipped(self):
+        bad = {"model": "recipes.recipe", "pk": 11, "fields": {
+            "name": "No Time", "cook_time_minutes": 0, "pic": "x", "difficulty": "Easy",
+        }}
+        importer = FixtureImporter()
+        importer.run(FIXTURE + [bad])
+        self.assertEqual(len(importer.errors), 1)
+        self.assertIn("recipes.recipe 11", importer.errors[0])
+        self.assertFalse(Recipe.objects.filter(pk=11).exists())
+
+    def test_repository_fixture(self):
+        with open("recipes_data_utf8.json", encoding="utf-8-sig") as f:
+            stats, _ = FixtureImporter().run(iter_json_array(f))
+        self.assertEqual(stats["recipes.recipeingredient"], RecipeIngredient.objects.count())
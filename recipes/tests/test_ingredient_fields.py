@@ -0,0 +1,100 @@
+# recipes/tests/test_ingredient_fields.py
+
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from recipes.ingredient_fields import stale_ingredient_fields
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from recipes.search_backends import IcontainsSearchBackend
+
+
+class IngredientFieldsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.salt = Ingredient.objects.create(name="salt")
+        cls.basil = Ingredient.objects.create(name="Basil")
+        cls.tomato = Ingredient.objects.create(name="Tomato")
+        cls.soup = Recipe.objects.create(name="Soup", cook_time_minutes=20, difficulty="Easy")
+        cls.stew = Recipe.objects.create(name="Stew", cook_time_minutes=90, difficulty="Hard")
+
+    def columns(self, recipe):
+        recipe.refresh_from_db()
+        return recipe.ingredient_count, recipe.ingredient_names
+
+    def test_links_keep_the_columns_sorted(self):
+        link = RecipeIngredient.objects.create(recipe=self.soup, ingredient=self.tomato)
+        RecipeIngredient.objects.create(recipe=self.soup, ingredient=self.salt)
+        RecipeIngredient.objects.create(recipe=self.soup, ingredient=self.basil)
+        self.assertEqual(self.columns(self.soup), (3, "Basil, salt, Tomato"))
+
+        # Moving a link updates both recipes
+        link.recipe = self.stew
+        link.save()
+        self.assertEqual(self.columns(self.soup), (2, "Basil, salt"))
+        self.assertEqual(self.columns(self.stew), (1, "Tomato"))
+
+        link.delete()
+        self.assertEqual(self.columns(self.stew), (0, ""))
+
+    def test_m2m_add_remove_clear(self):
+        self.soup.ingredients.add(self.salt, self.basil)
+        self.assertEqual(self.columns(self.soup), (2, "Basil, salt"))
+        self.soup.ingredients.remove(self.salt)
+        self.assertEqual(self.columns(self.soup), (1, "Basil"))
+
+        # From the ingredient side
+        self.basil.recipes.add(self.stew)
+        self.assertEqual(self.columns(self.stew), (1, "Basil"))
+        self.basil.recipes.clear()
+        self.assertEqual(self.columns(self.soup), (0, ""))
+        self.assertEqual(self.columns(self.stew), (0, ""))
+
+    def test_rename_and_delete_ingredient(self):
+        self.soup.ingredients.add(self.salt, self.tomato)
+        self.salt.name = "Sea Salt"
+        self.salt.save()
+        self.assertEqual(self.columns(self.soup), (2, "Sea Salt, Tomato"))
+        self.tomato.delete()
+        self.assertEqual(self.columns(self.soup), (1, "Sea Salt"))
+        self.assertEqual(stale_ingredient_fields(), {})
+
+    def test_check_command_finds_and_repairs_drift(self):
+        self.soup.ingredients.add(self.salt)
+        # update() skips the signals
+        Recipe.objects.filter(pk=self.stew.pk).update(ingredient_count=4, ingredient_names="Old")
+        out = StringIO()
+        call_command("check_ingredient_fields", stdout=out)
+        self.assertIn("1 recipes", out.getvalue())
+        self.assertEqual(self.columns(self.stew), (4, "Old"))
+
+        call_command("check_ingredient_fields", "--repair", stdout=StringIO())
+        self.assertEqual(self.columns(self.stew), (0, ""))
+        self.assertEqual(stale_ingredient_fields(), {})
+
+    def test_icontains_backend_matches_ingredient_names(self):
+        self.soup.ingredients.add(self.basil, self.tomato)
+        self.assertEqual(IcontainsSearchBackend().search("tomato"), [self.soup.pk])
+        self.assertEqual(IcontainsSearchBackend().search("leek"), [])
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class IngredientFieldsPagesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="denorm", password="password123")
+        soup = Recipe.objects.create(name="Soup", cook_time_minutes=20, difficulty="Easy")
+        soup.ingredients.add(Ingredient.objects.create(name="Leek"), Ingredient.objects.create(name="Potato"))
+
+    def setUp(self):
+        self.client.login(username="denorm", password="password123")
+
+    def test_list_card_and_search_table_show_the_names(self):
+        self.assertContains(self.client.get(reverse("recipes:list")), "2 ingredients: Leek, Potato")
+        response = self.client.post(reverse("recipes:search"), {"recipe_name": "soup"})
+        self.assertContains(response, "Leek, Potato")
@@ -0,0 +1,83 @@
+# recipes/tests/test_pagination.py
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from recipes.models import Recipe
+from recipes.pagination import InvalidCursor, KeysetPaginator, decode_cursor, encode_cursor
+
+
+class KeysetPaginatorTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # Two recipes share a name, so pk has to break the tie
+        for name in ["Bread", "Apple Pie", "Curry", "Bread", "Dal"]:
+            Recipe.objects.create(name=name, cook_time_minutes=10)
+
+    def names(self, page):
+        return [r.name for r in page]
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor("n", "Pâté", 7)), ("n", "Pâté", 7))
+        for bad in ["", "not-base64!", encode_cursor("x", "a", 1)]:
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(bad)
+
+    def test_walk_forward_and_back(self):
+        paginator = KeysetPaginator(Recipe.objects.all(), per_page=2)
+        first = paginator.page()
+        self.assertEqual(self.names(first), ["Apple Pie", "Bread"])
+        self.assertFalse(first.has_previous)
+        second = paginator.page(first.next_cursor)
+        self.assertEqual(self.names(second), ["Bread", "Curry"])
+        third = paginator.page(second.next_cursor)
+        self.assertEqual(self.names(third), ["Dal"])
+        self.assertFalse(third.has_next)
+        # And back again
+        back = paginator.page(third.previous_cursor)
+        self.assertEqual([r.pk for r in back], [r.pk for r in second])
+        self.assertEqual(self.names(paginator.page(back.previous_cursor)), ["Apple Pie", "Bread"])
+        self.assertFalse(paginator.page(back.previous_cursor).has_previous)
+
+    def test_stable_under_inserts(self):
+        paginator = KeysetPaginator(Recipe.objects.all(), per_page=2)
+        first = paginator.page()
+        # Rows added before the cursor don't push anything onto the next page
+        Recipe.objects.create(name="Aioli", cook_time_minutes=5)
+        self.assertEqual(self.names(paginator.page(first.next_cursor)), ["Bread", "Curry"])
+
+    def test_works_on_named_rows(self):
+        rows = Recipe.objects.values_list("pk", "name", named=True)
+        page = KeysetPaginator(rows, per_page=3).page()
+        self.assertEqual(self.names(KeysetPaginator(rows, per_page=3).page(page.next_cursor)), ["Curry", "Dal"])
+
+
+@override_settings(RECIPE_PAGE_SIZE=2, SECURE_SSL_REDIRECT=False)
+class PaginatedViewsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create_user(username="cook", password="password123")
+        for name in ["Bread", "Apple Pie", "Curry"]:
+            Recipe.objects.create(name=name, cook_time_minutes=10)
+
+    def setUp(self):
+        self.client.login(username="cook", password="password123")
+
+    def test_list_view_pages(self):
+        response = self.client.get(reverse("recipes:list"))
+        self.assertEqual([r.name for r in response.context["object_list"]], ["Apple Pie", "Bread"])
+        page = response.context["page_obj"]
+        self.assertContains(response, f"?cursor={page.next_cursor}")
+        response = self.client.get(reverse("recipes:list"), {"cursor": page.next_cursor})
+        self.assertEqual([r.name for r in response.context["object_list"]], ["Curry"])
+        self.assertEqual(self.client.get(reverse("recipes:list"), {"cursor": "junk"}).status_code, 404)
+
+    def test_show_all_pages(self):
+        url = reverse("recipes:search")
+        response = self.client.post(url, {"show_all": "true"})
+        self.assertEqual(len(response.context["recipes"]), 2)
+        cursor = response.context["recipes"].page.next_cursor
+        response = self.client.get(url, {"show_all": "true", "cursor": cursor})
+        self.assertEqual([r.name for r in response.context["recipes"]], ["Curry"])
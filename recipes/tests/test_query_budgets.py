@@ -0,0 +1,109 @@
+# recipes/tests/test_query_budgets.py
+"""
+Query budgets for the recipes views.
+
+Each view gets a declared maximum number of SQL queries per request, checked
+twice: with a small data set and with a larger one. A view that stays within
+budget on both can't be doing one query per row (N+1). When a budget is
+exceeded the failure lists every query that ran.
+"""
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from recipes.chart_cache import _cache as chart_cache
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from recipes.search_index import ingredient_index
+
+# Session + user lookups that every logged-in request makes
+AUTH_QUERIES = 2
+
+# name -> (method, url name, url kwargs, data, max queries including auth)
+BUDGETS = {
+    "list": ("get", "recipes:list", {}, {}, AUTH_QUERIES + 1),
+    "detail": ("get", "recipes:detail", {"pk": "first"}, {}, AUTH_QUERIES + 2),
+    "search form": ("get", "recipes:search", {}, {}, AUTH_QUERIES),
+    "search show all": ("get", "recipes:search", {}, {"show_all": "true"}, AUTH_QUERIES + 1),
+    "search by name": ("post", "recipes:search", {}, {"recipe_name": "Dish"}, AUTH_QUERIES + 2),
+    "search by ingredient": (
+        "post", "recipes:search", {}, {"ingredients": "Spice", "ingredients_match": "any"}, AUTH_QUERIES + 2,
+    ),
+    # The chart state aggregates (recipes, RecipeStats) + the RecipeStats rows
+    "chart": ("get", "recipes:chart", {}, {"chart_type": "#1"}, AUTH_QUERIES + 3),
+    # Recipes + one ingredient prefetch per chunk (RECIPE_EXPORT_CHUNK_SIZE)
+    "export csv": ("get", "recipes:export", {}, {"format": "csv"}, AUTH_QUERIES + 2),
+    "export ndjson": ("get", "recipes:export", {}, {"format": "ndjson", "difficulty": "Easy"}, AUTH_QUERIES + 2),
+}
+
+
+class QueryBudgetMixin:
+    """assertQueryBudget(budget, request) fails if request() runs more queries."""
+
+    def assertQueryBudget(self, budget, request, label=""):
+        with CaptureQueriesContext(connection) as ctx:
+            response = request()
+            if response.streaming:
+                # Streaming views query while the body is read
+                response.body = b"".join(response.streaming_content)
+        queries = ctx.captured_queries
+        if len(queries) > budget:
+            listing = "\n".join(f"{i}. {q['sql']}" for i, q in enumerate(queries, 1))
+            self.fail(f"{label}: {len(queries)} queries, budget is {budget}:\n{listing}")
+        return response
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ViewQueryBudgetTest(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="budget", password="password123")
+
+    def setUp(self):
+        ingredient_index.clear()
+        chart_cache().clear()
+        self.client.login(username="budget", password="password123")
+
+    def tearDown(self):
+        ingredient_index.clear()
+
+    def make_recipes(self, recipes, ingredients_each):
+        ingredients = [Ingredient.objects.create(name=f"Spice {i}") for i in range(ingredients_each)]
+        for r in range(recipes):
+            recipe = Recipe.objects.create(
+                name=f"Dish {r:03}", cook_time_minutes=10 + r, difficulty=["Easy", "Medium", "Hard"][r % 3],
+            )
+            for ingredient in ingredients:
+                RecipeIngredient.objects.create(recipe=recipe, ingredient=ingredient, quantity=1, unit="g")
+        ingredient_index.clear()
+
+    def check_budgets(self):
+        first = Recipe.objects.order_by("pk").first()
+        for label, (method, name, kwargs, data, budget) in BUDGETS.items():
+            kwargs = {k: first.pk if v == "first" else v for k, v in kwargs.items()}
+            url = reverse(name, kwargs=kwargs)
+            with self.subTest(view=label):
+                # Warm the in-process ingredient index so it isn't counted
+                ingredient_index.recipe_ids(["warm"])
+                response = self.assertQueryBudget(
+                    budget, lambda: getattr(self.client, method)(url, data), label,
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_budgets_with_small_data(self):
+        self.make_recipes(recipes=2, ingredients_each=2)
+        self.check_budgets()
+
+    def test_budgets_do_not_grow_with_data(self):
+        self.make_recipes(recipes=30, ingredients_each=8)
+        self.check_budgets()
+
+    def test_detail_lists_every_ingredient(self):
+        self.make_recipes(recipes=1, ingredients_each=5)
+        recipe = Recipe.objects.get()
+        response = self.client.get(reverse("recipes:detail", kwargs={"pk": recipe.pk}))
+        for i in range(5):
+            self.assertContains(response, f"Spice {i}: 1.0 g")
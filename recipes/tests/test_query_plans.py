@@ -0,0 +1,13 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class ExplainSearchCommandTest(TestCase):
+    def test_canonical_queries_use_their_indexes(self):
+        out = StringIO()
+        # Raises CommandError if any plan misses its index
+        call_command("explain_search", "--check", stdout=out)
+        self.assertIn("recipe_difficulty_time_idx", out.getvalue())
+        self.assertIn("recipeingr_ingr_recipe_idx", out.getvalue())
@@ -0,0 +1,101 @@
+# recipes/tests/test_recipe_stats.py
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from recipes.charts import chart_data
+from recipes.models import Recipe, RecipeStats
+from recipes.stats import count_recipe_stats, rebuild_recipe_stats, stats_chart_data
+
+
+def stored_stats():
+    return {(row.kind, row.key): row.count for row in RecipeStats.objects.filter(count__gt=0)}
+
+
+class RecipeStatsUpkeepTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.toast = Recipe.objects.create(name="Toast", cook_time_minutes=5, difficulty="Easy")
+        cls.soup = Recipe.objects.create(name="Soup", cook_time_minutes=45, difficulty="Easy")
+        cls.roast = Recipe.objects.create(name="Roast", cook_time_minutes=120, difficulty="Hard")
+
+    def assertStatsCurrent(self):
+        self.assertEqual(stored_stats(), count_recipe_stats(Recipe.objects.all()))
+
+    def test_create_counts_each_recipe(self):
+        self.assertEqual(RecipeStats.objects.get(kind=RecipeStats.DIFFICULTY, key="Easy").count, 2)
+        self.assertEqual(RecipeStats.objects.get(kind=RecipeStats.COOK_TIME, key="2").count, 1)
+        self.assertStatsCurrent()
+
+    def test_edit_moves_the_counts(self):
+        self.soup.difficulty = "Hard"
+        self.soup.cook_time_minutes = 200
+        self.soup.save()
+        self.assertEqual(RecipeStats.objects.get(kind=RecipeStats.DIFFICULTY, key="Hard").count, 2)
+        self.assertStatsCurrent()
+
+        # Saving without changes leaves them alone
+        self.soup.save()
+        self.assertStatsCurrent()
+
+    def test_delete_uncounts(self):
+        self.roast.delete()
+        self.assertEqual(RecipeStats.objects.get(kind=RecipeStats.DIFFICULTY, key="Hard").count, 0)
+        self.assertStatsCurrent()
+
+    def test_rebuild_after_bulk_update(self):
+        # update() sends no signals, so the table drifts until rebuilt
+        Recipe.objects.filter(pk=self.toast.pk).update(created_at=self.toast.created_at - timedelta(days=3))
+        self.assertNotEqual(stored_stats(), count_recipe_stats(Recipe.objects.all()))
+        call_command("refresh_recipe_stats", stdout=open("/dev/null", "w"))
+        self.assertStatsCurrent()
+        self.assertEqual(rebuild_recipe_stats(), RecipeStats.objects.count())
+
+    def test_chart_data_matches_the_recipe_table(self):
+        Recipe.objects.filter(pk=self.roast.pk).update(created_at=self.roast.created_at - timedelta(days=2))
+        rebuild_recipe_stats()
+        for chart_type in ("#1", "#2", "#3"):
+            self.assertEqual(stats_chart_data(chart_type), chart_data(chart_type, Recipe.objects.all()))
+
+    def test_chart_data_is_one_query(self):
+        for chart_type in ("#1", "#2", "#3"):
+            with self.assertNumQueries(1):
+                stats_chart_data(chart_type)
+
+    def test_no_recipes_no_chart(self):
+        Recipe.objects.all().delete()
+        self.assertIsNone(stats_chart_data("#1"))
+        self.assertIsNone(stats_chart_data("#9"))
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class UnfilteredChartTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="stats", password="password123")
+        Recipe.objects.create(name="Toast", cook_time_minutes=5, difficulty="Easy")
+
+    def setUp(self):
+        caches["charts"].clear()
+        self.client.login(username="stats", password="password123")
+
+    def test_show_all_chart_reads_the_summary_rows(self):
+        url = reverse("recipes:chart")
+        # Summary rows say something the recipe table doesn't: they were used
+        RecipeStats.objects.filter(kind=RecipeStats.DIFFICULTY, key="Easy").update(count=7)
+        RecipeStats.objects.create(kind=RecipeStats.DIFFICULTY, key="Hard", count=3)
+        response = self.client.get(url, {"chart_type": "#1", "format": "svg"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"Hard", response.content)
+
+        # Any filter goes back to the recipe table
+        caches["charts"].clear()
+        response = self.client.get(url, {"chart_type": "#1", "format": "svg", "max_cook_time": 60})
+        self.assertNotIn(b"Hard", response.content)
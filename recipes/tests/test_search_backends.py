@@ -0,0 +1,92 @@
+# recipes/tests/test_search_backends.py
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from recipes.models import Recipe, Ingredient, RecipeIngredient
+from recipes.search_backends import (
+    IcontainsSearchBackend, SQLiteFTS5SearchBackend, get_search_backend,
+)
+
+
+class SearchBackendTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.basil = Ingredient.objects.create(name="Basil")
+        cls.pesto = Recipe.objects.create(
+            name="Pesto Pasta", description="Green sauce with pine nuts.", cook_time_minutes=15,
+        )
+        cls.soup = Recipe.objects.create(
+            name="Tomato Soup", description="Finish with a little pesto.", cook_time_minutes=30,
+        )
+        cls.salad = Recipe.objects.create(name="Caprese", cook_time_minutes=5)
+        RecipeIngredient.objects.create(recipe=cls.salad, ingredient=cls.basil)
+
+    def test_sqlite_uses_fts5_backend(self):
+        # The test database runs migration 0005, so the FTS table exists
+        self.assertIsInstance(get_search_backend(), SQLiteFTS5SearchBackend)
+
+    def test_ranks_name_above_description(self):
+        backend = get_search_backend()
+        self.assertEqual(backend.search("pesto"), [self.pesto.pk, self.soup.pk])
+
+    def test_prefix_and_ingredient_matches(self):
+        backend = get_search_backend()
+        self.assertEqual(backend.search("toma"), [self.soup.pk])
+        self.assertEqual(backend.search("basil"), [self.salad.pk])
+        self.assertEqual(backend.search("pine sauce"), [self.pesto.pk])
+        self.assertEqual(backend.search("  !! "), [])
+
+    def test_index_follows_signals(self):
+        backend = get_search_backend()
+        # Editing a recipe and renaming an ingredient re-index incrementally
+        self.soup.name = "Gazpacho"
+        self.soup.save()
+        self.assertEqual(backend.search("gazpa"), [self.soup.pk])
+        self.basil.name = "Thai Basil"
+        self.basil.save()
+        self.assertEqual(backend.search("thai"), [self.salad.pk])
+        # Unlinking and deleting take rows out of the index
+        self.salad.ingredients.remove(self.basil)
+        self.assertEqual(backend.search("basil"), [])
+        self.pesto.delete()
+        self.assertEqual(backend.search("pesto"), [self.soup.pk])
+
+    def test_rebuild_command(self):
+        # Updates that bypass signals are picked up by a rebuild
+        Recipe.objects.filter(pk=self.salad.pk).update(description="Mozzarella and tomato")
+        self.assertEqual(get_search_backend().search("mozzarella"), [])
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertEqual(get_search_backend().search("mozzarella"), [self.salad.pk])
+
+    def test_ranked_scores_in_the_same_query(self):
+        for backend in (get_search_backend(), IcontainsSearchBackend()):
+            qs = backend.ranked(Recipe.objects.filter(cook_time_minutes__gte=10), "pesto")
+            with self.assertNumQueries(1):
+                rows = list(qs.order_by("search_rank", "name").values_list("pk", "search_rank"))
+            self.assertEqual([pk for pk, _ in rows], [self.pesto.pk, self.soup.pk])
+            self.assertLess(rows[0][1], rows[1][1])
+            self.assertFalse(backend.ranked(Recipe.objects.all(), "  !! ").exists())
+
+    def test_limit_is_only_applied_when_asked(self):
+        backend = get_search_backend()
+        self.assertEqual(backend.search("pesto", limit=1), [self.pesto.pk])
+        self.assertEqual(IcontainsSearchBackend().search("pesto", limit=1), [self.pesto.pk])
+
+    @override_settings(RECIPE_SEARCH_MAX_RESULTS=1)
+    def test_max_results_never_drops_filtered_matches(self):
+        from recipes.views import filter_recipes
+
+        # The best text match fails the difficulty filter; the next one must stay
+        Recipe.objects.filter(pk=self.soup.pk).update(difficulty="Hard")
+        qs = filter_recipes({"recipe_name": "pesto", "difficulty": "Hard"})
+        self.assertEqual(list(qs.values_list("pk", flat=True)), [self.soup.pk])
+        self.assertEqual(list(filter_recipes({"recipe_name": "pesto"}).values_list("pk", flat=True)),
+                         [self.pesto.pk, self.soup.pk])
+
+    def test_icontains_fallback(self):
+        backend = IcontainsSearchBackend()
+        self.assertEqual(backend.search("pesto"), [self.pesto.pk, self.soup.pk])
+        self.assertEqual(backend.search("basil"), [self.salad.pk])
@@ -0,0 +1,78 @@
+# recipes/tests/test_search_index.py
+
+from django.db import transaction
+from django.test import TestCase
+from recipes.models import Recipe, Ingredient, RecipeIngredient
+from recipes.search_index import ingredient_index, tokenize
+
+
+class IngredientIndexTest(TestCase):
+
+    def setUp(self):
+        # Start every test from an empty index (it is shared per process)
+        ingredient_index.clear()
+        self.tomato = Ingredient.objects.create(name="Cherry Tomato")
+        self.oil = Ingredient.objects.create(name="Olive Oil")
+        self.salad = Recipe.objects.create(name="Salad", cook_time_minutes=5)
+        self.sauce = Recipe.objects.create(name="Sauce", cook_time_minutes=20)
+        RecipeIngredient.objects.create(recipe=self.salad, ingredient=self.tomato)
+        RecipeIngredient.objects.create(recipe=self.salad, ingredient=self.oil)
+        RecipeIngredient.objects.create(recipe=self.sauce, ingredient=self.tomato)
+
+    def tearDown(self):
+        # Don't leak rolled-back rows into other test classes
+        ingredient_index.clear()
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Olive  Oil, Extra-Virgin"), ["olive", "oil", "extra", "virgin"])
+
+    def test_partial_terms_match_like_icontains(self):
+        self.assertEqual(ingredient_index.recipe_ids(["tomat"]), {self.salad.pk, self.sauce.pk})
+        self.assertEqual(ingredient_index.recipe_ids(["VE OI"]), {self.salad.pk})
+        self.assertEqual(ingredient_index.recipe_ids(["oil tomato"]), set())
+
+    def test_any_and_all_terms(self):
+        self.assertEqual(ingredient_index.recipe_ids(["oil", "tomato"]), {self.salad.pk, self.sauce.pk})
+        self.assertEqual(ingredient_index.recipe_ids(["oil", "tomato"], match_all=True), {self.salad.pk})
+
+    def test_index_follows_saves_and_deletes(self):
+        # Build the index, then change the data underneath it; each change
+        # reaches the index when its transaction commits
+        ingredient_index.recipe_ids(["oil"])
+        with self.captureOnCommitCallbacks(execute=True):
+            basil = Ingredient.objects.create(name="Basil")
+            RecipeIngredient.objects.create(recipe=self.sauce, ingredient=basil)
+        self.assertEqual(ingredient_index.recipe_ids(["basil"]), {self.sauce.pk})
+
+        # Renaming an ingredient re-indexes its words
+        self.oil.name = "Sesame Oil"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.oil.save()
+        self.assertEqual(ingredient_index.recipe_ids(["sesame"]), {self.salad.pk})
+        self.assertEqual(ingredient_index.recipe_ids(["olive"]), set())
+
+        # Deleting links (directly or through the M2M manager) removes them
+        with self.captureOnCommitCallbacks(execute=True):
+            RecipeIngredient.objects.filter(recipe=self.salad, ingredient=self.oil).delete()
+        self.assertEqual(ingredient_index.recipe_ids(["oil"]), set())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sauce.ingredients.remove(self.tomato)
+        self.assertEqual(ingredient_index.recipe_ids(["tomato"]), {self.salad.pk})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sauce.ingredients.add(self.oil)
+        self.assertEqual(ingredient_index.recipe_ids(["oil"]), {self.sauce.pk})
+
+    def test_rolled_back_writes_never_reach_the_index(self):
+        ingredient_index.recipe_ids(["oil"])
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    basil = Ingredient.objects.create(name="Basil")
+                    RecipeIngredient.objects.create(recipe=self.sauce, ingredient=basil)
+                    self.salad.ingredients.remove(self.oil)
+                    raise RuntimeError("roll back")
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(ingredient_index.recipe_ids(["basil"]), set())
+        self.assertEqual(ingredient_index.recipe_ids(["oil"]), {self.salad.pk})
@@ -1,11 +1,12 @@
 # recipes/tests/test_views.py
 
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.contrib.auth.models import User
 # Import the model needed for creating test data
 from recipes.models import Recipe, Ingredient # Import Ingredient if needed for setup
 
+@override_settings(SECURE_SSL_REDIRECT=False)
 class RecipeSearchViewTest(TestCase):
 
     # Set up initial data for all tests in this class
@@ -96,6 +97,15 @@ class RecipeSearchViewTest(TestCase):
         # Check results count if needed
         self.assertEqual(len(response.context['recipes']), 1)
 
+    # The page lists at most RECIPE_SEARCH_MAX_RESULTS rows and says there were more
+    @override_settings(RECIPE_SEARCH_MAX_RESULTS=1)
+    def test_search_results_are_capped_after_filtering(self):
+        self.client.login(username="testuser", password="password123")
+        response = self.client.post(self.url, {"max_cook_time": 200})
+        self.assertEqual(len(response.context['recipes']), 1)
+        self.assertTrue(response.context['recipes'].truncated)
+        self.assertContains(response, "Search Results (1+)")
+
     # Test searching by ingredients using OR logic
     def test_search_by_ingredients_or_logic(self):
         self.client.login(username="testuser", password="password123")
@@ -108,6 +118,18 @@ class RecipeSearchViewTest(TestCase):
         self.assertNotContains(response, "Beef Wellington") # Has neither
         self.assertEqual(len(response.context['recipes']), 2)
 
+    # Test searching by ingredients using AND logic
+    def test_search_by_ingredients_and_logic(self):
+        self.client.login(username="testuser", password="password123")
+        # Only Carbonara has both eggs AND bacon
+        response = self.client.post(self.url, {"ingredients": "eggs, bacon", "ingredients_match": "all"})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Pasta Carbonara")
+        self.assertEqual(len(response.context['recipes']), 1)
+        # Nothing has both mozzarella AND bacon
+        response = self.client.post(self.url, {"ingredients": "mozzarella, bacon", "ingredients_match": "all"})
+        self.assertEqual(len(response.context['recipes']), 0)
+
     # Test filtering by maximum cooking time
     def test_search_by_max_cook_time(self):
         self.client.login(username="testuser", password="password123")
@@ -151,6 +173,24 @@ class RecipeSearchViewTest(TestCase):
         self.assertContains(response, "Beef Wellington")
         self.assertEqual(len(response.context['recipes']), 3) # Should show all 3 recipes
 
+    # Test that each kind of search costs a fixed number of queries:
+    # session + user (login) and then ONE query for the results
+    def test_search_query_counts(self):
+        self.client.login(username="testuser", password="password123")
+        # Warm up the in-memory ingredient index first
+        self.client.post(self.url, {"ingredients": "bacon"})
+        searches = [
+            ({"show_all": "true"}, 3),
+            ({"difficulty": "Easy", "max_cook_time": 30}, 3),
+            ({"ingredients": "mozzarella, bacon", "chart_type": "#1"}, 3),
+            # The full-text match and rank join the same results query
+            ({"recipe_name": "Pizza", "chart_type": "#2"}, 3),
+        ]
+        for data, queries in searches:
+            with self.subTest(data=data), self.assertNumQueries(queries):
+                response = self.client.post(self.url, data)
+                self.assertEqual(response.status_code, 200)
+
     # Optional: Test that chart context is None when no chart type selected
     def test_chart_context_is_none_by_default(self):
         self.client.login(username="testuser", password="password123")
@@ -160,14 +200,53 @@ class RecipeSearchViewTest(TestCase):
         # Check that 'chart' key in context is None
         self.assertIsNone(response.context.get('chart'))
 
-    # Optional: Test chart generation (basic check if chart data is present)
-    # Note: This doesn't validate the image content, just that *something* was generated
+    # Optional: Test chart generation (basic check if chart URL is present)
+    # Note: The page only links the chart; the image comes from recipes:chart
     def test_chart_generation_context_present(self):
         self.client.login(username="testuser", password="password123")
         # POST with a chart type selected
-        response = self.client.post(self.url, {"recipe_name": "P", "chart_type": "#1"}) # Search for 'P' (Pasta, Pizza), request chart #1
+        # Search for 'P' (Pasta, Pizza), request chart #1
+        response = self.client.post(self.url, {"recipe_name": "P", "chart_type": "#1"})
         self.assertEqual(response.status_code, 200)
-        # Check that 'chart' key exists and is not None (should be a base64 string)
-        self.assertIsNotNone(response.context.get('chart'))
-        self.assertIsInstance(response.context.get('chart'), str)
-        self.assertTrue(len(response.context.get('chart')) > 100) # Check it's a reasonably long base64 string
\ No newline at end of file
+        # Check that 'chart' is the chart endpoint URL with the same filters
+        chart = response.context.get('chart')
+        self.assertIsInstance(chart, str)
+        self.assertTrue(chart.startswith(reverse("recipes:chart") + "?"))
+        # Loaded by the page script (it retries 202 "pending"), plain <img> without JS
+        self.assertContains(response, f'data-src="{chart.replace("&", "&amp;")}"')
+        self.assertContains(response, f'<img src="{chart.replace("&", "&amp;")}"')
+        # Fetching it returns a real image (SVG from the default engine)
+        image = self.client.get(chart)
+        self.assertEqual(image.status_code, 200)
+        self.assertEqual(image["Content-Type"], "image/svg+xml")
+        self.assertTrue(image.content.startswith(b"<svg"))
+
+    # Test the optional matplotlib engine still serves PNG charts
+    @override_settings(RECIPE_CHART_ENGINE="matplotlib")
+    def test_chart_endpoint_matplotlib_png(self):
+        self.client.login(username="testuser", password="password123")
+        image = self.client.get(reverse("recipes:chart"), {"chart_type": "#3"})
+        self.assertEqual(image.status_code, 200)
+        self.assertEqual(image["Content-Type"], "image/png")
+        self.assertTrue(image.content.startswith(b"\x89PNG"))
+
+    # Test the chart endpoint's formats and conditional GET support
+    def test_chart_endpoint_svg_and_etag(self):
+        self.client.login(username="testuser", password="password123")
+        chart_url = reverse("recipes:chart")
+        response = self.client.get(chart_url, {"chart_type": "#2", "format": "svg"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/svg+xml")
+        self.assertIn("Last-Modified", response)
+        # Same request with the ETag comes back 304 Not Modified
+        again = self.client.get(
+            chart_url, {"chart_type": "#2", "format": "svg"}, HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+        self.assertEqual(again.status_code, 304)
+        # Browsers may reuse it for RECIPE_CHART_MAX_AGE seconds
+        with self.settings(RECIPE_CHART_MAX_AGE=15):
+            response = self.client.get(chart_url, {"chart_type": "#2", "format": "svg"})
+        self.assertIn("max-age=15", response["Cache-Control"])
+        # Bad format / missing chart type
+        self.assertEqual(self.client.get(chart_url, {"chart_type": "#2", "format": "gif"}).status_code, 400)
+        self.assertEqual(self.client.get(chart_url, {"difficulty": "Easy"}).status_code, 404)
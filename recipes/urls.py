@@ -2,21 +2,28 @@
 
 from django.urls import path
 # Import all necessary views from the views module
-from .views import RecipeListView, RecipeDetailView, recipe_search
+from .views import recipe_list, recipe_detail, recipe_search, recipe_chart, recipe_export, fragment_metrics
 
 app_name = 'recipes' # Define the namespace for this app
 
 urlpatterns = [
     # Path for the recipe list page (e.g., /recipes/)
-    path('', RecipeListView.as_view(), name='list'),
+    path('', recipe_list, name='list'),
 
     # Path for the recipe search page (e.g., /recipes/search/) - NEW
     path('search/', recipe_search, name='search'),
 
+    # Path for the search chart image (e.g., /recipes/chart/?chart_type=%231)
+    path('chart/', recipe_chart, name='chart'),
+
+    # Path for search result downloads (e.g. /recipes/export/?format=csv)
+    path('export/', recipe_export, name='export'),
+
+    # Fragment cache hit/miss counters for a metrics scraper
+    path('metrics/fragments/', fragment_metrics, name='fragment_metrics'),
+
     # Path for the recipe detail page (e.g., /recipes/1/)
    
-    path('<int:pk>/', RecipeDetailView.as_view(), name='detail'),
-
-    # but your views.py uses a Class-Based View RecipeDetailView.
+    path('<int:pk>/', recipe_detail, name='detail'),
  
 ]
\ No newline at end of file
@@ -1,139 +1,177 @@
 # recipes/views.py
 
-from django.shortcuts import render, redirect, get_object_or_404
-from django.views.generic import ListView, DetailView
-from django.contrib.auth.mixins import LoginRequiredMixin
-from .models import Recipe, Ingredient, RecipeIngredient
+import hmac
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, aget_object_or_404
+from django.http import (
+    Http404, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, StreamingHttpResponse,
+)
+from django.urls import reverse
+from django.utils.cache import add_never_cache_headers, get_conditional_response, patch_cache_control
+from django.utils.http import http_date, urlencode
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from .models import Recipe
 
 # Ex 2.7: Search & Charts
-# Need login for search view
+# Need login for search view (works for async views too)
 from django.contrib.auth.decorators import login_required
-# For OR filter (Q) and counting (Count)
-from django.db.models import Q, Count
 # The search form we made
 from .forms import RecipeSearchForm
-# For charts - data handling
-import pandas as pd
-# For charts - image buffer
-from io import BytesIO
-# For charts - image encoding
-import base64
-# For charts - plotting library
-import matplotlib
-# For charts - IMPORTANT: use 'Agg' backend for servers (no GUI)
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-
-
-# Chart Helper Function (Ex 2.7)
-def generate_recipe_chart(chart_type, qs, df=None):
-    """Makes the chart image based on search results."""
-
-    # Don't plot if no chart type selected or no recipes found
-    if not chart_type or not qs.exists():
-        return None
-
-    # Use 'Agg' backend again just to be safe
-    plt.switch_backend("Agg")
-    # Set up the plot area
-    fig, ax = plt.subplots(figsize=(10, 6))
+# Ingredient term -> recipe ids lookups
+from .search_index import ingredient_index
+# Full-text search over name, description and ingredients (ranked in the DB)
+from .search_backends import get_search_backend
+# Rendered charts cached per chart type + result set
+from .chart_cache import aget_or_render_chart, chart_state, store_chart
+# Chart engines (SVG by default; matplotlib only loaded if selected)
+from .charts import get_chart_engine
+# Bounded worker pools that draw the charts ("chart pending" when busy)
+from .chart_service import PENDING_SVG, ChartPending, arender_chart
+# Keyset pagination by (name, pk)
+from .pagination import InvalidCursor, KeysetPaginator, get_page_size
+# Cached recipe fragments: one lookup per list page, hit/miss counters
+from .fragment_cache import PREFETCHED_CONTEXT, fragment_stats, prefetch_fragments
+# Streaming CSV/NDJSON exports of search results
+from .exports import EXPORT_FORMATS
+
+
+# Content type for each image format the chart endpoint can return
+CHART_CONTENT_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+
+def filter_recipes(cleaned_data):
+    """
+    Applies the search form filters and returns the ordered queryset.
+    Shared by the search page and the chart endpoint.
+    """
+    # Start query with all recipes
+    qs = Recipe.objects.all()
+
+    # Get the (cleaned) search terms from the form
+    name_query = cleaned_data.get("recipe_name")
+    ingredients_query = cleaned_data.get("ingredients")
+    max_time_query = cleaned_data.get("max_cook_time")
+    difficulty_query = cleaned_data.get("difficulty")
+
+    # Apply filters if user entered terms
+    # Full-text match on name, description and ingredient names; every row
+    # gets its search_rank from the same query (0 queries here)
+    if name_query:
+        qs = get_search_backend().ranked(qs, name_query)
+
+    # Filter by ingredients (comma-separated, ignore case)
+    if ingredients_query:
+        # Get list of ingredients entered
+        terms = [term.strip() for term in ingredients_query.split(",") if term.strip()]
+        if terms:
+            # Look the terms up in the in-memory ingredient index
+            # (any term by default, every term if "all" was picked)
+            match_all = cleaned_data.get("ingredients_match") == "all"
+            recipe_ids = ingredient_index.recipe_ids(terms, match_all=match_all)
+            # One pk__in filter instead of an M2M join + DISTINCT
+            qs = qs.filter(pk__in=recipe_ids)
+
+    # Filter by max cooking time (less than or equal)
+    if max_time_query:
+        qs = qs.filter(cook_time_minutes__lte=max_time_query)
+
+    # Filter by difficulty (exact match)
+    if difficulty_query:
+        qs = qs.filter(difficulty=difficulty_query)
+
+    # Final results: best text matches first, otherwise sorted by name
+    if name_query:
+        return qs.order_by("search_rank", "name")
+    return qs.order_by("name")
+
+
+def has_filters(cleaned_data):
+    """True if any search filter is set (chart_type and ingredients_match aren't filters)."""
+    return any(cleaned_data.get(name) for name in ("recipe_name", "ingredients", "max_cook_time", "difficulty"))
+
+
+class SearchResults:
+    """
+    Search results evaluated with exactly one query into compact rows
+    (pk, name, cook_time_minutes, difficulty, created_at, ingredient_names).
+    The result count, the "any results?" check and the table all read from
+    these rows.
+    """
+
+    FIELDS = ("pk", "name", "cook_time_minutes", "difficulty", "created_at", "ingredient_names")
+
+    def __init__(self, rows, page=None, truncated=False):
+        self.rows = rows
+        self.page = page
+        # More rows matched than the limit passed to fetch()
+        self.truncated = truncated
+
+    @classmethod
+    async def fetch(cls, qs, paginate=False, cursor=None, limit=None):
+        """Runs the query with the async ORM and returns the results."""
+        rows = qs.values_list(*cls.FIELDS, named=True)
+        if not paginate:
+            if not limit:
+                return cls([row async for row in rows])
+            # One extra row tells whether there were more
+            rows = [row async for row in rows[: limit + 1]]
+            return cls(rows[:limit], truncated=len(rows) > limit)
+        # Keyset page (ordered by name, pk) instead of every row
+        try:
+            page = await KeysetPaginator(rows).apage(cursor)
+        except InvalidCursor:
+            raise Http404("Invalid page cursor.")
+        return cls(page.object_list, page)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __bool__(self):
+        return bool(self.rows)
+
+
+def chart_url(cleaned_data):
+    """URL of the chart endpoint for these search filters."""
+    params = {name: value for name, value in cleaned_data.items() if value not in (None, "")}
+    # Ask for the active engine's preferred image format
+    params["format"] = get_chart_engine().formats[0]
+    return f"{reverse('recipes:chart')}?{urlencode(params)}"
+
+
+def export_urls(cleaned_data=None):
+    """Export endpoint URLs (format -> URL) for these search filters."""
+    params = {
+        name: value for name, value in (cleaned_data or {}).items()
+        if value not in (None, "") and name != "chart_type"
+    }
+    return {
+        export_format: f"{reverse('recipes:export')}?{urlencode({**params, 'format': export_format})}"
+        for export_format in EXPORT_FORMATS
+    }
 
-    try:
-        # Chart #1: Bar chart for difficulty
-        if chart_type == "#1":
-            # Count recipes per difficulty
-            data = list(qs.values("difficulty").annotate(count=Count("difficulty")).order_by('difficulty'))
-            # Need data to plot
-            if not data: return None
-            # Plotting
-            pdf = pd.DataFrame(data)
-            ax.bar(pdf["difficulty"], pdf["count"], color=['#1f77b4', '#ff7f0e', '#2ca02c'])
-            ax.set_xlabel("Difficulty Level")
-            ax.set_ylabel("Number of Recipes")
-            ax.set_title("Recipes by Difficulty")
-
-        # Chart #2: Pie chart for cooking time
-        elif chart_type == "#2":
-            # Get all cook times
-            times = list(qs.values_list("cook_time_minutes", flat=True))
-            # Remove any nulls
-            times = [t for t in times if t is not None]
-            # Need times to plot
-            if not times: return None
-
-            # Group times into buckets
-            buckets = {
-                "≤ 30 min": sum(1 for t in times if t <= 30),
-                "31–60 min": sum(1 for t in times if 30 < t <= 60),
-                "> 60 min": sum(1 for t in times if t > 60),
-            }
-            # Remove empty buckets so pie chart looks clean
-            buckets = {k: v for k, v in buckets.items() if v > 0}
-            # Need buckets with data
-            if not buckets: return None
-            # Plotting
-            ax.pie(buckets.values(), labels=buckets.keys(), autopct="%1.1f%%", startangle=90)
-            ax.set_title("Cooking Time Distribution")
-            # Make it a circle
-            ax.axis('equal')
-
-        # Chart #3: Line chart for recipe growth
-        elif chart_type == "#3":
-            # Use DataFrame if passed in, else make one
-            if df is None:
-                df = pd.DataFrame(qs.values("created_at"))
-
-            # Need 'created_at' dates to plot
-            if "created_at" not in df.columns or df["created_at"].isna().all():
-                return None
-
-            # Convert to date objects
-            df["created_at"] = pd.to_datetime(df["created_at"])
-            # Sort by date
-            df = df.sort_values("created_at")
-            # Add cumulative count column (1, 2, 3...)
-            df["cumulative"] = range(1, len(df) + 1)
-            # Plotting
-            ax.plot(df["created_at"], df["cumulative"], marker="o", linestyle='-')
-            ax.set_xlabel("Date Added")
-            ax.set_ylabel("Total Number of Recipes")
-            ax.set_title("Recipe Collection Growth Over Time")
-            # Rotate date labels so they don't overlap
-            plt.xticks(rotation=45, ha='right')
-
-        else:
-            # Unknown chart type
-            return None
-
-        # Convert plot to image string
-        # Fit plot correctly
-        plt.tight_layout()
-        # Temporary memory buffer for image
-        buf = BytesIO()
-        # Save plot PNG into buffer
-        plt.savefig(buf, format="png", dpi=100, bbox_inches="tight")
-        # Go back to start of buffer
-        buf.seek(0)
-        # Encode image bytes as base64 text
-        img_b64 = base64.b64encode(buf.getvalue()).decode("utf-8")
-        # Free memory
-        buf.close()
-        plt.close(fig)
-        # Send back the image text
-        return img_b64
-
-    except Exception as e:
-        # If something went wrong during plotting
-        print(f"Error generating chart {chart_type}: {e}")
-        # Clean up plot figure
-        plt.close(fig)
-        return None
+
+async def arender(request, template_name, context):
+    """
+    render() for async views. Template rendering (and anything lazy it
+    touches) is sync, so it runs in a thread; request.user is pointed at the
+    user login_required already loaded, so it isn't fetched a second time.
+    """
+    request.user = await request.auser()
+    return await sync_to_async(render)(request, template_name, context)
 
 
 # Search View Function (Ex 2.7)
 # User must be logged in to see this page
 @login_required
-def recipe_search(request):
+async def recipe_search(request):
     """Handles search form and shows results + charts."""
 
     # Create form instance - use POST data if submitted, else empty form
@@ -141,78 +179,184 @@ def recipe_search(request):
     # Start with no results or chart
     recipes = None
     chart = None
+    exports = None
 
-    # If form was submitted (POST request)
-    if request.method == "POST":
+    # Special case: "Show All" button pressed (POST), or one of its
+    # next/previous page links followed (GET with a cursor)
+    if "show_all" in request.POST or "show_all" in request.GET:
+        cursor = request.POST.get("cursor") or request.GET.get("cursor")
+        recipes = await SearchResults.fetch(Recipe.objects.all(), paginate=True, cursor=cursor)
+        exports = export_urls()
 
-        # Special case: "Show All" button pressed
-        if "show_all" in request.POST:
-            recipes = Recipe.objects.all().order_by("name")
+    # If form was submitted (POST request)
+    elif request.method == "POST":
 
         # Regular search form submitted and valid
-        elif form.is_valid():
-            # Start query with all recipes
-            qs = Recipe.objects.all()
-
-            # Get the (cleaned) search terms from the form
-            name_query = form.cleaned_data.get("recipe_name")
-            ingredients_query = form.cleaned_data.get("ingredients")
-            max_time_query = form.cleaned_data.get("max_cook_time")
-            difficulty_query = form.cleaned_data.get("difficulty")
-            chart_type_query = form.cleaned_data.get("chart_type")
-
-            # Apply filters if user entered terms
-            # Filter by name (partially matches, ignore case)
-            if name_query:
-                qs = qs.filter(name__icontains=name_query)
-
-            # Filter by ingredients (comma-separated, any match, ignore case)
-            if ingredients_query:
-                # Get list of ingredients entered
-                terms = [term.strip() for term in ingredients_query.split(",") if term.strip()]
-                if terms:
-                    # Build OR query using Q objects
-                    query = Q()
-                    for term in terms:
-                        # Check ingredient *names* via the relationship
-                        query |= Q(ingredients__name__icontains=term)
-                    # Apply filter, remove duplicates if a recipe matches >1 term
-                    qs = qs.filter(query).distinct()
-
-            # Filter by max cooking time (less than or equal)
-            if max_time_query:
-                qs = qs.filter(cook_time_minutes__lte=max_time_query)
-
-            # Filter by difficulty (exact match)
-            if difficulty_query:
-                qs = qs.filter(difficulty=difficulty_query)
-
-            # Final results, sorted by name
-            recipes = qs.order_by("name")
-
-            # Try generating chart if requested AND we found recipes
-            if recipes.exists() and chart_type_query:
-                # Make DataFrame needed for chart #3 efficiently
-                df = pd.DataFrame(recipes.values("created_at", "cook_time_minutes", "difficulty"))
-                chart = generate_recipe_chart(chart_type_query, recipes, df=df)
+        if form.is_valid():
+            # Text/ingredient lookups go through sync caches and indexes
+            qs = await sync_to_async(filter_recipes)(form.cleaned_data)
+            # The one query for this search; the page lists the best
+            # RECIPE_SEARCH_MAX_RESULTS (filters were applied first)
+            recipes = await SearchResults.fetch(qs, limit=getattr(settings, "RECIPE_SEARCH_MAX_RESULTS", 1000))
+            exports = export_urls(form.cleaned_data)
+
+            # Point the page at the chart endpoint if a chart was requested
+            # AND we found recipes; the browser fetches it in parallel
+            if form.cleaned_data.get("chart_type") and recipes:
+                chart = chart_url(form.cleaned_data)
 
     # Data to send to the template
     context = {
         "form": form,
         "recipes": recipes,
         "chart": chart,
+        "exports": exports,
     }
     # Load the search.html page with the context data
-    return render(request, "recipes/search.html", context)
+    return await arender(request, "recipes/search.html", context)
 
 
-# Existing Class-Based Views
-# Shows list of all recipes
-class RecipeListView(LoginRequiredMixin, ListView):
-    model = Recipe
-    template_name = 'recipes/recipes_list.html'
+# Chart Image View
+# Same filters as the search form, sent as query parameters
+@login_required
+async def recipe_chart(request):
+    """
+    Returns the search chart as a cacheable PNG/SVG image. Drawing runs on
+    the chart pool, so a slow plot doesn't hold up the worker's other
+    requests; when the pool is busy a "chart pending" image comes back
+    with status 202.
+    """
+
+    form = RecipeSearchForm(request.GET)
+    engine = get_chart_engine()
+    image_format = request.GET.get("format", engine.formats[0])
+    if not form.is_valid() or image_format not in engine.formats:
+        return HttpResponseBadRequest("Invalid chart request.")
+    chart_type = form.cleaned_data.get("chart_type")
+    if not chart_type:
+        raise Http404("No chart type selected.")
+
+    # "Show All": the summary rows in RecipeStats answer without touching
+    # the recipe table (recipes=None)
+    recipes = None
+    if has_filters(form.cleaned_data):
+        recipes = await sync_to_async(filter_recipes)(form.cleaned_data)
+    state = await sync_to_async(chart_state)(chart_type, recipes, f"{engine.name}.{image_format}")
+
+    # Answer conditional requests (If-None-Match / If-Modified-Since) early
+    response = get_conditional_response(request, etag=state.etag, last_modified=state.last_modified)
+    if response is None:
+        # A chart that misses the timeout is cached when it's done
+        def render():
+            return arender_chart(
+                chart_type, recipes, image_format, engine,
+                on_late_result=lambda chart: store_chart(state, chart),
+            )
+
+        try:
+            image = await aget_or_render_chart(state, render)
+        except ChartPending:
+            return chart_pending_response()
+        if image is None:
+            raise Http404("No chart for these results.")
+        response = HttpResponse(image, content_type=CHART_CONTENT_TYPES[image_format])
+
+    response["ETag"] = state.etag
+    response["Last-Modified"] = http_date(state.last_modified)
+    patch_cache_control(response, private=True, max_age=getattr(settings, "RECIPE_CHART_MAX_AGE", 60))
+    return response
+
+
+def chart_pending_response():
+    """
+    Placeholder image (never cached) for a chart that isn't ready yet. 202
+    Accepted + Retry-After tells clients to ask again; the image is only
+    something to show meanwhile.
+    """
+    response = HttpResponse(PENDING_SVG, content_type=CHART_CONTENT_TYPES["svg"], status=202)
+    response["Retry-After"] = "2"
+    add_never_cache_headers(response)
+    return response
+
+
+# Export View
+# Same filters as the search form (GET), streamed as CSV or NDJSON
+@login_required
+def recipe_export(request):
+    """Streams every recipe matching the search filters as a download."""
+
+    form = RecipeSearchForm(request.GET)
+    export_format = request.GET.get("format", "csv")
+    if not form.is_valid() or export_format not in EXPORT_FORMATS:
+        return HttpResponseBadRequest("Invalid export request.")
+
+    lines, alines, content_type, extension = EXPORT_FORMATS[export_format]
+    # Under ASGI a sync generator would be read to the end before the first
+    # byte goes out, so stream through the async ORM there
+    if isinstance(request, ASGIRequest):
+        lines = alines
+    response = StreamingHttpResponse(lines(filter_recipes(form.cleaned_data)), content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="recipes.{extension}"'
+    return response
+
+
+# Fragment cache metrics (Prometheus text format) for a scraper
+# Needs "Authorization: Bearer <RECIPE_METRICS_TOKEN>" or a staff login
+def fragment_metrics(request):
+    token = getattr(settings, "RECIPE_METRICS_TOKEN", "")
+    given = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    allowed = bool(token) and hmac.compare_digest(given.encode(), token.encode())
+    if not (allowed or request.user.is_staff):
+        return HttpResponseForbidden("Metrics need a token or a staff login.")
+
+    lines = [
+        "# HELP recipe_fragment_cache_hits_total Cached recipe fragments served.",
+        "# TYPE recipe_fragment_cache_hits_total counter",
+        "# HELP recipe_fragment_cache_misses_total Recipe fragments rendered and cached.",
+        "# TYPE recipe_fragment_cache_misses_total counter",
+        "# HELP recipe_fragment_cache_hit_ratio Hits / lookups since the counters started.",
+        "# TYPE recipe_fragment_cache_hit_ratio gauge",
+    ]
+    for fragment, stats in fragment_stats().items():
+        label = f'{{fragment="{fragment}"}}'
+        lines.append(f"recipe_fragment_cache_hits_total{label} {stats['hits']}")
+        lines.append(f"recipe_fragment_cache_misses_total{label} {stats['misses']}")
+        if stats["ratio"] is not None:
+            lines.append(f"recipe_fragment_cache_hit_ratio{label} {stats['ratio']:.4f}")
+    return HttpResponse("\n".join(lines) + "\n", content_type="text/plain; version=0.0.4")
+
+
+# Recipe list and detail pages (async; templates rendered via arender)
+# Shows list of all recipes, one keyset page at a time (?cursor=...)
+@login_required
+async def recipe_list(request):
+    paginator = KeysetPaginator(Recipe.objects.all(), get_page_size())
+    try:
+        page = await paginator.apage(request.GET.get("cursor"))
+    except InvalidCursor:
+        raise Http404("Invalid page cursor.")
+    # Same context names ListView used, so the template didn't change
+    context = {
+        "paginator": paginator,
+        "page_obj": page,
+        "is_paginated": page.has_other_pages,
+        "object_list": page.object_list,
+        "recipe_list": page.object_list,
+        # Every card of the page in one cache round-trip
+        PREFETCHED_CONTEXT: await sync_to_async(prefetch_fragments)("card", page.object_list),
+    }
+    return await arender(request, "recipes/recipes_list.html", context)
+
 
 # Shows details of one recipe
-class RecipeDetailView(LoginRequiredMixin, DetailView):
-    model = Recipe
-    template_name = 'recipes/recipes_detail.html'
\ No newline at end of file
+@login_required
+async def recipe_detail(request, pk):
+    recipe = await aget_object_or_404(Recipe, pk=pk)
+    context = {
+        "object": recipe,
+        "recipe": recipe,
+        # The template shows each ingredient's name; join it in so the list is
+        # one query, and keep it lazy so a cached detail fragment skips it
+        "ingredients": recipe.recipeingredient_set.select_related("ingredient"),
+    }
+    return await arender(request, "recipes/recipes_detail.html", context)